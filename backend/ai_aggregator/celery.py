@@ -15,9 +15,10 @@ app.conf.beat_schedule = {
 		"task": "core.tasks.run_parser",
 		"schedule": crontab(minute=0, hour="*"),
 	},
-	"deliver-outbox-every-minute": {
+	# New events are pushed on commit; this only sweeps retries and misses
+	"deliver-outbox-sweep-every-5-min": {
 		"task": "core.tasks.deliver_outbox",
-		"schedule": crontab(minute="*"),
+		"schedule": crontab(minute="*/5"),
 	},
 	"fetch-telegram-every-5-min": {
 		"task": "core.tasks.fetch_telegram_channels",
@@ -27,6 +28,18 @@ app.conf.beat_schedule = {
 		"task": "core.tasks.fetch_websites",
 		"schedule": crontab(minute="*/15"),
 	},
+	"requeue-pending-rewrites-every-10-min": {
+		"task": "core.tasks.requeue_pending_rewrites",
+		"schedule": crontab(minute="*/10"),
+	},
+	"archive-outbox-daily": {
+		"task": "core.tasks.archive_outbox",
+		"schedule": crontab(minute=0, hour=4),
+	},
+	"prune-rewrite-cache-daily": {
+		"task": "core.tasks.prune_rewrite_cache",
+		"schedule": crontab(minute=30, hour=3),
+	},
 }
 
 
@@ -111,6 +111,10 @@ REST_FRAMEWORK = {
 	"PAGE_SIZE": int(os.getenv("PAGE_SIZE", "20")),
 }
 
+# Search suggestions: newest titles kept in a per-process index (core.suggest)
+SUGGEST_INDEX_SIZE = int(os.getenv("SUGGEST_INDEX_SIZE", "5000"))
+SUGGEST_INDEX_TTL = int(os.getenv("SUGGEST_INDEX_TTL", "120"))
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = os.getenv("CORS_ALLOW_ALL_ORIGINS", "1") == "1"
 CORS_ALLOWED_ORIGINS = [o for o in os.getenv("CORS_ALLOWED_ORIGINS", "").split(",") if o]
@@ -136,13 +140,101 @@ CELERY_BROKER_TRANSPORT_OPTIONS = {
 	"health_check_interval": int(os.getenv("CELERY_HEALTH_CHECK_INTERVAL", "30")),
 }
 CELERY_RESULT_BACKEND_TRANSPORT_OPTIONS = {"retry_on_timeout": True}
+# Connect/send bound for fire-and-forget publishes from request paths (core.outbox.publish_nowait)
+CELERY_DISPATCH_TIMEOUT = float(os.getenv("CELERY_DISPATCH_TIMEOUT", "0.5"))
+# AI rewrites run on their own queue/worker (see `rewriter` service in docker-compose)
+CELERY_TASK_ROUTES = {
+	"core.tasks.rewrite_news_item": {"queue": "rewriter"},
+	"core.tasks.rewrite_news_items": {"queue": "rewriter"},
+}
+
+# Cache: shared Redis when CACHE_URL is set, per-process memory otherwise
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL:
+	CACHES = {
+		"default": {
+			"BACKEND": "django.core.cache.backends.redis.RedisCache",
+			"LOCATION": CACHE_URL,
+		}
+	}
+else:
+	CACHES = {
+		"default": {
+			"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+		}
+	}
+
+# Read API response cache (core.response_cache); 0 disables it
+RESPONSE_CACHE_SECONDS = int(os.getenv("RESPONSE_CACHE_SECONDS", "300"))
+RESPONSE_CACHE_STALE_SECONDS = int(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "3600"))
+RESPONSE_CACHE_LOCK_SECONDS = int(os.getenv("RESPONSE_CACHE_LOCK_SECONDS", "10"))
+RESPONSE_CACHE_WAIT_SECONDS = float(os.getenv("RESPONSE_CACHE_WAIT_SECONDS", "2"))
+
+# Shared caches in front of the API (core.edge_cache, varnish/default.vcl); 0 disables the headers
+EDGE_CACHE_SECONDS = int(os.getenv("EDGE_CACHE_SECONDS", "60"))
+EDGE_CACHE_SWR_SECONDS = int(os.getenv("EDGE_CACHE_SWR_SECONDS", "300"))
+EDGE_SURROGATE_KEY_HEADER = os.getenv("EDGE_SURROGATE_KEY_HEADER", "Surrogate-Key")
+# PURGE targets, e.g. http://varnish/ ; empty: no purges, entries expire after EDGE_CACHE_SECONDS
+EDGE_PURGE_URLS = [u.strip() for u in os.getenv("EDGE_PURGE_URLS", "").split(",") if u.strip()]
+EDGE_PURGE_TIMEOUT = float(os.getenv("EDGE_PURGE_TIMEOUT", "5"))
 
 WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+# Outbox delivery: leased batches, parallel sends per worker
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_MAX_BATCHES = int(os.getenv("OUTBOX_MAX_BATCHES", "10"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "8"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+OUTBOX_HTTP_TIMEOUT = float(os.getenv("OUTBOX_HTTP_TIMEOUT", "10"))
+# Batched webhook: POST {"events": [...]} with per-event acks (0/1 = one event per request)
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "0"))
+WEBHOOK_BATCH_MAX_BYTES = int(os.getenv("WEBHOOK_BATCH_MAX_BYTES", str(256 * 1024)))
+# Failed events: exponential backoff with jitter, dead letter after N attempts
+OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "21600"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "12"))
+# Finished events are moved to gzipped JSONL archives by archive_outbox (0 days keeps them)
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "14"))
+OUTBOX_DEAD_RETENTION_DAYS = int(os.getenv("OUTBOX_DEAD_RETENTION_DAYS", "90"))
+OUTBOX_ARCHIVE_DIR = os.getenv("OUTBOX_ARCHIVE_DIR", str(BASE_DIR / "archive" / "outbox"))
+# Telegram send limits (shared via RATE_LIMIT_REDIS_URL) and the longest a
+# delivery thread waits for a slot before rescheduling the event
+TELEGRAM_GLOBAL_PER_MINUTE = int(os.getenv("TELEGRAM_GLOBAL_PER_MINUTE", "1800"))
+TELEGRAM_CHAT_PER_MINUTE = int(os.getenv("TELEGRAM_CHAT_PER_MINUTE", "20"))
+TELEGRAM_MAX_WAIT_SECONDS = int(os.getenv("TELEGRAM_MAX_WAIT_SECONDS", "30"))
 TG_API_ID = os.getenv("TG_API_ID")
 TG_API_HASH = os.getenv("TG_API_HASH")
 TG_STRING_SESSION = os.getenv("TG_STRING_SESSION")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 REWRITER_ENABLED = os.getenv("REWRITER_ENABLED", "0") == "1"
+REWRITER_PENDING_REQUEUE_MINUTES = int(os.getenv("REWRITER_PENDING_REQUEUE_MINUTES", "30"))
+# How long a rewriter task owns the items it claimed; then they can be claimed again
+REWRITER_CLAIM_SECONDS = int(os.getenv("REWRITER_CLAIM_SECONDS", "900"))
+# Rewriter throughput: parallel requests per task, ids per queued task and a
+# global budget shared through Redis (0 = unlimited). Per worker process: the
+# number of rewriter processes is REWRITER_WORKER_PROCESSES in docker-compose.yml
+REWRITER_CONCURRENCY = int(os.getenv("REWRITER_CONCURRENCY", "4"))
+REWRITER_TASK_BATCH = int(os.getenv("REWRITER_TASK_BATCH", "8"))
+REWRITER_RPM = int(os.getenv("REWRITER_RPM", "0"))
+REWRITER_TPM = int(os.getenv("REWRITER_TPM", "0"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", CACHE_URL)
+# Batch mode: articles packed into one request (1 = off) for fresh items and
+# for backlogs (requeue sweep, rewrite_backlog command), capped by total chars
+REWRITER_PACK_SIZE = int(os.getenv("REWRITER_PACK_SIZE", "1"))
+REWRITER_BACKLOG_PACK_SIZE = int(os.getenv("REWRITER_BACKLOG_PACK_SIZE", "5"))
+REWRITER_PACK_MAX_CHARS = int(os.getenv("REWRITER_PACK_MAX_CHARS", "24000"))
+# Circuit breaker: open after N consecutive provider failures, probe again after the pause
+REWRITER_BREAKER_THRESHOLD = int(os.getenv("REWRITER_BREAKER_THRESHOLD", "5"))
+REWRITER_BREAKER_RESET_SECONDS = int(os.getenv("REWRITER_BREAKER_RESET_SECONDS", "120"))
+# Input budget: markup is stripped and inputs are fitted to REWRITER_INPUT_TOKENS;
+# beyond REWRITER_MAP_REDUCE_TOKENS chunks are summarized first (map-reduce)
+REWRITER_INPUT_TOKENS = int(os.getenv("REWRITER_INPUT_TOKENS", "3000"))
+REWRITER_MAP_REDUCE_TOKENS = int(os.getenv("REWRITER_MAP_REDUCE_TOKENS", "6000"))
+REWRITER_CHUNK_TOKENS = int(os.getenv("REWRITER_CHUNK_TOKENS", "2000"))
+REWRITER_MAX_CHUNKS = int(os.getenv("REWRITER_MAX_CHUNKS", "8"))
+REWRITER_USAGE_RETENTION_DAYS = int(os.getenv("REWRITER_USAGE_RETENTION_DAYS", "90"))
+# Persistent rewrite cache (content-hash keyed)
+REWRITE_CACHE_TTL_DAYS = int(os.getenv("REWRITE_CACHE_TTL_DAYS", "30"))
+REWRITE_CACHE_MAX_ENTRIES = int(os.getenv("REWRITE_CACHE_MAX_ENTRIES", "10000"))
 HASHTAG_SLUG_CHOICES = [("ai","AI"), ("crypto","CRYPTO")]
 # Celery beat schedule configured in celery.py
 
@@ -150,4 +242,16 @@ HASHTAG_SLUG_CHOICES = [("ai","AI"), ("crypto","CRYPTO")]
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHANNEL = os.getenv("TELEGRAM_CHANNEL", "")
 
+# RSS fetching (concurrent conditional GET)
+RSS_FETCH_CONCURRENCY = int(os.getenv("RSS_FETCH_CONCURRENCY", "16"))
+RSS_PER_HOST_CONCURRENCY = int(os.getenv("RSS_PER_HOST_CONCURRENCY", "2"))
+RSS_FETCH_TIMEOUT = float(os.getenv("RSS_FETCH_TIMEOUT", "20"))
+
+# Per-source seen-set of evaluated links (skips detail requests for known articles)
+INGEST_SEEN_TTL = int(os.getenv("INGEST_SEEN_TTL", str(7 * 24 * 3600)))
+INGEST_SEEN_MAX = int(os.getenv("INGEST_SEEN_MAX", "1000"))
 
+# How often process-local config snapshots re-check their shared version stamp
+CONFIG_SNAPSHOT_CHECK_SECONDS = float(os.getenv("CONFIG_SNAPSHOT_CHECK_SECONDS", "5"))
+# ...and reload regardless of the stamp once this old (bumps are per-process with the locmem cache)
+CONFIG_SNAPSHOT_MAX_AGE_SECONDS = float(os.getenv("CONFIG_SNAPSHOT_MAX_AGE_SECONDS", "60"))
@@ -2,18 +2,23 @@ from django.contrib import admin
 from django import forms
 from django.conf import settings as dj_settings
 
-from .models import AuthorColumn, NewsItem, NewsSource, OutboxEvent, TelegramChannel, WebsiteSource, RewriterConfig, KeywordFilter, ParserConfig, SitePage, Hashtag, SocialLink, AdBanner
+from .models import AuthorColumn, NewsItem, NewsSource, OutboxEvent, TelegramChannel, WebsiteSource, RewriterConfig, KeywordFilter, ParserConfig, SitePage, Hashtag, SocialLink, AdBanner, RewriteCacheEntry, RewriterUsage
+from . import outbox, rewrite_cache
+from .rewriter import get_breaker
+from .signals import bump_model_versions
 
 
 @admin.action(description="Activate selected")
 def mark_active(modeladmin, request, queryset):
 	updated = queryset.update(is_active=True)
+	bump_model_versions(queryset.model)
 	modeladmin.message_user(request, f"Activated {updated} item(s)")
 
 
 @admin.action(description="Deactivate selected")
 def mark_inactive(modeladmin, request, queryset):
 	updated = queryset.update(is_active=False)
+	bump_model_versions(queryset.model)
 	modeladmin.message_user(request, f"Deactivated {updated} item(s)")
 
 
@@ -45,12 +50,12 @@ class NewsSourceAdmin(admin.ModelAdmin):
 
 @admin.register(NewsItem)
 class NewsItemAdmin(admin.ModelAdmin):
-	list_display = ("title", "source_name", "theme", "published_at", "created_at")
-	list_filter = ("source_name", "theme")
+	list_display = ("title", "source_name", "theme", "status", "published_at", "created_at")
+	list_filter = ("status", "source_name", "theme")
 	search_fields = ("title", "original_url", "source_name")
 	readonly_fields = ("created_at", "updated_at")
 	filter_horizontal = ("hashtags",)
-	fields = ("title", "original_url", "description", "published_at", "source_name", "theme", "hashtags", "image_url", "image_file", "created_at", "updated_at")
+	fields = ("title", "original_url", "description", "published_at", "source_name", "theme", "status", "hashtags", "image_url", "image_file", "created_at", "updated_at")
 
 
 @admin.register(AuthorColumn)
@@ -62,15 +67,25 @@ class AuthorColumnAdmin(admin.ModelAdmin):
 	fields = ("title", "author_name", "content_body", "published_at", "theme", "hashtags", "image_url", "image_file", "created_at", "updated_at")
 
 
+@admin.action(description="Requeue selected for delivery")
+def requeue_outbox_events(modeladmin, request, queryset):
+	updated = outbox.requeue(queryset)
+	modeladmin.message_user(request, f"Requeued {updated} event(s)")
+
+
 @admin.register(OutboxEvent)
 class OutboxEventAdmin(admin.ModelAdmin):
 	list_display = (
 		"event_type",
+		"status",
 		"created_at",
 		"delivered_at",
 		"delivery_attempts",
+		"next_attempt_at",
 	)
-	readonly_fields = ("created_at", "updated_at", "delivery_attempts")
+	list_filter = ("status", "event_type")
+	readonly_fields = ("created_at", "updated_at", "delivery_attempts", "next_attempt_at", "last_error")
+	actions = (requeue_outbox_events,)
 
 
 @admin.register(TelegramChannel)
@@ -93,6 +108,39 @@ class WebsiteSourceAdmin(admin.ModelAdmin):
 @admin.register(RewriterConfig)
 class RewriterConfigAdmin(admin.ModelAdmin):
 	list_display = ("is_enabled", "model", "max_output_tokens", "updated_at")
+	readonly_fields = ("cache_stats", "breaker_state")
+	actions = ("reset_breaker",)
+
+	@admin.display(description="Rewrite cache")
+	def cache_stats(self, obj):
+		st = rewrite_cache.stats()
+		return f"hits={st['hits']} misses={st['misses']} entries={st['entries']}"
+
+	@admin.display(description="Provider circuit")
+	def breaker_state(self, obj):
+		st = get_breaker().info()
+		return f"{st['state']} failures={st['failures']} retry_in={st['retry_in']}s"
+
+	@admin.action(description="Reset rewriter circuit breaker")
+	def reset_breaker(self, request, queryset):
+		get_breaker().reset()
+		self.message_user(request, "Rewriter circuit breaker closed")
+
+
+@admin.register(RewriteCacheEntry)
+class RewriteCacheEntryAdmin(admin.ModelAdmin):
+	list_display = ("key", "model", "hits", "last_used_at", "expires_at", "created_at")
+	search_fields = ("key",)
+	readonly_fields = ("key", "model", "result", "hits", "last_used_at", "expires_at", "created_at", "updated_at")
+
+
+@admin.register(RewriterUsage)
+class RewriterUsageAdmin(admin.ModelAdmin):
+	list_display = ("created_at", "source", "mode", "model", "prompt_tokens", "completion_tokens")
+	list_filter = ("mode", "model", "source")
+	search_fields = ("source",)
+	date_hierarchy = "created_at"
+	readonly_fields = ("created_at", "source", "mode", "model", "prompt_tokens", "completion_tokens")
 
 
 @admin.register(KeywordFilter)
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
@@ -8,6 +9,9 @@ class CoreConfig(AppConfig):
 	def ready(self) -> None:
 		# Import signals on app ready
 		from . import signals  # noqa: F401
+		from .search import ensure_installed
+
+		post_migrate.connect(ensure_installed, sender=self)
 		return super().ready()
 
 
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import time
+from typing import Dict
+
+from django.core.cache import cache
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+	"""Consecutive-failure circuit breaker shared by all workers through the cache.
+
+	Closed: calls pass, failures are counted. After `threshold` consecutive
+	failures the circuit opens for `reset_seconds` and `allow()` fails fast.
+	Afterwards it is half-open: exactly one caller gets a probe slot; success
+	closes the circuit, failure re-opens it for another `reset_seconds`.
+	"""
+
+	def __init__(self, name: str, threshold: int, reset_seconds: float) -> None:
+		self.name = name
+		self.threshold = max(1, int(threshold))
+		self.reset_seconds = max(1.0, float(reset_seconds))
+
+	def _key(self, suffix: str) -> str:
+		return f"circuit:{self.name}:{suffix}"
+
+	def _opened_until(self) -> float:
+		try:
+			return float(cache.get(self._key("opened_until")) or 0)
+		except Exception:
+			return 0.0
+
+	def state(self) -> str:
+		until = self._opened_until()
+		if not until:
+			return CLOSED
+		return OPEN if time.time() < until else HALF_OPEN
+
+	def allow(self) -> bool:
+		"""True if a call may go through now (claims the probe slot when half-open)."""
+		state = self.state()
+		if state == CLOSED:
+			return True
+		if state == OPEN:
+			return False
+		try:
+			# The slot expires on its own in case the probing worker dies
+			return bool(cache.add(self._key("probe"), 1, int(self.reset_seconds)))
+		except Exception:
+			return True
+
+	def record_success(self) -> None:
+		try:
+			if self._opened_until():
+				cache.delete_many([self._key("opened_until"), self._key("probe")])
+			cache.set(self._key("failures"), 0, None)
+		except Exception:
+			pass
+
+	def record_failure(self) -> None:
+		try:
+			if self.state() == HALF_OPEN:
+				self._open()
+				return
+			try:
+				failures = cache.incr(self._key("failures"))
+			except ValueError:
+				cache.add(self._key("failures"), 1, None)
+				failures = 1
+			if failures >= self.threshold:
+				self._open()
+		except Exception:
+			pass
+
+	def _open(self) -> None:
+		cache.set(self._key("opened_until"), time.time() + self.reset_seconds, None)
+		cache.delete(self._key("probe"))
+		cache.set(self._key("failures"), 0, None)
+
+	def reset(self) -> None:
+		try:
+			cache.delete_many([self._key("opened_until"), self._key("probe"), self._key("failures")])
+		except Exception:
+			pass
+
+	def info(self) -> Dict[str, object]:
+		try:
+			failures = int(cache.get(self._key("failures")) or 0)
+		except Exception:
+			failures = 0
+		until = self._opened_until()
+		return {
+			"state": self.state(),
+			"failures": failures,
+			"retry_in": max(0, int(until - time.time())) if until else 0,
+		}
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .response_cache import cache_key
+from .versions import get_versions
+
+logger = logging.getLogger(__name__)
+
+
+def compute_validators(querysets, versions: Tuple[int, ...] = ()) -> Optional[Tuple[str, int]]:
+	"""(weak ETag, Last-Modified timestamp) from Max(updated_at) and the row count.
+
+	One aggregate query per queryset, nothing is serialized. None when every
+	queryset is empty (detail views then 404 as usual).
+	"""
+	latest = None
+	total = 0
+	for qs in querysets:
+		if not qs.query.is_sliced:
+			qs = qs.order_by()
+		row = qs.aggregate(latest=Max("updated_at"), total=Count("pk"))
+		total += row["total"] or 0
+		if row["latest"] is not None and (latest is None or row["latest"] > latest):
+			latest = row["latest"]
+	if latest is None:
+		return None
+	raw = f"{latest.isoformat()}|{total}|{versions}"
+	etag = 'W/"%s"' % hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+	return etag, int(latest.timestamp())
+
+
+class ConditionalGetMixin:
+	"""ETag / Last-Modified on GET with 304 for If-None-Match / If-Modified-Since.
+
+	Validators come from get_validator_querysets(); namespace versions
+	(`cache_namespaces`, see core.versions) are mixed into the ETag so deletes
+	and related edits (e.g. a renamed hashtag) change it too. For versioned
+	views the validators are cached under those versions, so a revalidation
+	costs no query until something changes. Bodies from the response cache
+	(core.response_cache) carry the validators stored with them.
+	"""
+	cache_namespaces: Tuple[str, ...] = ()
+
+	def get_validator_querysets(self) -> List:
+		# With a cursor only the requested page window counts (see HybridPagination.window)
+		qs = self.filter_queryset(self.get_queryset())
+		window = getattr(self.paginator, "window", None)
+		return [window(qs, self.request) if window else qs]
+
+	def _validators(self, request) -> Optional[Tuple[str, int]]:
+		versions = get_versions(self.cache_namespaces) if self.cache_namespaces else ()
+		if not versions:
+			return compute_validators(self.get_validator_querysets())
+		key = f"{cache_key('etag:' + type(self).__name__, request)}:{'.'.join(map(str, versions))}"
+		try:
+			cached = cache.get(key)
+		except Exception:
+			logger.warning("Validator cache unavailable; computing uncached", exc_info=True)
+			return compute_validators(self.get_validator_querysets(), versions)
+		if cached is None:
+			cached = compute_validators(self.get_validator_querysets(), versions) or ()
+			try:
+				cache.set(key, cached, int(getattr(settings, "RESPONSE_CACHE_STALE_SECONDS", 3600)))
+			except Exception:
+				logger.warning("Validator cache unavailable; not stored", exc_info=True)
+		return tuple(cached) or None
+
+	def get(self, request, *args, **kwargs):
+		validators = self._validators(request)
+		if validators is None:
+			return super().get(request, *args, **kwargs)
+		etag, last_modified = validators
+		headers = {"ETag": etag, "Last-Modified": http_date(last_modified)}
+		not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+		if not_modified:
+			for name, value in headers.items():
+				not_modified[name] = value
+			return not_modified
+		# With CachedResponseMixin the validators are stored with the body; a
+		# cached (e.g. STALE) response carries those of the data it serves
+		self.response_headers = headers
+		response = super().get(request, *args, **kwargs)
+		if response.status_code == 200 and not response.has_header("X-Cache"):
+			for name, value in headers.items():
+				response[name] = value
+		return response
+
+
+class ConditionalDetailMixin(ConditionalGetMixin):
+	"""ConditionalGetMixin for RetrieveAPIView: validators from the one looked-up row."""
+
+	def get_validator_querysets(self) -> List:
+		lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+		value = self.kwargs.get(lookup_url_kwarg)
+		return [self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: value})]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import Hashtag, ParserConfig, RewriterConfig
+from .versions import get_version
+
+# namespace -> (version, checked_at, loaded_at, value)
+_snapshots: Dict[str, Tuple[int, float, float, Any]] = {}
+
+
+def snapshot(namespace: str, loader: Callable[[], Any]) -> Any:
+	"""Return a process-local copy of `loader()` for the current namespace version.
+
+	The shared version stamp (core.versions) is re-read at most every
+	CONFIG_SNAPSHOT_CHECK_SECONDS; `loader` runs only when it has changed,
+	or once the copy is CONFIG_SNAPSHOT_MAX_AGE_SECONDS old. The age cap
+	bounds staleness when version bumps don't reach this process (a
+	per-process locmem cache, an evicted or failed stamp write).
+	"""
+	interval = float(getattr(settings, "CONFIG_SNAPSHOT_CHECK_SECONDS", 5.0))
+	max_age = float(getattr(settings, "CONFIG_SNAPSHOT_MAX_AGE_SECONDS", 60.0))
+	now = time.monotonic()
+	cached = _snapshots.get(namespace)
+	if cached is not None and now - cached[2] >= max_age:
+		cached = None
+	if cached is not None and now - cached[1] < interval:
+		return cached[3]
+	version = get_version(namespace)
+	if cached is not None and version and cached[0] == version:
+		_snapshots[namespace] = (version, now, cached[2], cached[3])
+		return cached[3]
+	value = loader()
+	_snapshots[namespace] = (version, now, now, value)
+	return value
+
+
+def get_parser_config() -> Optional[ParserConfig]:
+	"""Latest ParserConfig row (None if not configured)."""
+	return snapshot("parser_config", lambda: ParserConfig.objects.order_by("-updated_at").first())
+
+
+def get_rewriter_config() -> Optional[RewriterConfig]:
+	"""Latest RewriterConfig row, enabled or not (None if not configured)."""
+	return snapshot("rewriter_config", lambda: RewriterConfig.objects.order_by("-updated_at").first())
+
+
+def get_active_hashtag_slugs() -> List[str]:
+	return snapshot("hashtags", lambda: list(Hashtag.objects.filter(is_active=True).values_list("slug", flat=True)))
@@ -0,0 +1,135 @@
+"""Shared-cache (Varnish / CDN) headers and surrogate-key purges.
+
+Cacheable API responses carry `Cache-Control: public, max-age=0,
+s-maxage=EDGE_CACHE_SECONDS, stale-while-revalidate=EDGE_CACHE_SWR_SECONDS`
+and a Surrogate-Key header naming the collections and objects in the body
+("posts news news:17 news:18"). Model changes purge exactly those keys on
+the proxies in EDGE_PURGE_URLS (see varnish/default.vcl).
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+logger = logging.getLogger(__name__)
+
+
+def surrogate_header() -> str:
+	return getattr(settings, "EDGE_SURROGATE_KEY_HEADER", "Surrogate-Key")
+
+
+def post_keys(post_type: str, pk: Optional[int] = None) -> List[str]:
+	"""Keys a change to one post invalidates: its collections and itself."""
+	collection = "news" if post_type == "news" else "columns"
+	keys = ["posts", collection]
+	if pk is not None:
+		keys.append(f"{post_type}:{pk}")
+	return keys
+
+
+def _result_items(data) -> list:
+	if isinstance(data, dict):
+		if isinstance(data.get("results"), list):
+			return data["results"]
+		if isinstance(data.get("next"), dict):
+			# Next-post views: {"next": {...}}
+			return [data["next"]]
+		return [data]
+	if isinstance(data, list):
+		return data
+	return []
+
+
+class EdgeCacheMixin:
+	"""Add shared-cache headers and surrogate keys to successful GET responses.
+
+	`edge_keys` are the collection keys of the view; `edge_object_type` names
+	the objects in the body (their `id`s become "<type>:<id>" keys; items
+	carrying their own "type", as in the unified feed, use that).
+	"""
+	edge_keys: tuple = ()
+	edge_object_type: str = ""
+	edge_object_field: str = "id"
+
+	def get_edge_keys(self, response) -> List[str]:
+		keys = list(self.edge_keys)
+		for item in _result_items(getattr(response, "data", None)):
+			if not isinstance(item, dict):
+				continue
+			kind = item.get("type") or self.edge_object_type
+			value = item.get(self.edge_object_field)
+			if kind and value is not None:
+				keys.append(f"{kind}:{value}")
+		return list(dict.fromkeys(keys))
+
+	def finalize_response(self, request, response, *args, **kwargs):
+		response = super().finalize_response(request, response, *args, **kwargs)
+		seconds = int(getattr(settings, "EDGE_CACHE_SECONDS", 60))
+		if seconds <= 0 or request.method not in ("GET", "HEAD") or response.status_code not in (200, 304):
+			return response
+		if response.get("X-Cache") == "STALE":
+			# A stale body is being refreshed in the background; a proxy must not
+			# keep it (Varnish would for its default TTL without s-maxage) nor
+			# index it under keys a purge would otherwise have to chase
+			patch_cache_control(response, no_cache=True)
+			return response
+		patch_cache_control(
+			response,
+			public=True,
+			max_age=0,
+			s_maxage=seconds,
+			stale_while_revalidate=int(getattr(settings, "EDGE_CACHE_SWR_SECONDS", 300)),
+		)
+		patch_vary_headers(response, ["Accept"])
+		# A 304 has no body to name objects from; proxies keep the stored
+		# object's keys when revalidating, so send none rather than fewer
+		keys = self.get_edge_keys(response) if response.status_code == 200 else []
+		if keys:
+			response[surrogate_header()] = " ".join(keys)
+		return response
+
+
+def purge_on_commit(keys: Iterable[str]) -> None:
+	"""Queue a purge of `keys` on every edge proxy once the transaction commits.
+
+	Like outbox dispatches this is a single time-boxed publish; a broker
+	outage leaves the edge copies to expire after EDGE_CACHE_SECONDS.
+	"""
+	keys = list(dict.fromkeys(k for k in keys if k))
+	if not keys or not getattr(settings, "EDGE_PURGE_URLS", []):
+		return
+
+	def dispatch() -> None:
+		from .outbox import publish_nowait
+		from .tasks import purge_edge_cache
+
+		if not publish_nowait(purge_edge_cache, keys):
+			logger.warning("Edge purge dispatch failed keys=%s", keys[:10])
+
+	transaction.on_commit(dispatch)
+
+
+def purge_keys(keys: List[str]) -> dict:
+	"""Send PURGE with the surrogate keys to each proxy; returns {url: status or error}."""
+	from .outbox import get_session
+
+	results = {}
+	for url in getattr(settings, "EDGE_PURGE_URLS", []):
+		try:
+			resp = get_session().request(
+				"PURGE",
+				url,
+				headers={surrogate_header(): " ".join(keys)},
+				timeout=float(getattr(settings, "EDGE_PURGE_TIMEOUT", 5)),
+			)
+			results[url] = resp.status_code
+			if resp.status_code >= 400:
+				logger.warning("Edge purge url=%s HTTP %s", url, resp.status_code)
+		except Exception as exc:
+			results[url] = f"{type(exc).__name__}: {exc}"[:200]
+			logger.warning("Edge purge url=%s failed: %s", url, exc)
+	return results
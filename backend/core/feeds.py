@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+from urllib.parse import urlparse
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from .models import NewsSource
+
+USER_AGENT = "Mozilla/5.0 (compatible; ai-aggregator/1.0)"
+
+
+@dataclass
+class FeedFetchResult:
+	"""Outcome of a single (conditional) feed download.
+
+	- not_modified: server answered 304, nothing to parse
+	- entries: parsed feed entries (empty on error or 304)
+	- etag/last_modified: validators to store on the source for the next run
+	"""
+	source: NewsSource
+	entries: list
+	not_modified: bool = False
+	etag: str = ""
+	last_modified: str = ""
+	error: str = ""
+
+
+class _HostLimiter:
+	"""Caps how many requests may be in flight against the same host."""
+
+	def __init__(self, per_host: int) -> None:
+		self.per_host = max(1, per_host)
+		self._lock = threading.Lock()
+		self._semaphores: Dict[str, threading.Semaphore] = {}
+
+	def for_url(self, url: str) -> threading.Semaphore:
+		host = (urlparse(url).hostname or "").lower()
+		with self._lock:
+			sem = self._semaphores.get(host)
+			if sem is None:
+				sem = threading.Semaphore(self.per_host)
+				self._semaphores[host] = sem
+			return sem
+
+
+def _fetch_one(session: requests.Session, source: NewsSource, limiter: _HostLimiter, timeout: float) -> FeedFetchResult:
+	headers = {"User-Agent": USER_AGENT}
+	if source.etag:
+		headers["If-None-Match"] = source.etag
+	if source.last_modified:
+		headers["If-Modified-Since"] = source.last_modified
+	try:
+		with limiter.for_url(source.url):
+			resp = session.get(source.url, headers=headers, timeout=timeout)
+	except Exception as exc:
+		return FeedFetchResult(source=source, entries=[], error=f"{type(exc).__name__}: {exc}"[:300])
+	if resp.status_code == 304:
+		return FeedFetchResult(source=source, entries=[], not_modified=True, etag=source.etag, last_modified=source.last_modified)
+	if resp.status_code != 200:
+		return FeedFetchResult(source=source, entries=[], error=f"HTTP {resp.status_code}")
+	try:
+		feed = feedparser.parse(resp.content, response_headers={k.lower(): v for k, v in resp.headers.items()})
+	except Exception as exc:
+		return FeedFetchResult(source=source, entries=[], error=f"parse: {exc}"[:300])
+	return FeedFetchResult(
+		source=source,
+		entries=list(feed.entries or []),
+		etag=(resp.headers.get("ETag") or "")[:255],
+		last_modified=(resp.headers.get("Last-Modified") or "")[:255],
+	)
+
+
+def fetch_feeds(sources: Iterable[NewsSource]) -> List[FeedFetchResult]:
+	"""Download feeds concurrently with conditional GET.
+
+	Network I/O runs in a thread pool (RSS_FETCH_CONCURRENCY) with at most
+	RSS_PER_HOST_CONCURRENCY requests per host. Results are returned in the
+	order of `sources`; parsing into NewsItem stays with the caller.
+	"""
+	sources = list(sources)
+	if not sources:
+		return []
+	workers = int(getattr(settings, "RSS_FETCH_CONCURRENCY", 16))
+	per_host = int(getattr(settings, "RSS_PER_HOST_CONCURRENCY", 2))
+	timeout = float(getattr(settings, "RSS_FETCH_TIMEOUT", 20.0))
+	limiter = _HostLimiter(per_host)
+	with requests.Session() as session:
+		adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+		session.mount("http://", adapter)
+		session.mount("https://", adapter)
+		with ThreadPoolExecutor(max_workers=max(1, min(workers, len(sources)))) as pool:
+			return list(pool.map(lambda s: _fetch_one(session, s, limiter, timeout), sources))
+
+
+def store_validators(result: FeedFetchResult) -> None:
+	"""Persist ETag/Last-Modified so the next run can send a conditional GET."""
+	source = result.source
+	etag = result.etag or ""
+	last_modified = result.last_modified or ""
+	if etag == (source.etag or "") and last_modified == (source.last_modified or ""):
+		return
+	source.etag = etag
+	source.last_modified = last_modified
+	source.save(update_fields=["etag", "last_modified", "updated_at"])
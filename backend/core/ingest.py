@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Hashtag, NewsItem
+
+
+def existing_urls(urls: Iterable[str]) -> Set[str]:
+	"""Return the subset of `urls` already stored as NewsItem.original_url (one query)."""
+	urls = {u for u in urls if u}
+	if not urls:
+		return set()
+	return set(NewsItem.objects.filter(original_url__in=urls).values_list("original_url", flat=True))
+
+
+def seen_links(key: str) -> Set[str]:
+	"""Links a source has already evaluated (stored or filtered out) recently."""
+	try:
+		return set(cache.get(f"ingest:seen:{key}") or [])
+	except Exception:
+		return set()
+
+
+def remember_links(key: str, links: Iterable[str]) -> None:
+	"""Add links to the per-source seen-set (bounded, expires after INGEST_SEEN_TTL)."""
+	links = [u for u in links if u]
+	if not links:
+		return
+	limit = int(getattr(settings, "INGEST_SEEN_MAX", 1000))
+	ttl = int(getattr(settings, "INGEST_SEEN_TTL", 7 * 24 * 3600))
+	try:
+		fresh = set(links)
+		current = list(cache.get(f"ingest:seen:{key}") or [])
+		merged = [u for u in current if u not in fresh] + links
+		cache.set(f"ingest:seen:{key}", merged[-limit:], ttl)
+	except Exception:
+		pass
+
+
+def bulk_create_news(items: List[NewsItem], hashtags: Optional[Dict[str, List[str]]] = None) -> List[NewsItem]:
+	"""Insert a batch of unsaved NewsItem rows, skipping known URLs.
+
+	- Known URLs are filtered with a single `original_url__in` query, the rest
+	  is written with one INSERT that ignores unique conflicts (concurrent runs).
+	- `hashtags` maps original_url -> list of slugs to attach (active only).
+	- Bulk inserts bypass post_save, so outbox events are emitted here.
+
+	Returns the rows actually inserted by this call, with primary keys set.
+	"""
+	from .signals import emit_news_created
+
+	unique: Dict[str, NewsItem] = {}
+	for item in items:
+		if item.original_url and item.original_url not in unique:
+			unique[item.original_url] = item
+	if not unique:
+		return []
+	known = existing_urls(unique.keys())
+	pending = [item for url, item in unique.items() if url not in known]
+	if not pending:
+		return []
+	with transaction.atomic():
+		NewsItem.objects.bulk_create(pending, ignore_conflicts=True, batch_size=500)
+		# ignore_conflicts leaves pk unset; map back by URL and keep only the rows
+		# whose created_at matches ours (a concurrent run may have won the race)
+		by_url = {item.original_url: item for item in pending}
+		created: List[NewsItem] = []
+		rows = NewsItem.objects.filter(original_url__in=by_url.keys()).values_list("original_url", "id", "created_at")
+		for url, pk, created_at in rows:
+			item = by_url[url]
+			if item.created_at == created_at:
+				item.pk = pk
+				item._state.adding = False
+				item._state.db = NewsItem.objects.db
+				created.append(item)
+		if hashtags and created:
+			_attach_hashtags(created, hashtags)
+		if created:
+			emit_news_created(created)
+	return created
+
+
+def _attach_hashtags(items: List[NewsItem], hashtags: Dict[str, List[str]]) -> None:
+	slugs = {str(s).strip().lower() for item in items for s in (hashtags.get(item.original_url) or []) if s}
+	if not slugs:
+		return
+	tag_ids = dict(Hashtag.objects.filter(slug__in=slugs, is_active=True).values_list("slug", "id"))
+	if not tag_ids:
+		return
+	Through = NewsItem.hashtags.through
+	links = []
+	for item in items:
+		for slug in {str(s).strip().lower() for s in (hashtags.get(item.original_url) or []) if s}:
+			tag_id = tag_ids.get(slug)
+			if tag_id:
+				links.append(Through(newsitem_id=item.pk, hashtag_id=tag_id))
+	if links:
+		Through.objects.bulk_create(links, ignore_conflicts=True)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, List, Optional
+
+from .models import KeywordFilter
+from .config_snapshot import snapshot
+
+VERSION_NAMESPACE = "keyword_filters"
+
+
+class KeywordMatcher:
+	"""Aho-Corasick automaton over lowercased KeywordFilter phrases.
+
+	Matching is equivalent to `any(phrase in text.lower() for phrase in phrases)`
+	but scans the text once regardless of the number of phrases.
+	"""
+
+	def __init__(self, phrases: List[str]) -> None:
+		self.phrases = [p for p in dict.fromkeys(p.lower() for p in phrases if p)]
+		self._goto: List[Dict[str, int]] = [{}]
+		self._fail: List[int] = [0]
+		self._out: List[int] = [-1]
+		for idx, phrase in enumerate(self.phrases):
+			state = 0
+			for ch in phrase:
+				nxt = self._goto[state].get(ch)
+				if nxt is None:
+					nxt = len(self._goto)
+					self._goto[state][ch] = nxt
+					self._goto.append({})
+					self._fail.append(0)
+					self._out.append(-1)
+				state = nxt
+			if self._out[state] == -1:
+				self._out[state] = idx
+		self._build_failure_links()
+
+	def _build_failure_links(self) -> None:
+		queue = deque(self._goto[0].values())
+		while queue:
+			state = queue.popleft()
+			for ch, nxt in self._goto[state].items():
+				queue.append(nxt)
+				fail = self._fail[state]
+				while fail and ch not in self._goto[fail]:
+					fail = self._fail[fail]
+				target = self._goto[fail].get(ch, 0)
+				self._fail[nxt] = target if target != nxt else 0
+				# Inherit a match from the longest proper suffix
+				if self._out[nxt] == -1:
+					self._out[nxt] = self._out[self._fail[nxt]]
+
+	def __bool__(self) -> bool:
+		return bool(self.phrases)
+
+	def find(self, text: str) -> Optional[str]:
+		"""Return the first phrase found in `text` (case-insensitive), or None."""
+		if not self.phrases or not text:
+			return None
+		goto, fail, out = self._goto, self._fail, self._out
+		state = 0
+		for ch in text.lower():
+			while state and ch not in goto[state]:
+				state = fail[state]
+			state = goto[state].get(ch, 0)
+			if out[state] != -1:
+				return self.phrases[out[state]]
+		return None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+	"""Return the process-wide matcher, rebuilt when KeywordFilter rows change.
+
+	Staleness is bounded like every config snapshot (CONFIG_SNAPSHOT_MAX_AGE_SECONDS).
+	"""
+	return snapshot(VERSION_NAMESPACE, lambda: KeywordMatcher(
+		list(KeywordFilter.objects.filter(is_active=True).values_list("phrase", flat=True))
+	))
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import AuthorColumn, Hashtag, NewsItem
+
+# Max SQL queries per request with full pages of tagged posts. Query counts
+# must not grow with the number of rows: hashtags are prefetched per page.
+# Lists and details include one aggregate per queryset for ETag/Last-Modified
+# (core.conditional; cached until the data changes, counted here cold).
+BUDGETS = {
+	"news list": ("/api/news/?page=1", 4),
+	"news list (cursor)": ("/api/news/?cursor=", 3),
+	"news list (filtered)": ("/api/news/?page=1&theme=AI&q=post", 4),
+	"news detail": ("/api/news/{news}/", 3),
+	"news next": ("/api/news/{news}/next/", 3),
+	"column list": ("/api/columns/?page=1", 4),
+	"column list (cursor)": ("/api/columns/?cursor=", 3),
+	"column detail": ("/api/columns/{column}/", 3),
+	"column next": ("/api/columns/{column}/next/", 3),
+	"unified posts": ("/api/posts/", 6),
+	"similar news": ("/api/posts/similar/?type=news&id={news}&limit=5", 5),
+	"similar columns": ("/api/posts/similar/?type=column&id={column}&limit=5", 5),
+}
+
+
+SCRATCH_CACHES = {
+	"default": {
+		"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+		"LOCATION": "check-query-budgets",
+	}
+}
+
+
+class _Rollback(Exception):
+	pass
+
+
+class Command(BaseCommand):
+	help = (
+		"Check that the public API endpoints stay within their SQL query budgets.\n"
+		"Seeds tagged posts inside a transaction that is rolled back afterwards; exits with an error on any overrun."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--posts", type=int, default=60, help="News items and columns to seed")
+		parser.add_argument("--verbose-sql", action="store_true", help="Print the queries of endpoints over budget")
+
+	def _seed(self, count: int) -> dict:
+		now = timezone.now()
+		tags = [Hashtag.objects.create(slug=f"budget-tag-{i}", name=f"Tag {i}") for i in range(3)]
+		news = NewsItem.objects.bulk_create([
+			NewsItem(
+				title=f"Budget post {i}",
+				original_url=f"https://budget.invalid/news/{i}",
+				description="post body",
+				published_at=now - timedelta(minutes=i),
+				theme=NewsItem.Theme.AI,
+			)
+			for i in range(count)
+		])
+		columns = AuthorColumn.objects.bulk_create([
+			AuthorColumn(
+				title=f"Budget column {i}",
+				author_name="Budget",
+				content_body="post body",
+				published_at=now - timedelta(minutes=i),
+				theme=NewsItem.Theme.AI,
+			)
+			for i in range(count)
+		])
+		NewsItem.hashtags.through.objects.bulk_create([
+			NewsItem.hashtags.through(newsitem_id=item.pk, hashtag_id=tag.pk) for item in news for tag in tags
+		])
+		AuthorColumn.hashtags.through.objects.bulk_create([
+			AuthorColumn.hashtags.through(authorcolumn_id=item.pk, hashtag_id=tag.pk) for item in columns for tag in tags
+		])
+		# Newest rows: their "next" exists and their similar candidates are full
+		return {"news": news[0].pk, "column": columns[0].pk}
+
+	def handle(self, *args, **opts):
+		failures = []
+		try:
+			# Measure the uncached path: the response cache would hide regressions.
+			# A throwaway cache and no edge proxies keep the run away from the
+			# live cache (versions, validators) and from PURGE requests.
+			with transaction.atomic(), override_settings(
+				ALLOWED_HOSTS=["testserver"],
+				RESPONSE_CACHE_SECONDS=0,
+				CACHES=SCRATCH_CACHES,
+				EDGE_PURGE_URLS=[],
+			):
+				ids = self._seed(max(1, opts["posts"]))
+				client = Client()
+				for name, (url, budget) in BUDGETS.items():
+					url = url.format(**ids)
+					with CaptureQueriesContext(connection) as ctx:
+						resp = client.get(url)
+					used = len(ctx.captured_queries)
+					ok = resp.status_code == 200 and used <= budget
+					line = f"{name:<24} {used:>3}/{budget:<3} HTTP {resp.status_code}  {url}"
+					self.stdout.write(self.style.SUCCESS(line) if ok else self.style.ERROR(line))
+					if not ok:
+						failures.append(name)
+						if opts["verbose_sql"]:
+							for query in ctx.captured_queries:
+								self.stdout.write(f"    {query['sql'][:300]}")
+				raise _Rollback
+		except _Rollback:
+			pass
+		if failures:
+			raise CommandError(f"Over query budget: {', '.join(failures)}")
+		self.stdout.write(self.style.SUCCESS(f"All {len(BUDGETS)} endpoints within budget"))
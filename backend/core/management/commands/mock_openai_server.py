@@ -0,0 +1,93 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+def _fake_answer(article: dict, allowed: list) -> dict:
+	return {
+		"title": f"[mock] {article.get('title') or ''}".strip(),
+		"content": article.get("content") or "",
+		"hashtags": list(allowed[:1]),
+		"theme": "AI",
+	}
+
+
+class Command(BaseCommand):
+	help = (
+		"Run a local OpenAI-compatible mock (POST /v1/chat/completions) for rewriter load tests.\n"
+		"Point the rewriter at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 and any OPENAI_API_KEY."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--host", default="127.0.0.1")
+		parser.add_argument("--port", type=int, default=8089)
+		parser.add_argument("--latency", type=float, default=0.5, help="Seconds per request")
+		parser.add_argument("--per-article-latency", type=float, default=0.2, help="Extra seconds per article in a packed request")
+		parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+		parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with HTTP 429")
+
+	def handle(self, *args, **opts):
+		stdout = self.stdout
+
+		class Handler(BaseHTTPRequestHandler):
+			def log_message(self, fmt, *args):
+				stdout.write(fmt % args)
+
+			def _send(self, status, payload, headers=None):
+				body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+				self.send_response(status)
+				self.send_header("Content-Type", "application/json")
+				self.send_header("Content-Length", str(len(body)))
+				for k, v in (headers or {}).items():
+					self.send_header(k, v)
+				self.end_headers()
+				self.wfile.write(body)
+
+			def do_POST(self):
+				if not self.path.rstrip("/").endswith("/chat/completions"):
+					self._send(404, {"error": {"message": "not found"}})
+					return
+				length = int(self.headers.get("Content-Length") or 0)
+				request = json.loads(self.rfile.read(length) or b"{}")
+				roll = random.random()
+				if roll < opts["rate_limit_rate"]:
+					self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}}, {"retry-after": "1"})
+					return
+				if roll < opts["rate_limit_rate"] + opts["error_rate"]:
+					self._send(500, {"error": {"message": "mock failure"}})
+					return
+				messages = request.get("messages") or []
+				try:
+					payload = json.loads(messages[-1]["content"])
+				except (IndexError, KeyError, TypeError, ValueError):
+					payload = {}
+				allowed = payload.get("allowed_hashtags") or []
+				if isinstance(payload.get("articles"), list):
+					articles = payload["articles"]
+					answer = {"articles": [dict(_fake_answer(a, allowed), id=a.get("id")) for a in articles]}
+				else:
+					articles = [payload]
+					answer = _fake_answer(payload, allowed)
+				time.sleep(opts["latency"] + opts["per_article_latency"] * len(articles))
+				prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 3
+				content = json.dumps(answer, ensure_ascii=False)
+				self._send(200, {
+					"id": f"chatcmpl-mock-{int(time.time() * 1000)}",
+					"object": "chat.completion",
+					"created": int(time.time()),
+					"model": request.get("model") or "mock",
+					"choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+					"usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 3, "total_tokens": prompt_tokens + len(content) // 3},
+				})
+
+		server = ThreadingHTTPServer((opts["host"], opts["port"]), Handler)
+		self.stdout.write(self.style.SUCCESS(f"Mock OpenAI API on http://{opts['host']}:{opts['port']}/v1"))
+		try:
+			server.serve_forever()
+		except KeyboardInterrupt:
+			pass
+		finally:
+			server.server_close()
@@ -4,11 +4,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
 from core.models import NewsItem
-
-try:
-	from telegram import Bot
-except Exception:  # pragma: no cover - optional dependency in some envs
-	Bot = None
+from core.telegram_sender import Bot, get_bot
 
 
 class Command(BaseCommand):
@@ -31,7 +27,7 @@ class Command(BaseCommand):
 			self.stdout.write(self.style.WARNING("No news to send"))
 			return
 
-		bot = Bot(token=bot_token)
+		bot = get_bot()
 		sent = 0
 		for n in qs:
 			title = (n.title or "New post").strip()
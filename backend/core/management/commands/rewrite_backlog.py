@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import NewsItem
+from core.tasks import enqueue_rewrites, rewrite_news_items
+
+
+class Command(BaseCommand):
+	help = (
+		"Rewrite and publish pending NewsItems in batch mode (several articles per API request).\n"
+		"By default queues the work on the rewriter queue; use --sync to run it in this process."
+	)
+
+	def add_arguments(self, parser):
+		parser.add_argument("--pack-size", type=int, default=getattr(settings, "REWRITER_BACKLOG_PACK_SIZE", 5), help="Articles per API request")
+		parser.add_argument("--limit", type=int, default=0, help="Process at most N pending items (0 = all)")
+		parser.add_argument("--sync", action="store_true", help="Rewrite in this process instead of queueing tasks")
+
+	def handle(self, *args, **opts):
+		pack_size = max(1, opts["pack_size"])
+		qs = NewsItem.objects.filter(status=NewsItem.Status.PENDING).order_by("id").values_list("id", flat=True)
+		ids = list(qs[: opts["limit"]] if opts["limit"] else qs)
+		if not ids:
+			self.stdout.write("No pending items")
+			return
+		if not opts["sync"]:
+			enqueue_rewrites(ids, pack_size)
+			self.stdout.write(self.style.SUCCESS(f"Queued {len(ids)} item(s) with pack size {pack_size}"))
+			return
+		chunk = pack_size * max(1, int(getattr(settings, "REWRITER_CONCURRENCY", 4)))
+		published = 0
+		for i in range(0, len(ids), chunk):
+			res = rewrite_news_items(ids[i : i + chunk], pack_size)
+			published += res["published"]
+			self.stdout.write(f"{min(i + chunk, len(ids))}/{len(ids)} processed, {published} published")
+		self.stdout.write(self.style.SUCCESS(f"Done: {published} of {len(ids)} published"))
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from core.models import RewriterUsage
+
+
+class Command(BaseCommand):
+	help = "Print rewriter token usage per source (and model) for the last N days."
+
+	def add_arguments(self, parser):
+		parser.add_argument("--days", type=int, default=7, help="Look-back window in days")
+
+	def handle(self, *args, **opts):
+		since = timezone.now() - timedelta(days=opts["days"])
+		rows = (
+			RewriterUsage.objects.filter(created_at__gte=since)
+			.values("source", "model")
+			.annotate(records=Count("id"), prompt=Sum("prompt_tokens"), completion=Sum("completion_tokens"))
+			.order_by("-prompt")
+		)
+		total = 0
+		for row in rows:
+			tokens = (row["prompt"] or 0) + (row["completion"] or 0)
+			total += tokens
+			self.stdout.write(
+				f"{row['source'] or '-'}\t{row['model']}\trecords={row['records']}\tprompt={row['prompt']}\tcompletion={row['completion']}\ttotal={tokens}"
+			)
+		self.stdout.write(self.style.SUCCESS(f"Total tokens over {opts['days']} day(s): {total}"))
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_adbanner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newssource',
+            name='etag',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='newssource',
+            name='last_modified',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
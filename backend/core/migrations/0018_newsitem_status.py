@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_newssource_etag_last_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending rewrite'), ('published', 'Published'), ('rejected', 'Rejected')], db_index=True, default='published', max_length=16),
+        ),
+    ]
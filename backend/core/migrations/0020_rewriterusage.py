@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:03
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_rewritecacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RewriterUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('source', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('model', models.CharField(blank=True, max_length=64)),
+                ('mode', models.CharField(choices=[('single', 'Single article'), ('pack', 'Packed batch'), ('map', 'Chunk summary')], default='single', max_length=8)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'rewriter usage',
+            },
+        ),
+    ]
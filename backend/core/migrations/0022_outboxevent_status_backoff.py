@@ -0,0 +1,28 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+def mark_delivered(apps, schema_editor):
+    OutboxEvent = apps.get_model('core', 'OutboxEvent')
+    OutboxEvent.objects.filter(delivered_at__isnull=False).update(status='delivered')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_outboxevent_next_attempt_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('delivered', 'Delivered'), ('dead', 'Dead letter')], default='pending', max_length=16),
+        ),
+        migrations.RunPython(mark_delivered, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='outbox_pending_due_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_outboxevent_status_backoff'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='authorcolumn',
+            index=models.Index(fields=['-published_at', '-id'], name='column_feed_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsitem',
+            index=models.Index(fields=['status', '-published_at', '-id'], name='news_feed_keyset_idx'),
+        ),
+    ]
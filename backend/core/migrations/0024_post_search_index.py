@@ -0,0 +1,91 @@
+from django.db import migrations
+
+# Frozen copy of the search DDL as of this migration; core.search may change
+# later, this migration must keep creating exactly this schema.
+TABLES = (
+    ('core_newsitem', 'title', 'description'),
+    ('core_authorcolumn', 'title', 'content_body'),
+)
+CONFIGS = ('russian', 'english')
+
+
+def vector_sql(prefix, title, body):
+    return ' || '.join(
+        f"setweight(to_tsvector('{config}', coalesce({prefix}.{column}, '')), '{weight}')"
+        for column, weight in ((title, 'A'), (body, 'B'))
+        for config in CONFIGS
+    )
+
+
+def postgres_sql(table, title, body):
+    return [
+        f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector',
+        f"""CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+BEGIN
+\tNEW.search_vector := {vector_sql('NEW', title, body)};
+\tRETURN NEW;
+END $$ LANGUAGE plpgsql""",
+        f'DROP TRIGGER IF EXISTS {table}_search_insert ON {table}',
+        f"""CREATE TRIGGER {table}_search_insert BEFORE INSERT ON {table}
+FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()""",
+        f'DROP TRIGGER IF EXISTS {table}_search_update ON {table}',
+        f"""CREATE TRIGGER {table}_search_update BEFORE UPDATE OF {title}, {body} ON {table}
+FOR EACH ROW WHEN (OLD.{title} IS DISTINCT FROM NEW.{title} OR OLD.{body} IS DISTINCT FROM NEW.{body})
+EXECUTE FUNCTION {table}_search_vector()""",
+        f'CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector)',
+        f'UPDATE {table} SET search_vector = {vector_sql(table, title, body)}',
+    ]
+
+
+def sqlite_sql(table, title, body):
+    fts = f'{table}_fts'
+    insert = f'INSERT INTO {fts}(rowid, {title}, {body}) VALUES (new.id, new.{title}, new.{body});'
+    delete = f"INSERT INTO {fts}({fts}, rowid, {title}, {body}) VALUES ('delete', old.id, old.{title}, old.{body});"
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+\t{title}, {body}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+)""",
+        f'CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {title}, {body} ON {table} BEGIN {delete} {insert} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def install_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, title, body in TABLES:
+        if vendor == 'postgresql':
+            statements = postgres_sql(table, title, body)
+        elif vendor == 'sqlite':
+            statements = sqlite_sql(table, title, body)
+        else:
+            continue
+        for sql in statements:
+            schema_editor.execute(sql)
+
+
+def uninstall_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, _, _ in TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_insert ON {table}')
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_update ON {table}')
+            schema_editor.execute(f'DROP FUNCTION IF EXISTS {table}_search_vector()')
+            schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+        elif vendor == 'sqlite':
+            for suffix in ('insert', 'delete', 'update'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_search_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_feed_keyset_indexes'),
+    ]
+
+    operations = [
+        # tsvector column + trigger + GIN index on PostgreSQL, FTS5 tables + triggers on SQLite
+        migrations.RunPython(install_search, uninstall_search),
+    ]
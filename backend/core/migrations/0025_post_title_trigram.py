@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# Frozen DDL as of this migration (core.search must not be imported here).
+# Everything is a no-op outside PostgreSQL; TrigramExtension is not used
+# because its reverse queries pg_extension on any backend.
+TABLES = ('core_newsitem', 'core_authorcolumn')
+
+
+def install_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in TABLES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {table}_title_trgm ON {table} USING gin (title gin_trgm_ops)')
+
+
+def uninstall_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in TABLES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_title_trgm')
+    schema_editor.execute('DROP EXTENSION IF EXISTS pg_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_trigram, uninstall_trigram),
+    ]
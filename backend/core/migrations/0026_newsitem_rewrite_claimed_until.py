@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_post_title_trigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsitem',
+            name='rewrite_claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -22,11 +22,19 @@ class NewsSource(TimeStampedModel):
 	# Optional default theme to assign to items ingested from this source
 	default_theme = models.CharField(max_length=16, choices=[("AI", "AI"), ("CRYPTO", "CRYPTO")], blank=True)
 	parse_images = models.BooleanField(default=True)
+	# HTTP validators from the last successful fetch (sent back as conditional GET)
+	etag = models.CharField(max_length=255, blank=True)
+	last_modified = models.CharField(max_length=255, blank=True)
 
 	def __str__(self) -> str:
 		return self.title or self.url
 
 
+class NewsItemQuerySet(models.QuerySet):
+	def published(self) -> "NewsItemQuerySet":
+		return self.filter(status=NewsItem.Status.PUBLISHED)
+
+
 class NewsItem(TimeStampedModel):
 	title = models.CharField(max_length=500)
 	original_url = models.URLField(unique=True)
@@ -43,6 +51,25 @@ class NewsItem(TimeStampedModel):
 	theme = models.CharField(max_length=16, choices=Theme.choices, default=Theme.AI, db_index=True)
 	hashtags = models.ManyToManyField("Hashtag", blank=True, related_name="news_items")
 
+	class Status(models.TextChoices):
+		# Ingested and waiting for the AI rewriter; hidden from the API
+		PENDING = "pending", "Pending rewrite"
+		PUBLISHED = "published", "Published"
+		# Dropped after rewrite (e.g. shorter than ParserConfig.min_chars)
+		REJECTED = "rejected", "Rejected"
+
+	status = models.CharField(max_length=16, choices=Status.choices, default=Status.PUBLISHED, db_index=True)
+	# Lease of the rewriter task working on a pending item (see core.tasks.claim_rewrites)
+	rewrite_claimed_until = models.DateTimeField(null=True, blank=True)
+
+	objects = NewsItemQuerySet.as_manager()
+
+	class Meta:
+		indexes = [
+			# Keyset pagination of the public feed (core.pagination)
+			models.Index(fields=["status", "-published_at", "-id"], name="news_feed_keyset_idx"),
+		]
+
 	def __str__(self) -> str:
 		return self.title
 
@@ -57,6 +84,11 @@ class AuthorColumn(TimeStampedModel):
 	theme = models.CharField(max_length=16, choices=NewsItem.Theme.choices, default=NewsItem.Theme.AI, db_index=True)
 	hashtags = models.ManyToManyField("Hashtag", blank=True, related_name="author_columns")
 
+	class Meta:
+		indexes = [
+			models.Index(fields=["-published_at", "-id"], name="column_feed_keyset_idx"),
+		]
+
 	def __str__(self) -> str:
 		return f"{self.title} — {self.author_name}"
 
@@ -87,20 +119,36 @@ class OutboxEvent(TimeStampedModel):
 		(EVENT_COLUMN_CREATED, "Column created"),
 	]
 
+	class Status(models.TextChoices):
+		PENDING = "pending", "Pending"
+		DELIVERED = "delivered", "Delivered"
+		DEAD = "dead", "Dead letter"
+
 	event_type = models.CharField(max_length=64, choices=EVENT_CHOICES)
 	payload = models.JSONField()
+	status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
 	delivered_at = models.DateTimeField(null=True, blank=True)
 	delivery_attempts = models.PositiveIntegerField(default=0)
 	last_error = models.TextField(blank=True)
+	# Earliest time a worker may (re)try the event: retry backoff, or the
+	# lease of the worker currently delivering it (see core.outbox)
+	next_attempt_at = models.DateTimeField(default=timezone.now)
 
 	class Meta:
 		indexes = [
 			models.Index(fields=["created_at"]),
+			# Keeps the poll cheap: only pending rows are indexed
+			models.Index(
+				fields=["next_attempt_at"],
+				name="outbox_pending_due_idx",
+				condition=models.Q(status="pending"),
+			),
 		]
 
 	def mark_delivered(self) -> None:
+		self.status = self.Status.DELIVERED
 		self.delivered_at = timezone.now()
-		self.save(update_fields=["delivered_at"])
+		self.save(update_fields=["status", "delivered_at"])
 
 
 class TelegramChannel(TimeStampedModel):
@@ -127,6 +175,47 @@ class RewriterConfig(TimeStampedModel):
 		return f"Rewriter ({'on' if self.is_enabled else 'off'})"
 
 
+class RewriteCacheEntry(TimeStampedModel):
+	"""Stored rewriter output keyed by a hash of its normalized inputs.
+
+	See core.rewrite_cache for key derivation, TTL and size-based eviction.
+	"""
+	key = models.CharField(max_length=64, unique=True)
+	model = models.CharField(max_length=64, blank=True)
+	result = models.JSONField()
+	hits = models.PositiveIntegerField(default=0)
+	last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+	expires_at = models.DateTimeField(db_index=True)
+
+	def __str__(self) -> str:
+		return self.key
+
+
+class RewriterUsage(models.Model):
+	"""Token usage of one rewriter API call, attributed to a news source."""
+	class Mode(models.TextChoices):
+		SINGLE = "single", "Single article"
+		PACK = "pack", "Packed batch"
+		MAP = "map", "Chunk summary"
+
+	created_at = models.DateTimeField(default=timezone.now, db_index=True)
+	source = models.CharField(max_length=255, blank=True, db_index=True)
+	model = models.CharField(max_length=64, blank=True)
+	mode = models.CharField(max_length=8, choices=Mode.choices, default=Mode.SINGLE)
+	prompt_tokens = models.PositiveIntegerField(default=0)
+	completion_tokens = models.PositiveIntegerField(default=0)
+
+	class Meta:
+		verbose_name_plural = "rewriter usage"
+
+	@property
+	def total_tokens(self) -> int:
+		return self.prompt_tokens + self.completion_tokens
+
+	def __str__(self) -> str:
+		return f"{self.source or '-'} {self.mode} {self.total_tokens}"
+
+
 class WebsiteSource(TimeStampedModel):
 	"""Generic website source with CSS selectors to extract items.
 
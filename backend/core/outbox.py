@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+import gzip
+import json
+import logging
+from pathlib import Path
+import random
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .models import OutboxEvent
+
+ARCHIVE_CHUNK = 5000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeliveryResult:
+	"""Outcome of one delivery attempt: delivered, skipped for good, or failed with `error`.
+
+	A failure with `retry_after` (receiver flood control) is rescheduled for
+	that delay without using up an attempt.
+	"""
+	ok: bool = False
+	skip: bool = False
+	error: str = ""
+	retry_after: Optional[float] = None
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+	"""Process-wide HTTP session whose pool fits OUTBOX_CONCURRENCY requests in flight."""
+	global _session
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				size = max(1, int(getattr(settings, "OUTBOX_CONCURRENCY", 8)))
+				session = requests.Session()
+				adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size)
+				session.mount("http://", adapter)
+				session.mount("https://", adapter)
+				_session = session
+	return _session
+
+
+def _claimable(now):
+	# Served by the partial index outbox_pending_due_idx
+	return OutboxEvent.objects.filter(status=OutboxEvent.Status.PENDING, next_attempt_at__lte=now)
+
+
+def backoff_delay(attempts: int) -> float:
+	"""Seconds until retry number `attempts`: exponential, capped, with +/-20% jitter."""
+	base = float(getattr(settings, "OUTBOX_BACKOFF_SECONDS", 30))
+	cap = float(getattr(settings, "OUTBOX_BACKOFF_MAX_SECONDS", 6 * 3600))
+	delay = min(cap, base * (2 ** max(0, attempts - 1)))
+	return delay * random.uniform(0.8, 1.2)
+
+
+def claim_events(limit: int, ids: Optional[Iterable[int]] = None) -> List[OutboxEvent]:
+	"""Lease up to `limit` due pending events to this worker for OUTBOX_LEASE_SECONDS.
+
+	The lease is `next_attempt_at` pushed into the future, so it also hands
+	events back to other workers if this one dies mid-delivery. On backends
+	with SKIP LOCKED the candidate rows are locked so concurrent workers pick
+	disjoint batches; elsewhere (SQLite) each row is taken with a conditional
+	UPDATE. `ids` restricts the claim to specific events (push dispatch).
+	"""
+	now = timezone.now()
+	lease_until = now + timedelta(seconds=int(getattr(settings, "OUTBOX_LEASE_SECONDS", 300)))
+	candidates = _claimable(now)
+	if ids is not None:
+		candidates = candidates.filter(id__in=list(ids))
+	if connection.features.has_select_for_update_skip_locked:
+		with transaction.atomic():
+			ids = list(
+				candidates
+				.order_by("next_attempt_at")
+				.select_for_update(skip_locked=True)
+				.values_list("id", flat=True)[:limit]
+			)
+			if ids:
+				OutboxEvent.objects.filter(id__in=ids).update(next_attempt_at=lease_until)
+	else:
+		ids = []
+		for event_id in list(candidates.order_by("next_attempt_at").values_list("id", flat=True)[:limit]):
+			if _claimable(now).filter(id=event_id).update(next_attempt_at=lease_until):
+				ids.append(event_id)
+	return list(OutboxEvent.objects.filter(id__in=ids).order_by("created_at"))
+
+
+def record_result(event: OutboxEvent, result: DeliveryResult) -> bool:
+	"""Persist one attempt: delivered, rescheduled with backoff, or dead after OUTBOX_MAX_ATTEMPTS.
+
+	`event` must come from claim_events: the write is conditional on the
+	lease it holds (still pending, `next_attempt_at` unchanged), so a worker
+	whose lease expired and was re-claimed cannot overwrite the newer
+	attempt. Returns False when the lease was lost.
+	"""
+	now = timezone.now()
+	lease = event.next_attempt_at
+	if result.retry_after is not None and not result.ok:
+		event.next_attempt_at = now + timedelta(seconds=result.retry_after)
+		event.last_error = (result.error or "Retry later")[:500]
+		fields = ["next_attempt_at", "last_error"]
+	else:
+		event.delivery_attempts += 1
+		fields = ["status", "delivery_attempts", "next_attempt_at"]
+		if result.ok or result.skip:
+			event.status = OutboxEvent.Status.DELIVERED
+			event.delivered_at = now
+			event.next_attempt_at = now
+			fields.append("delivered_at")
+		else:
+			event.last_error = (result.error or "Delivery failed")[:500]
+			fields.append("last_error")
+			if event.delivery_attempts >= int(getattr(settings, "OUTBOX_MAX_ATTEMPTS", 12)):
+				event.status = OutboxEvent.Status.DEAD
+				event.next_attempt_at = now
+			else:
+				event.next_attempt_at = now + timedelta(seconds=backoff_delay(event.delivery_attempts))
+	updated = OutboxEvent.objects.filter(
+		pk=event.pk,
+		status=OutboxEvent.Status.PENDING,
+		next_attempt_at=lease,
+	).update(**{name: getattr(event, name) for name in fields})
+	if not updated:
+		logger.warning("Outbox lease lost before recording id=%s", event.pk)
+	return bool(updated)
+
+
+def requeue(queryset) -> int:
+	"""Give dead (or stuck pending) events a fresh set of attempts, due now."""
+	return queryset.exclude(status=OutboxEvent.Status.DELIVERED).update(
+		status=OutboxEvent.Status.PENDING,
+		delivery_attempts=0,
+		next_attempt_at=timezone.now(),
+	)
+
+
+def deliver_concurrently(events: List[OutboxEvent], send: Callable[[OutboxEvent], DeliveryResult]) -> List[DeliveryResult]:
+	"""Run `send` for each event with at most OUTBOX_CONCURRENCY in flight, in input order."""
+	if not events:
+		return []
+
+	def run(event: OutboxEvent) -> DeliveryResult:
+		try:
+			return send(event)
+		except Exception as exc:
+			return DeliveryResult(error=str(exc)[:500])
+		finally:
+			# `send` may read the DB from this worker thread
+			connections.close_all()
+
+	workers = max(1, min(int(getattr(settings, "OUTBOX_CONCURRENCY", 8)), len(events)))
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		return list(pool.map(run, events))
+
+
+def _webhook_batches(events: List[OutboxEvent]) -> List[List[Tuple[OutboxEvent, dict]]]:
+	"""Split events into request bodies of at most WEBHOOK_BATCH_SIZE events / WEBHOOK_BATCH_MAX_BYTES."""
+	size = max(1, int(getattr(settings, "WEBHOOK_BATCH_SIZE", 0)))
+	max_bytes = int(getattr(settings, "WEBHOOK_BATCH_MAX_BYTES", 256 * 1024))
+	batches: List[List[Tuple[OutboxEvent, dict]]] = []
+	current: List[Tuple[OutboxEvent, dict]] = []
+	used = 0
+	for event in events:
+		item = {"id": event.pk, "event_type": event.event_type, "payload": event.payload}
+		length = len(json.dumps(item, ensure_ascii=False).encode("utf-8"))
+		if current and (len(current) >= size or used + length > max_bytes):
+			batches.append(current)
+			current, used = [], 0
+		current.append((event, item))
+		used += length
+	if current:
+		batches.append(current)
+	return batches
+
+
+def _post_webhook_batch(url: str, batch: List[Tuple[OutboxEvent, dict]]) -> Dict[int, DeliveryResult]:
+	"""POST {"events": [...]} and read per-event acknowledgements.
+
+	The receiver answers {"results": [{"id": <id>, "ok": true} | {"id": <id>,
+	"ok": false, "error": "..."}]}; ids it does not mention count as failed.
+	A 2xx answer without a "results" list acknowledges the whole batch.
+	"""
+	ids = [event.pk for event, _ in batch]
+	try:
+		resp = get_session().post(
+			url,
+			json={"events": [item for _, item in batch]},
+			timeout=float(getattr(settings, "OUTBOX_HTTP_TIMEOUT", 10)),
+		)
+	except requests.RequestException as exc:
+		error = f"WEBHOOK {type(exc).__name__}: {str(exc)[:300]}"
+		return {pk: DeliveryResult(error=error) for pk in ids}
+	if not 200 <= resp.status_code < 300:
+		return {pk: DeliveryResult(error=f"WEBHOOK HTTP {resp.status_code}") for pk in ids}
+	try:
+		acks = resp.json().get("results")
+	except (ValueError, AttributeError):
+		acks = None
+	if not isinstance(acks, list):
+		return {pk: DeliveryResult(ok=True) for pk in ids}
+	results = {pk: DeliveryResult(error="WEBHOOK no ack") for pk in ids}
+	for ack in acks:
+		if not isinstance(ack, dict) or ack.get("id") not in results:
+			continue
+		if ack.get("ok"):
+			results[ack["id"]] = DeliveryResult(ok=True)
+		else:
+			results[ack["id"]] = DeliveryResult(error=f"WEBHOOK {str(ack.get('error') or 'rejected')[:300]}")
+	return results
+
+
+def post_webhook_batches(url: str, events: List[OutboxEvent]) -> Dict[int, DeliveryResult]:
+	"""Deliver events to the webhook in batches (several requests in flight); results by event id."""
+	batches = _webhook_batches(events)
+	results: Dict[int, DeliveryResult] = {}
+	if not batches:
+		return results
+	workers = max(1, min(int(getattr(settings, "OUTBOX_CONCURRENCY", 8)), len(batches)))
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		for part in pool.map(lambda batch: _post_webhook_batch(url, batch), batches):
+			results.update(part)
+	return results
+
+
+def publish_nowait(task, *args) -> bool:
+	"""Queue `task` from a request path with a single, time-boxed publish.
+
+	Opens its own broker connection bounded by CELERY_DISPATCH_TIMEOUT and
+	neither reconnects nor retries, so a broker outage costs the caller
+	milliseconds instead of the default retry loop. Returns False when the
+	message could not be sent.
+	"""
+	from celery import current_app
+
+	timeout = settings.CELERY_DISPATCH_TIMEOUT
+	try:
+		with current_app.connection_for_write(
+			connect_timeout=timeout,
+			transport_options={
+				"socket_connect_timeout": timeout,
+				"socket_timeout": timeout,
+				"retry_on_timeout": False,
+				"max_retries": 0,
+			},
+		) as conn:
+			task.apply_async(args, retry=False, ignore_result=True, connection=conn)
+	except Exception:
+		return False
+	return True
+
+
+def dispatch_on_commit(event_ids: List[int]) -> None:
+	"""Queue delivery of freshly written events once the surrounding transaction commits.
+
+	The publish is a single attempt (see publish_nowait); if the broker is
+	unreachable the events simply wait for the deliver_outbox safety sweep.
+	"""
+	event_ids = [pk for pk in event_ids if pk]
+	if not event_ids:
+		return
+
+	def dispatch() -> None:
+		from .tasks import deliver_outbox_events
+
+		if not publish_nowait(deliver_outbox_events, event_ids):
+			logger.warning("Outbox dispatch failed; left for the sweep ids=%s", event_ids[:10])
+
+	transaction.on_commit(dispatch)
+
+
+def _archive_row(event: OutboxEvent) -> dict:
+	return {
+		"id": event.pk,
+		"event_type": event.event_type,
+		"payload": event.payload,
+		"status": event.status,
+		"created_at": event.created_at.isoformat() if event.created_at else None,
+		"delivered_at": event.delivered_at.isoformat() if event.delivered_at else None,
+		"delivery_attempts": event.delivery_attempts,
+		"last_error": event.last_error,
+	}
+
+
+def archive_events(now=None) -> Dict[str, int]:
+	"""Move old finished events into gzipped JSON Lines files and delete them.
+
+	Delivered events go after OUTBOX_RETENTION_DAYS, dead ones after
+	OUTBOX_DEAD_RETENTION_DAYS (0 keeps them). Each run appends to one file
+	per day in OUTBOX_ARCHIVE_DIR; rows are deleted only after their chunk
+	was written, so a crash at worst archives a chunk twice.
+	"""
+	now = now or timezone.now()
+	archive_dir = Path(getattr(settings, "OUTBOX_ARCHIVE_DIR", "archive/outbox"))
+	rules = (
+		(OutboxEvent.Status.DELIVERED, int(getattr(settings, "OUTBOX_RETENTION_DAYS", 14))),
+		(OutboxEvent.Status.DEAD, int(getattr(settings, "OUTBOX_DEAD_RETENTION_DAYS", 90))),
+	)
+	counts: Dict[str, int] = {}
+	path = archive_dir / f"outbox-{now:%Y%m%d}.jsonl.gz"
+	for status, days in rules:
+		counts[str(status)] = 0
+		if days <= 0:
+			continue
+		old = OutboxEvent.objects.filter(status=status, created_at__lt=now - timedelta(days=days))
+		while True:
+			chunk = list(old.order_by("id")[:ARCHIVE_CHUNK])
+			if not chunk:
+				break
+			archive_dir.mkdir(parents=True, exist_ok=True)
+			with gzip.open(path, "at", encoding="utf-8") as fh:
+				for event in chunk:
+					fh.write(json.dumps(_archive_row(event), ensure_ascii=False) + "\n")
+			OutboxEvent.objects.filter(id__in=[event.pk for event in chunk]).delete()
+			counts[str(status)] += len(chunk)
+	if any(counts.values()):
+		logger.info("Outbox archived %s into %s", counts, path)
+	return counts
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import heapq
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode(data) -> str:
+	raw = json.dumps(data, separators=(",", ":"))
+	return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode(value: str):
+	raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+	return json.loads(raw.decode("utf-8"))
+
+
+def _position(data) -> Tuple:
+	published_at = parse_datetime(data["p"])
+	if published_at is None:
+		raise ValueError("published_at")
+	return published_at, int(data["i"])
+
+
+def encode_cursor(published_at, pk: int) -> str:
+	"""Opaque cursor for the position right after (published_at, pk)."""
+	return _encode({"p": published_at.isoformat(), "i": pk})
+
+
+def decode_cursor(value: str) -> Tuple:
+	"""(published_at, pk) from a cursor; raises NotFound for anything malformed."""
+	try:
+		return _position(_decode(value))
+	except (binascii.Error, ValueError, TypeError, KeyError, UnicodeDecodeError):
+		raise NotFound("Invalid cursor.")
+
+
+def encode_positions(positions: Dict[str, Optional[Tuple]]) -> str:
+	"""Composite cursor: one (published_at, pk) position per merged feed, None = not started."""
+	return _encode({
+		name: {"p": pos[0].isoformat(), "i": pos[1]} if pos else None
+		for name, pos in positions.items()
+	})
+
+
+def decode_positions(value: str, names) -> Dict[str, Optional[Tuple]]:
+	"""Positions for `names` from encode_positions(); empty value = start of every feed."""
+	if not value:
+		return {name: None for name in names}
+	try:
+		data = _decode(value)
+		return {name: _position(data[name]) if data.get(name) else None for name in names}
+	except (binascii.Error, ValueError, TypeError, KeyError, AttributeError, UnicodeDecodeError):
+		raise NotFound("Invalid cursor.")
+
+
+def after_position(queryset, published_at, pk: int):
+	"""Rows strictly after (published_at, pk) in ("-published_at", "-id") order.
+
+	The redundant published_at__lte bound lets the database start the
+	(published_at, id) index range at the cursor instead of filtering.
+	"""
+	return queryset.filter(published_at__lte=published_at).filter(
+		Q(published_at__lt=published_at) | Q(id__lt=pk)
+	)
+
+
+class HybridPagination(PageNumberPagination):
+	"""Page numbers by default, keyset pagination when `?cursor=` is passed.
+
+	Cursor mode walks ("-published_at", "-id") with an opaque cursor, so it
+	needs no COUNT(*) or OFFSET and page 1000 costs the same as page 1. Start
+	with an empty `?cursor=` and follow `next`. The view's queryset must be
+	ordered by ("-published_at", "-id"); filters such as `q` and `theme` are
+	applied before paging and carried over in the `next` link.
+	"""
+	cursor_query_param = "cursor"
+
+	def paginate_queryset(self, queryset, request, view=None):
+		self.cursor_mode = self.cursor_query_param in request.query_params
+		if not self.cursor_mode:
+			return super().paginate_queryset(queryset, request, view)
+		self.request = request
+		page_size = self.get_page_size(request)
+		if not page_size:
+			return None
+		rows = list(self.window(queryset, request))
+		self.next_cursor: Optional[str] = None
+		if len(rows) > page_size:
+			rows = rows[:page_size]
+			last = rows[-1]
+			self.next_cursor = encode_cursor(last.published_at, last.pk)
+		return rows
+
+	def window(self, queryset, request):
+		"""Rows a cursor request covers (plus one), or the whole queryset in page mode."""
+		if self.cursor_query_param not in request.query_params:
+			return queryset
+		value = request.query_params.get(self.cursor_query_param) or ""
+		if value:
+			queryset = after_position(queryset, *decode_cursor(value))
+		return queryset[: (self.get_page_size(request) or 0) + 1]
+
+	def get_next_link(self):
+		if not self.cursor_mode:
+			return super().get_next_link()
+		if self.next_cursor is None:
+			return None
+		url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+		return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+	def get_paginated_response(self, data):
+		if not self.cursor_mode:
+			return super().get_paginated_response(data)
+		return Response(OrderedDict([
+			("next", self.get_next_link()),
+			("results", data),
+		]))
+
+
+class MergedKeysetPagination:
+	"""Keyset pagination over several ("-published_at", "-id") feeds merged into one.
+
+	Each page reads at most page_size + 1 rows per feed after that feed's own
+	position (one query per feed, whatever the depth) and merges them with
+	heapq.merge. The opaque `?cursor=` holds every feed's last served
+	position, so rows that tie across feeds are neither repeated nor skipped.
+	There are no page numbers: start without a cursor and follow `next`.
+	"""
+	cursor_query_param = "cursor"
+	page_size = 50
+
+	def window(self, querysets: Dict[str, object], request) -> Dict[str, object]:
+		"""The slice of each feed the request's page is merged from."""
+		value = request.query_params.get(self.cursor_query_param) or ""
+		positions = decode_positions(value, querysets)
+		result = {}
+		for name, qs in querysets.items():
+			if positions[name]:
+				qs = after_position(qs, *positions[name])
+			result[name] = qs[: self.page_size + 1]
+		return result
+
+	def paginate_querysets(self, querysets: Dict[str, object], request) -> List[Tuple[str, object]]:
+		"""(feed name, row) pairs of one page, newest first."""
+		self.request = request
+		positions = decode_positions(request.query_params.get(self.cursor_query_param) or "", querysets)
+		streams = [
+			[(name, row) for row in qs]
+			for name, qs in self.window(querysets, request).items()
+		]
+		merged = list(heapq.merge(
+			*streams,
+			key=lambda item: (item[1].published_at, item[1].pk),
+			reverse=True,
+		))
+		page = merged[: self.page_size]
+		self.next_cursor: Optional[str] = None
+		if len(merged) > self.page_size:
+			for name, row in page:
+				positions[name] = (row.published_at, row.pk)
+			self.next_cursor = encode_positions(positions)
+		return page
+
+	def get_next_link(self) -> Optional[str]:
+		if self.next_cursor is None:
+			return None
+		url = remove_query_param(self.request.build_absolute_uri(), "page")
+		return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+	def get_paginated_response(self, data) -> Response:
+		return Response(OrderedDict([
+			("next", self.get_next_link()),
+			("results", data),
+		]))
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+
+try:
+	import redis
+except Exception:  # optional: falls back to per-process buckets
+	redis = None
+
+logger = logging.getLogger(__name__)
+
+# Atomic refill-and-take on a Redis hash {tokens, ts}; returns seconds to wait (0 = granted)
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or capacity
+local ts = tonumber(data[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+	tokens = tokens - requested
+else
+	wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def _get_redis():
+	global _redis_client
+	url = getattr(settings, "RATE_LIMIT_REDIS_URL", "") or ""
+	if not url or redis is None:
+		return None
+	if _redis_client is None:
+		with _redis_lock:
+			if _redis_client is None:
+				_redis_client = redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=5)
+	return _redis_client
+
+
+class TokenBucket:
+	"""Token bucket of `per_minute` tokens, shared across workers through Redis.
+
+	Capacity equals one minute of budget. Without RATE_LIMIT_REDIS_URL (or if
+	Redis is unreachable) the bucket is enforced per process only. A bucket
+	with per_minute <= 0 is unlimited.
+	"""
+
+	def __init__(self, name: str, per_minute: float) -> None:
+		self.name = name
+		self.per_minute = float(per_minute or 0)
+		self._lock = threading.Lock()
+		self._tokens = self.per_minute
+		self._ts = time.monotonic()
+		self._paused_until = 0.0
+
+	@property
+	def key(self) -> str:
+		return f"ratelimit:{self.name}"
+
+	def _take_local(self, amount: float) -> float:
+		rate = self.per_minute / 60.0
+		with self._lock:
+			now = time.monotonic()
+			self._tokens = min(self.per_minute, self._tokens + (now - self._ts) * rate)
+			self._ts = now
+			if self._tokens >= amount:
+				self._tokens -= amount
+				return 0.0
+			return (amount - self._tokens) / rate
+
+	def _take(self, amount: float) -> float:
+		client = _get_redis()
+		if client is not None:
+			try:
+				return float(client.eval(_TAKE_SCRIPT, 1, self.key, self.per_minute / 60.0, self.per_minute, amount))
+			except Exception:
+				logger.warning("Rate limiter Redis unavailable; using local bucket name=%s", self.name)
+		return self._take_local(amount)
+
+	def paused_for(self) -> float:
+		"""Seconds left of a pause requested via `pause()` (e.g. from Retry-After)."""
+		until = self._paused_until
+		client = _get_redis()
+		if client is not None:
+			try:
+				until = max(until, float(client.get(f"{self.key}:pause") or 0))
+			except Exception:
+				pass
+		return max(0.0, until - time.time())
+
+	def pause(self, seconds: float) -> None:
+		"""Hold every consumer of this bucket for `seconds`."""
+		if seconds <= 0:
+			return
+		until = time.time() + seconds
+		self._paused_until = max(self._paused_until, until)
+		client = _get_redis()
+		if client is not None:
+			try:
+				client.set(f"{self.key}:pause", str(until), ex=int(seconds) + 1)
+			except Exception:
+				pass
+
+	def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> bool:
+		"""Block until `amount` tokens are available; False if `timeout` elapses first."""
+		if self.per_minute <= 0:
+			return True
+		amount = min(float(amount), self.per_minute)
+		deadline = None if timeout is None else time.monotonic() + timeout
+		while True:
+			wait = self.paused_for()
+			if not wait:
+				wait = self._take(amount)
+				if not wait:
+					return True
+			if deadline is not None and time.monotonic() + wait > deadline:
+				return False
+			time.sleep(min(wait, 5.0))
+
+
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def get_bucket(name: str, per_minute: float) -> TokenBucket:
+	"""Process-wide bucket instance for `name` (recreated if the limit changes)."""
+	bucket = _buckets.get(name)
+	if bucket is None or bucket.per_minute != float(per_minute or 0):
+		bucket = TokenBucket(name, per_minute)
+		_buckets[name] = bucket
+	return bucket
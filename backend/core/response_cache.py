@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .versions import get_versions
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(view_name: str, request) -> str:
+	# Host and scheme are part of the key: paginated bodies embed absolute links
+	params = sorted(
+		(name, value)
+		for name in request.query_params
+		for value in request.query_params.getlist(name)
+	)
+	raw = f"{request.scheme}://{request.get_host()}{request.path}?{params!r}"
+	return f"resp:{view_name}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+
+# Headers stored with the body, so cached responses keep e.g. the validators
+# (core.conditional) of the data they actually carry
+STORED_HEADERS = ("ETag", "Last-Modified")
+
+
+def _respond(entry: dict, state: str) -> Response:
+	response = Response(entry["data"])
+	for name, value in entry.get("headers", {}).items():
+		response[name] = value
+	response["X-Cache"] = state
+	return response
+
+
+def _wait_for(key: str, versions: Tuple[int, ...]) -> Optional[dict]:
+	"""Poll for an entry another request is building (cold key, no stale copy)."""
+	deadline = time.monotonic() + float(getattr(settings, "RESPONSE_CACHE_WAIT_SECONDS", 2))
+	while time.monotonic() < deadline:
+		time.sleep(0.05)
+		entry = cache.get(key)
+		if entry and entry["versions"] == versions:
+			return entry
+	return None
+
+
+def _store(key: str, entry: dict) -> None:
+	try:
+		cache.set(key, entry, int(getattr(settings, "RESPONSE_CACHE_STALE_SECONDS", 3600)))
+	except Exception:
+		logger.warning("Response cache unavailable; entry not stored", exc_info=True)
+
+
+def _release(lock: str) -> None:
+	try:
+		cache.delete(lock)
+	except Exception:
+		# The lock expires after RESPONSE_CACHE_LOCK_SECONDS anyway
+		pass
+
+
+def cached_response(namespaces: Sequence[str], view_name: str, request, build: Callable[[], Response]) -> Response:
+	"""Serve `build()`'s data from the cache while `namespaces` are unchanged.
+
+	Entries carry the namespace versions they were built under (core.versions,
+	bumped by model signals) and a freshness deadline of RESPONSE_CACHE_SECONDS.
+	A stale or outdated entry is rebuilt by exactly one request, holding a
+	cache lock; the others keep serving the old data meanwhile. On a cold key
+	they wait up to RESPONSE_CACHE_WAIT_SECONDS for that request instead of
+	all querying the database. Only 200 responses are stored.
+	"""
+	ttl = int(getattr(settings, "RESPONSE_CACHE_SECONDS", 300))
+	if ttl <= 0 or request.method != "GET":
+		return build()
+	try:
+		versions = get_versions(namespaces)
+		key = cache_key(view_name, request)
+		entry = cache.get(key)
+	except Exception:
+		logger.warning("Response cache unavailable; serving uncached", exc_info=True)
+		return build()
+	current = bool(entry) and entry["versions"] == versions
+	if current and entry["fresh_until"] > time.time():
+		return _respond(entry, "HIT")
+	lock = f"{key}:lock"
+	try:
+		locked = cache.add(lock, 1, int(getattr(settings, "RESPONSE_CACHE_LOCK_SECONDS", 10)))
+		if not locked:
+			if entry:
+				return _respond(entry, "STALE")
+			waited = _wait_for(key, versions)
+			if waited:
+				return _respond(waited, "HIT")
+	except Exception:
+		logger.warning("Response cache unavailable; serving uncached", exc_info=True)
+		return build()
+	if not locked:
+		return build()
+	try:
+		response = build()
+		if response.status_code == 200:
+			_store(key, {
+				"versions": versions,
+				"fresh_until": time.time() + ttl,
+				"data": response.data,
+				"headers": {name: response[name] for name in STORED_HEADERS if response.has_header(name)},
+			})
+		response["X-Cache"] = "MISS"
+		return response
+	finally:
+		_release(lock)
+
+
+class CachedResponseMixin:
+	"""Cache a read-only view's GET responses under `cache_namespaces` (see cached_response).
+
+	`response_headers`, set per request by outer mixins, are added to built
+	responses and stored with them (see STORED_HEADERS).
+	"""
+	cache_namespaces: Tuple[str, ...] = ()
+	response_headers: Dict[str, str] = {}
+
+	def get(self, request, *args, **kwargs):
+		def build() -> Response:
+			response = super(CachedResponseMixin, self).get(request, *args, **kwargs)
+			if response.status_code == 200:
+				for name, value in self.response_headers.items():
+					response[name] = value
+			return response
+
+		return cached_response(self.cache_namespaces, type(self).__name__, request, build)
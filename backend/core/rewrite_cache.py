@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import logging
+import re
+from datetime import timedelta
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from .models import RewriteCacheEntry
+
+logger = logging.getLogger(__name__)
+
+HITS_KEY = "rewrite_cache:hits"
+MISSES_KEY = "rewrite_cache:misses"
+
+
+def _normalize(value: str) -> str:
+	text = re.sub(r"<[^>]+>", " ", value or "")
+	text = html.unescape(text)
+	return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def make_key(title: str, content: str, prompt: str, model: str, allowed_hashtags: Iterable[str]) -> str:
+	"""Hash of everything that determines the rewriter output.
+
+	Title/content are normalized (markup, entities, whitespace, case) so the
+	same press release arriving via RSS, a website and Telegram shares a key.
+	"""
+	material = json.dumps(
+		[_normalize(title), _normalize(content), prompt or "", model or "", sorted(set(allowed_hashtags or []))],
+		ensure_ascii=False,
+	)
+	return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _count(key: str) -> None:
+	try:
+		cache.incr(key)
+	except ValueError:
+		cache.add(key, 1, None)
+	except Exception:
+		pass
+
+
+def lookup(key: str) -> Optional[Dict[str, object]]:
+	"""Return a cached rewrite (and record a hit) or None (and record a miss)."""
+	now = timezone.now()
+	entry = RewriteCacheEntry.objects.filter(key=key, expires_at__gt=now).only("id", "result").first()
+	if entry is None or not isinstance(entry.result, dict):
+		_count(MISSES_KEY)
+		return None
+	RewriteCacheEntry.objects.filter(pk=entry.pk).update(hits=F("hits") + 1, last_used_at=now)
+	_count(HITS_KEY)
+	return dict(entry.result)
+
+
+def store(key: str, result: Dict[str, object], model: str) -> None:
+	ttl_days = int(getattr(settings, "REWRITE_CACHE_TTL_DAYS", 30))
+	now = timezone.now()
+	try:
+		RewriteCacheEntry.objects.update_or_create(
+			key=key,
+			defaults={
+				"result": result,
+				"model": (model or "")[:64],
+				"last_used_at": now,
+				"expires_at": now + timedelta(days=ttl_days),
+			},
+		)
+	except IntegrityError:
+		# Another worker stored the same key concurrently
+		pass
+	except Exception:
+		logger.exception("Rewrite cache store failed")
+
+
+def stats() -> Dict[str, int]:
+	try:
+		hits = int(cache.get(HITS_KEY) or 0)
+		misses = int(cache.get(MISSES_KEY) or 0)
+	except Exception:
+		hits = misses = 0
+	return {"hits": hits, "misses": misses, "entries": RewriteCacheEntry.objects.count()}
+
+
+def prune() -> Dict[str, int]:
+	"""Drop expired entries, then the least recently used ones above the size cap."""
+	max_entries = int(getattr(settings, "REWRITE_CACHE_MAX_ENTRIES", 10000))
+	expired, _ = RewriteCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+	evicted = 0
+	if max_entries > 0:
+		stale = list(
+			RewriteCacheEntry.objects.order_by("-last_used_at", "-id").values_list("id", flat=True)[max_entries:]
+		)
+		for i in range(0, len(stale), 1000):
+			deleted, _ = RewriteCacheEntry.objects.filter(id__in=stale[i : i + 1000]).delete()
+			evicted += deleted
+	return {"expired": expired, "evicted": evicted}
@@ -1,16 +1,78 @@
 from __future__ import annotations
 
 import json
-from typing import Dict, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, List, Tuple
 import re
+import threading
 import time
 
 import logging
+import httpx
 from django.conf import settings
+from django.db import connections
 from openai import OpenAI
-from openai import BadRequestError, APITimeoutError, RateLimitError
+from openai import APIConnectionError, BadRequestError, InternalServerError, RateLimitError
 
-from .models import RewriterConfig, Hashtag
+from . import rewrite_cache
+from .circuit_breaker import HALF_OPEN, OPEN, CircuitBreaker
+from .config_snapshot import get_active_hashtag_slugs, get_rewriter_config
+from .models import RewriterConfig, RewriterUsage
+from .ratelimit import get_bucket
+from .tokens import count_tokens, split_tokens, strip_markup, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[Tuple[str, Optional[str]], OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key: str, base_url: Optional[str] = None) -> OpenAI:
+	"""One pooled OpenAI client per process (keep-alive connections are reused).
+
+	Per-attempt timeouts are applied with `client.with_options(timeout=...)`,
+	which shares the same HTTP connection pool.
+	"""
+	key = (api_key, base_url)
+	client = _clients.get(key)
+	if client is None:
+		with _clients_lock:
+			client = _clients.get(key)
+			if client is None:
+				size = max(2, int(getattr(settings, "REWRITER_CONCURRENCY", 4)) * 2)
+				http_client = httpx.Client(limits=httpx.Limits(max_connections=size, max_keepalive_connections=size))
+				client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0, http_client=http_client)
+				_clients[key] = client
+	return client
+
+
+def get_breaker() -> CircuitBreaker:
+	"""Circuit breaker guarding calls to the LLM provider (state shared via cache)."""
+	return CircuitBreaker(
+		"rewriter",
+		threshold=int(getattr(settings, "REWRITER_BREAKER_THRESHOLD", 5)),
+		reset_seconds=float(getattr(settings, "REWRITER_BREAKER_RESET_SECONDS", 120)),
+	)
+
+
+def _acquire_budget(estimated_tokens: int) -> None:
+	"""Wait for the global requests/tokens-per-minute budget (shared via Redis)."""
+	get_bucket("openai:rpm", getattr(settings, "REWRITER_RPM", 0)).acquire(1)
+	get_bucket("openai:tpm", getattr(settings, "REWRITER_TPM", 0)).acquire(estimated_tokens)
+
+
+def _retry_after_seconds(exc: Exception) -> Optional[float]:
+	"""Read retry-after-ms / retry-after hints from an API error response."""
+	response = getattr(exc, "response", None)
+	headers = getattr(response, "headers", None) or {}
+	try:
+		if headers.get("retry-after-ms"):
+			return float(headers["retry-after-ms"]) / 1000.0
+		if headers.get("retry-after"):
+			return float(headers["retry-after"])
+	except (TypeError, ValueError):
+		return None
+	return None
 
 
 def get_active_config() -> Optional[RewriterConfig]:
@@ -18,10 +80,21 @@ def get_active_config() -> Optional[RewriterConfig]:
     from django.conf import settings as dj_settings
     if not getattr(dj_settings, "REWRITER_ENABLED", False):
         return None
-    cfg = RewriterConfig.objects.order_by("-updated_at").first()
+    cfg = get_rewriter_config()
     return cfg if cfg and cfg.is_enabled else None
 
 
+def rewriter_enabled() -> bool:
+	"""True when articles should go through the AI rewriter.
+
+	False while the provider circuit is open, so ingestion publishes the
+	original text right away instead of queueing work that would fail fast.
+	"""
+	if not (get_active_config() and getattr(settings, "OPENAI_API_KEY", None)):
+		return False
+	return get_breaker().state() != OPEN
+
+
 def _lenient_json_parse(text: str) -> Optional[Dict[str, str]]:
 	"""Attempts to parse JSON even if the model wrapped it or added prose."""
 	try:
@@ -41,44 +114,177 @@ def _lenient_json_parse(text: str) -> Optional[Dict[str, str]]:
 	return None
 
 
-def rewrite_article(title: str, content: str) -> Optional[Dict[str, object]]:
-	cfg = get_active_config()
-	if not cfg:
-		return None
-	api_key = getattr(settings, "OPENAI_API_KEY", None)
-	if not api_key:
-		return None
+def _output_from(data: Dict[str, object], title: str, content: str) -> Dict[str, object]:
+	"""Normalize one parsed model answer, keeping the original text for missing keys."""
+	out: Dict[str, object] = {"title": data.get("title") or title, "content": data.get("content") or content}
+	if isinstance(data.get("hashtags"), list):
+		out["hashtags"] = [str(s).strip().lower() for s in data.get("hashtags") if s]
+	theme_val = str(data.get("theme") or "").strip().upper()
+	if theme_val in ("AI", "CRYPTO"):
+		out["theme"] = theme_val
+	return out
 
-	# Configurable
-	base_url = getattr(settings, "OPENAI_BASE_URL", None)
-	base_timeout = float(getattr(settings, "REWRITER_TIMEOUT", 30.0))
-	max_timeout = float(getattr(settings, "REWRITER_MAX_TIMEOUT", 90.0))
-	attempts = int(getattr(settings, "REWRITER_ATTEMPTS", 6))
-	backoff = float(getattr(settings, "REWRITER_BACKOFF_SECONDS", 5.0))
-	logger = logging.getLogger(__name__)
 
+def _system_prompt(cfg: RewriterConfig) -> str:
 	system_prompt = cfg.prompt or (
 		"You rewrite and clean AI/crypto articles into concise Russian. Return json with keys 'title', 'content', 'hashtags' (array of slugs), and 'theme'. 'theme' MUST be one of: AI or CRYPTO. Hashtags must be chosen ONLY from the allowed set provided."
 	)
 	# Ensure the word 'json' (lowercase) is present to satisfy response_format requirements
 	if "json" not in system_prompt.lower():
 		system_prompt = system_prompt.strip() + " Return json object with keys 'title' and 'content'."
-	# No trimming by env; send full content (API timeouts still apply)
+	return system_prompt
+
+
+def _record_usage(response, model: str, source: str, mode: str, estimated_prompt: int = 0, shares: Optional[Dict[str, float]] = None) -> None:
+	"""Store token usage of one API call; `shares` splits a packed call between sources."""
+	usage = getattr(response, "usage", None)
+	prompt = int(getattr(usage, "prompt_tokens", 0) or 0) or estimated_prompt
+	completion = int(getattr(usage, "completion_tokens", 0) or 0)
+	shares = shares or {source: 1.0}
+	try:
+		RewriterUsage.objects.bulk_create([
+			RewriterUsage(
+				source=(src or "")[:255],
+				model=(model or "")[:64],
+				mode=mode,
+				prompt_tokens=round(prompt * share),
+				completion_tokens=round(completion * share),
+			)
+			for src, share in shares.items()
+		])
+	except Exception:
+		logger.exception("Rewriter usage record failed")
+
+
+def _input_budget() -> int:
+	return int(getattr(settings, "REWRITER_INPUT_TOKENS", 3000))
+
+
+def _summarize_chunks(cfg: RewriterConfig, api_key: str, chunks: List[str], budget: int, source: str) -> str:
+	"""Map step of map-reduce: condense each chunk to its share of `budget`.
+
+	One attempt per chunk; a chunk that cannot be summarized is truncated
+	instead, so the reduce step always gets something. Chunks run one after
+	another: callers already hold one of REWRITER_CONCURRENCY article slots,
+	and a pool here would multiply the requests in flight.
+	"""
+	per_chunk = max(100, budget // len(chunks))
+	client = get_client(api_key, getattr(settings, "OPENAI_BASE_URL", None)).with_options(
+		timeout=float(getattr(settings, "REWRITER_TIMEOUT", 30.0))
+	)
+	breaker = get_breaker()
+	system = (
+		"Condense this fragment of a longer article. Keep every fact, name, number and quote; "
+		f"drop boilerplate. Answer in plain text, at most {per_chunk} tokens, in the fragment's language."
+	)
+
+	def summarize(chunk: str):
+		fallback = truncate_tokens(chunk, per_chunk, cfg.model)
+		if not breaker.allow():
+			return fallback, None
+		try:
+			_acquire_budget(count_tokens(chunk, cfg.model) + per_chunk)
+			response = client.chat.completions.create(
+				model=cfg.model,
+				messages=[{"role": "system", "content": system}, {"role": "user", "content": chunk}],
+				max_tokens=per_chunk,
+			)
+		except (APIConnectionError, InternalServerError) as e:
+			breaker.record_failure()
+			logger.warning("Rewriter chunk summary failed: %s", e)
+			return fallback, None
+		except Exception as e:
+			logger.warning("Rewriter chunk summary failed: %s", e)
+			return fallback, None
+		breaker.record_success()
+		text = (response.choices[0].message.content or "").strip()
+		return (truncate_tokens(text, per_chunk, cfg.model) if text else fallback), response
+
+	results = [summarize(chunk) for chunk in chunks]
+	for _, response in results:
+		if response is not None:
+			_record_usage(response, cfg.model, source, RewriterUsage.Mode.MAP)
+	return "\n\n".join(text for text, _ in results)
+
+
+def _prepare_content(cfg: RewriterConfig, api_key: str, content: str, source: str) -> str:
+	"""Plain-text input that fits REWRITER_INPUT_TOKENS.
+
+	Inputs up to REWRITER_MAP_REDUCE_TOKENS over budget are truncated at a
+	paragraph boundary; longer ones are summarized chunk by chunk first.
+	"""
+	text = strip_markup(content)
+	budget = _input_budget()
+	tokens = count_tokens(text, cfg.model)
+	if budget <= 0 or tokens <= budget:
+		return text
+	if tokens <= int(getattr(settings, "REWRITER_MAP_REDUCE_TOKENS", 6000)):
+		return truncate_tokens(text, budget, cfg.model)
+	chunk_tokens = int(getattr(settings, "REWRITER_CHUNK_TOKENS", 2000))
+	chunks = split_tokens(text, chunk_tokens, cfg.model)[: int(getattr(settings, "REWRITER_MAX_CHUNKS", 8))]
+	logger.info("Rewriter map-reduce: %s tokens in %s chunks (source=%s)", tokens, len(chunks), source)
+	return truncate_tokens(_summarize_chunks(cfg, api_key, chunks, budget, source), budget, cfg.model)
+
+
+def rewrite_article(title: str, content: str, source: str = "") -> Optional[Dict[str, object]]:
+	"""Rewrite one article; `source` attributes the token usage (e.g. NewsItem.source_name)."""
+	cfg = get_active_config()
+	if not cfg:
+		return None
+	api_key = getattr(settings, "OPENAI_API_KEY", None)
+	if not api_key:
+		return None
+
+	system_prompt = _system_prompt(cfg)
 	# Provide active hashtag slugs as the allowed enum set
-	allowed = list(Hashtag.objects.filter(is_active=True).values_list("slug", flat=True))
+	allowed = list(get_active_hashtag_slugs())
+	cache_key = rewrite_cache.make_key(title, content, system_prompt, cfg.model, allowed)
+	cached = rewrite_cache.lookup(cache_key)
+	if cached is not None:
+		return cached
+
+	# Markup stripped and fitted to the token budget: long raw inputs are what
+	# drive latency and timeouts
 	user_payload = {
-		"title": title,
-		"content": content,
+		"title": strip_markup(title),
+		"content": _prepare_content(cfg, api_key, content, source),
 		"allowed_hashtags": allowed,
 		"allowed_themes": ["AI", "CRYPTO"],
 	}
+	out = _request_rewrite(cfg, api_key, system_prompt, title, content, user_payload, source)
+	if out:
+		rewrite_cache.store(cache_key, out, cfg.model)
+	return out
+
+
+def _request_rewrite(cfg: RewriterConfig, api_key: str, system_prompt: str, title: str, content: str, user_payload: Dict[str, object], source: str = "") -> Optional[Dict[str, object]]:
+	# Configurable
+	base_url = getattr(settings, "OPENAI_BASE_URL", None)
+	base_timeout = float(getattr(settings, "REWRITER_TIMEOUT", 30.0))
+	max_timeout = float(getattr(settings, "REWRITER_MAX_TIMEOUT", 90.0))
+	attempts = int(getattr(settings, "REWRITER_ATTEMPTS", 6))
+	backoff = float(getattr(settings, "REWRITER_BACKOFF_SECONDS", 5.0))
+	prompt_tokens = count_tokens(system_prompt, cfg.model) + count_tokens(json.dumps(user_payload, ensure_ascii=False), cfg.model)
+	estimated_tokens = prompt_tokens + int(cfg.max_output_tokens or 0)
 
+	breaker = get_breaker()
+	probing = False
 	last_err: Optional[Exception] = None
 	for i in range(attempts):
+		# Fail fast while the provider is known to be down; in half-open state
+		# only the worker holding the probe slot goes through
+		state = breaker.state()
+		if not (probing and state == HALF_OPEN):
+			if not breaker.allow():
+				logger.warning("Rewriter circuit %s; skipping request (title=%s)", state, title[:80])
+				return None
+			probing = state == HALF_OPEN
 		attempt_timeout = min(base_timeout * (2 ** i), max_timeout)
-		client = OpenAI(api_key=api_key, timeout=attempt_timeout, max_retries=0, base_url=base_url)
+		client = get_client(api_key, base_url).with_options(timeout=attempt_timeout)
+		retry_after: Optional[float] = None
 		try:
 			# Primary attempt: enforce JSON mode
+			_acquire_budget(estimated_tokens)
 			response = client.chat.completions.create(
 				model=cfg.model,
 				messages=[
@@ -89,12 +295,9 @@ def rewrite_article(title: str, content: str) -> Optional[Dict[str, object]]:
 			)
 			text = response.choices[0].message.content or "{}"
 			data = _lenient_json_parse(text) or {}
-			out: Dict[str, object] = {"title": data.get("title") or title, "content": data.get("content") or content}
-			if isinstance(data.get("hashtags"), list):
-				out["hashtags"] = [str(s).strip().lower() for s in data.get("hashtags") if s]
-			theme_val = str(data.get("theme") or "").strip().upper()
-			if theme_val in ("AI", "CRYPTO"):
-				out["theme"] = theme_val
+			out = _output_from(data, title, content)
+			_record_usage(response, cfg.model, source, RewriterUsage.Mode.SINGLE, prompt_tokens)
+			breaker.record_success()
 			return out
 		except BadRequestError as e:
 			msg = str(e)
@@ -103,6 +306,7 @@ def rewrite_article(title: str, content: str) -> Optional[Dict[str, object]]:
 			fallback_model = getattr(settings, "REWRITER_FALLBACK_MODEL", "gpt-4o-mini")
 			if "model" in msg.lower() or "does not exist" in msg.lower() or "unknown" in msg.lower():
 				try:
+					_acquire_budget(estimated_tokens)
 					response = client.chat.completions.create(
 						model=fallback_model,
 						messages=[
@@ -113,18 +317,16 @@ def rewrite_article(title: str, content: str) -> Optional[Dict[str, object]]:
 					)
 					text = response.choices[0].message.content or "{}"
 					data = _lenient_json_parse(text) or {}
-					out = {"title": data.get("title") or title, "content": data.get("content") or content}
-					if isinstance(data.get("hashtags"), list):
-						out["hashtags"] = [str(s).strip().lower() for s in data.get("hashtags") if s]
-					theme_val = str(data.get("theme") or "").strip().upper()
-					if theme_val in ("AI", "CRYPTO"):
-						out["theme"] = theme_val
+					out = _output_from(data, title, content)
+					_record_usage(response, fallback_model, source, RewriterUsage.Mode.SINGLE, prompt_tokens)
+					breaker.record_success()
 					return out
 				except Exception as e2:
 					last_err = e2
 					logger.warning("Rewriter fallback model failed: %s", e2)
 			# Fallback attempt: no response_format, but still ask for JSON in the prompt
 			try:
+				_acquire_budget(estimated_tokens)
 				response = client.chat.completions.create(
 					model=cfg.model,
 					messages=[
@@ -134,26 +336,220 @@ def rewrite_article(title: str, content: str) -> Optional[Dict[str, object]]:
 				)
 				text = response.choices[0].message.content or "{}"
 				data = _lenient_json_parse(text) or {}
-				out = {"title": data.get("title") or title, "content": data.get("content") or content}
-				if isinstance(data.get("hashtags"), list):
-					out["hashtags"] = [str(s).strip().lower() for s in data.get("hashtags") if s]
-				theme_val = str(data.get("theme") or "").strip().upper()
-				if theme_val in ("AI", "CRYPTO"):
-					out["theme"] = theme_val
+				out = _output_from(data, title, content)
+				_record_usage(response, cfg.model, source, RewriterUsage.Mode.SINGLE, prompt_tokens)
+				breaker.record_success()
 				return out
 			except Exception as e3:
 				last_err = e3
-		except (APITimeoutError, RateLimitError) as e:
+		except RateLimitError as e:
+			last_err = e
+			retry_after = _retry_after_seconds(e)
+			if retry_after:
+				# Make every worker honour the provider's hint, not just this one
+				get_bucket("openai:rpm", getattr(settings, "REWRITER_RPM", 0)).pause(retry_after)
+			logger.warning("Rewriter rate limited (attempt %s/%s, retry_after=%s): %s", i+1, attempts, retry_after, e)
+		except (APIConnectionError, InternalServerError) as e:
+			# Timeouts, connection failures and 5xx: the provider looks degraded
 			last_err = e
+			breaker.record_failure()
 			logger.warning("Rewriter transient error (attempt %s/%s, timeout=%ss): %s", i+1, attempts, int(attempt_timeout), e)
 		except Exception as e:
 			last_err = e
 			logger.exception("Rewriter unexpected error: %s", e)
-		# Backoff before next attempt
+		if breaker.state() == OPEN:
+			logger.warning("Rewriter circuit opened; giving up on title=%s", title[:80])
+			break
+		# Backoff before next attempt (provider's retry-after hint wins)
 		if i < attempts - 1:
-			time.sleep(backoff * (2 ** i))
+			time.sleep(retry_after if retry_after else backoff * (2 ** i))
 
 	logger.error("Rewriter failed after %s attempts: %s", attempts, last_err)
 	return None
 
 
+def rewrite_articles(articles: List[Tuple[str, str]], pack_size: Optional[int] = None, sources: Optional[List[str]] = None) -> List[Optional[Dict[str, object]]]:
+	"""Rewrite several (title, content) pairs at once.
+
+	Runs up to REWRITER_CONCURRENCY requests in parallel over the shared
+	client; with `pack_size` (default REWRITER_PACK_SIZE) above 1 several
+	articles share one request. `sources` (parallel to `articles`) attributes
+	token usage. Results keep the input order (None where a rewrite failed).
+	"""
+	if not articles:
+		return []
+	sources = list(sources) if sources else [""] * len(articles)
+	if pack_size is None:
+		pack_size = int(getattr(settings, "REWRITER_PACK_SIZE", 1))
+	if pack_size > 1 and len(articles) > 1:
+		return _rewrite_packed(articles, pack_size, sources)
+	return _rewrite_single(articles, sources)
+
+
+def _rewrite_single(articles: List[Tuple[str, str]], sources: List[str]) -> List[Optional[Dict[str, object]]]:
+	workers = max(1, min(int(getattr(settings, "REWRITER_CONCURRENCY", 4)), len(articles)))
+
+	def safe(job: Tuple[Tuple[str, str], str]) -> Optional[Dict[str, object]]:
+		(title, content), source = job
+		try:
+			return rewrite_article(title, content, source)
+		except Exception:
+			logger.exception("Rewriter failed for title=%s", title[:80])
+			return None
+
+	def run_in_thread(job: Tuple[Tuple[str, str], str]) -> Optional[Dict[str, object]]:
+		try:
+			return safe(job)
+		finally:
+			# Worker threads open their own DB connections (cache lookups)
+			connections.close_all()
+
+	jobs = list(zip(articles, sources))
+	if workers == 1:
+		return [safe(job) for job in jobs]
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		return list(pool.map(run_in_thread, jobs))
+
+
+_PACK_INSTRUCTIONS = (
+	" The user message contains several independent articles in 'articles', each with an 'id'."
+	" Rewrite every article separately following the rules above and return json"
+	" {\"articles\": [{\"id\": <id>, \"title\": ..., \"content\": ..., \"hashtags\": [...], \"theme\": ...}]}"
+	" with exactly one entry per input id."
+)
+
+
+def _make_packs(indexes: List[int], prepared: Dict[int, Tuple[str, str]], size: int) -> List[List[int]]:
+	"""Group article indexes into packs of at most `size` articles and REWRITER_PACK_MAX_CHARS."""
+	max_chars = int(getattr(settings, "REWRITER_PACK_MAX_CHARS", 24000))
+	packs: List[List[int]] = []
+	current: List[int] = []
+	chars = 0
+	for idx in indexes:
+		length = len(prepared[idx][0]) + len(prepared[idx][1])
+		if current and (len(current) >= size or chars + length > max_chars):
+			packs.append(current)
+			current, chars = [], 0
+		current.append(idx)
+		chars += length
+	if current:
+		packs.append(current)
+	return packs
+
+
+def _request_pack(cfg: RewriterConfig, api_key: str, system_prompt: str, allowed: List[str], pack: List[Tuple[str, str]], prepared: List[Tuple[str, str]], sources: List[str]) -> Dict[int, Dict[str, object]]:
+	"""One request for several articles; returns {position in pack: output} for the entries the model returned.
+
+	`pack` holds the original (title, content) used for fallbacks, `prepared`
+	the plain-text inputs actually sent.
+	"""
+	breaker = get_breaker()
+	if not breaker.allow():
+		return {}
+	user_payload = {
+		"articles": [{"id": i, "title": t, "content": c} for i, (t, c) in enumerate(prepared)],
+		"allowed_hashtags": allowed,
+		"allowed_themes": ["AI", "CRYPTO"],
+	}
+	body = json.dumps(user_payload, ensure_ascii=False)
+	timeout = float(getattr(settings, "REWRITER_MAX_TIMEOUT", 90.0))
+	client = get_client(api_key, getattr(settings, "OPENAI_BASE_URL", None)).with_options(timeout=timeout)
+	prompt_tokens = count_tokens(system_prompt + _PACK_INSTRUCTIONS, cfg.model) + count_tokens(body, cfg.model)
+	try:
+		_acquire_budget(prompt_tokens + int(cfg.max_output_tokens or 0) * len(pack))
+		response = client.chat.completions.create(
+			model=cfg.model,
+			messages=[
+				{"role": "system", "content": system_prompt + _PACK_INSTRUCTIONS},
+				{"role": "user", "content": body},
+			],
+			response_format={"type": "json_object"},
+		)
+	except RateLimitError as e:
+		retry_after = _retry_after_seconds(e)
+		if retry_after:
+			get_bucket("openai:rpm", getattr(settings, "REWRITER_RPM", 0)).pause(retry_after)
+		logger.warning("Rewriter pack rate limited (size=%s): %s", len(pack), e)
+		return {}
+	except (APIConnectionError, InternalServerError) as e:
+		breaker.record_failure()
+		logger.warning("Rewriter pack transient error (size=%s): %s", len(pack), e)
+		return {}
+	except Exception as e:
+		logger.warning("Rewriter pack failed (size=%s): %s", len(pack), e)
+		return {}
+	breaker.record_success()
+	# Split the call's usage between sources by their share of the input
+	total_chars = sum(len(t) + len(c) for t, c in prepared) or 1
+	shares: Dict[str, float] = {}
+	for (t, c), src in zip(prepared, sources):
+		shares[src] = shares.get(src, 0.0) + (len(t) + len(c)) / total_chars
+	_record_usage(response, cfg.model, "", RewriterUsage.Mode.PACK, prompt_tokens, shares)
+	data = _lenient_json_parse(response.choices[0].message.content or "{}") or {}
+	results: Dict[int, Dict[str, object]] = {}
+	for entry in data.get("articles") or []:
+		if not isinstance(entry, dict):
+			continue
+		try:
+			pos = int(entry.get("id"))
+		except (TypeError, ValueError):
+			continue
+		if 0 <= pos < len(pack) and pos not in results:
+			title, content = pack[pos]
+			results[pos] = _output_from(entry, title, content)
+	return results
+
+
+def _rewrite_packed(articles: List[Tuple[str, str]], pack_size: int, sources: List[str]) -> List[Optional[Dict[str, object]]]:
+	"""Batch mode: cache hits first, then several articles per request.
+
+	The system prompt is sent once per pack instead of once per article.
+	Articles over the input token budget, articles the model dropped from a
+	pack and packs that failed go through the regular per-article path
+	(trimming/map-reduce, retries).
+	"""
+	results: List[Optional[Dict[str, object]]] = [None] * len(articles)
+	cfg = get_active_config()
+	api_key = getattr(settings, "OPENAI_API_KEY", None)
+	if not cfg or not api_key:
+		return results
+	system_prompt = _system_prompt(cfg)
+	allowed = list(get_active_hashtag_slugs())
+	keys = [rewrite_cache.make_key(t, c, system_prompt, cfg.model, allowed) for t, c in articles]
+	budget = _input_budget()
+	misses: List[int] = []
+	prepared: Dict[int, Tuple[str, str]] = {}
+	for idx, key in enumerate(keys):
+		cached = rewrite_cache.lookup(key)
+		if cached is not None:
+			results[idx] = cached
+			continue
+		misses.append(idx)
+		text = strip_markup(articles[idx][1])
+		if budget <= 0 or count_tokens(text, cfg.model) <= budget:
+			prepared[idx] = (strip_markup(articles[idx][0]), text)
+	packs = _make_packs([idx for idx in misses if idx in prepared], prepared, pack_size)
+
+	def run_pack(pack: List[int]) -> Dict[int, Dict[str, object]]:
+		try:
+			out = _request_pack(
+				cfg, api_key, system_prompt, allowed,
+				[articles[i] for i in pack], [prepared[i] for i in pack], [sources[i] for i in pack],
+			)
+			return {pack[pos]: value for pos, value in out.items()}
+		finally:
+			connections.close_all()
+
+	workers = max(1, min(int(getattr(settings, "REWRITER_CONCURRENCY", 4)), len(packs)))
+	with ThreadPoolExecutor(max_workers=workers) as pool:
+		for out in pool.map(run_pack, packs):
+			for idx, value in out.items():
+				results[idx] = value
+				rewrite_cache.store(keys[idx], value, cfg.model)
+
+	leftovers = [idx for idx in misses if results[idx] is None]
+	if leftovers:
+		logger.info("Rewriter pack mode: %d of %d articles fall back to single requests", len(leftovers), len(misses))
+		for idx, value in zip(leftovers, _rewrite_single([articles[i] for i in leftovers], [sources[i] for i in leftovers])):
+			results[idx] = value
+	return results
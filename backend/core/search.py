@@ -0,0 +1,264 @@
+"""Full-text search over posts.
+
+PostgreSQL: a `search_vector` tsvector column (Russian + English stems,
+title weighted above the body) kept current by a trigger and served by a
+GIN index; results can be ranked with ts_rank_cd.
+SQLite: an external-content FTS5 table per model, kept current by triggers;
+terms match as prefixes, which stands in for stemming.
+
+The column, tables and triggers are created by migration 0024 (which
+keeps its own frozen copy of this DDL); on SQLite post_migrate re-installs
+the triggers with install() because Django rebuilds the table (dropping
+its triggers) on most ALTERs.
+
+fuzzy_search() is the typo/partial-word mode over titles: pg_trgm GIN
+indexes (migration 0025) with similarity ordering, tried with the query as
+typed, transliterated and with letters split from digits ("gpt4o"). Its
+querysets are evaluated inside fuzzy_session().
+"""
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import AuthorColumn, NewsItem
+
+# (title column, body column) indexed per model
+SEARCH_FIELDS: Dict[type, Tuple[str, str]] = {
+	NewsItem: ("title", "description"),
+	AuthorColumn: ("title", "content_body"),
+}
+
+CONFIGS = ("russian", "english")
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_RU_TO_LAT = {
+	"а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "e", "ж": "zh", "з": "z", "и": "i",
+	"й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o", "п": "p", "р": "r", "с": "s", "т": "t",
+	"у": "u", "ф": "f", "х": "h", "ц": "ts", "ч": "ch", "ш": "sh", "щ": "sch", "ъ": "", "ы": "y", "ь": "",
+	"э": "e", "ю": "yu", "я": "ya",
+}
+# Longest Latin spellings first so "sh" wins over "s" + "h"
+_LAT_TO_RU = sorted(
+	{**{v: k for k, v in _RU_TO_LAT.items() if v and k not in "ёъьэй"}, "c": "к", "q": "к", "w": "в", "x": "кс", "j": "дж", "kh": "х", "th": "т", "ph": "ф"}.items(),
+	key=lambda pair: -len(pair[0]),
+)
+_LETTER_DIGIT_RE = re.compile(r"(?<=[^\W\d_])(?=\d)")
+
+# Minimum word_similarity for a fuzzy title match
+FUZZY_THRESHOLD = 0.3
+
+
+def _tsquery_sql() -> str:
+	return " || ".join(f"websearch_to_tsquery('{config}', %s)" for config in CONFIGS)
+
+
+def _vector_sql(prefix: str, title: str, body: str) -> str:
+	parts = []
+	for column, weight in ((title, "A"), (body, "B")):
+		for config in CONFIGS:
+			parts.append(f"setweight(to_tsvector('{config}', coalesce({prefix}.{column}, '')), '{weight}')")
+	return " || ".join(parts)
+
+
+def _postgres_sql(table: str, title: str, body: str) -> list:
+	return [
+		f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+		f"""CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$
+BEGIN
+	NEW.search_vector := {_vector_sql("NEW", title, body)};
+	RETURN NEW;
+END $$ LANGUAGE plpgsql""",
+		f"DROP TRIGGER IF EXISTS {table}_search_insert ON {table}",
+		f"""CREATE TRIGGER {table}_search_insert BEFORE INSERT ON {table}
+FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()""",
+		f"DROP TRIGGER IF EXISTS {table}_search_update ON {table}",
+		f"""CREATE TRIGGER {table}_search_update BEFORE UPDATE OF {title}, {body} ON {table}
+FOR EACH ROW WHEN (OLD.{title} IS DISTINCT FROM NEW.{title} OR OLD.{body} IS DISTINCT FROM NEW.{body})
+EXECUTE FUNCTION {table}_search_vector()""",
+		f"CREATE INDEX IF NOT EXISTS {table}_search_gin ON {table} USING gin (search_vector)",
+	]
+
+
+def _sqlite_sql(table: str, title: str, body: str) -> list:
+	fts = f"{table}_fts"
+	insert = f"INSERT INTO {fts}(rowid, {title}, {body}) VALUES (new.id, new.{title}, new.{body});"
+	delete = f"INSERT INTO {fts}({fts}, rowid, {title}, {body}) VALUES ('delete', old.id, old.{title}, old.{body});"
+	return [
+		f"""CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+	{title}, {body}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+)""",
+		f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END",
+		f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END",
+		f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {title}, {body} ON {table} BEGIN {delete} {insert} END",
+	]
+
+
+def install(conn=None, rebuild: bool = False) -> None:
+	"""Create (idempotently) the search column/tables, triggers and indexes.
+
+	`rebuild` re-indexes every existing row: needed once after creation and
+	on SQLite after writes that happened while the triggers were missing.
+	"""
+	conn = conn or connection
+	with conn.cursor() as cursor:
+		for model, (title, body) in SEARCH_FIELDS.items():
+			table = model._meta.db_table
+			if conn.vendor == "postgresql":
+				for sql in _postgres_sql(table, title, body):
+					cursor.execute(sql)
+				if rebuild:
+					cursor.execute(f"UPDATE {table} SET search_vector = {_vector_sql(table, title, body)}")
+			elif conn.vendor == "sqlite":
+				for sql in _sqlite_sql(table, title, body):
+					cursor.execute(sql)
+				if rebuild:
+					cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+
+
+def ensure_installed(sender=None, using="default", **kwargs) -> None:
+	"""post_migrate hook: put SQLite triggers back after Django rebuilt a table."""
+	from django.db import connections
+
+	conn = connections[using]
+	if conn.vendor != "sqlite":
+		return
+	tables = [model._meta.db_table for model in SEARCH_FIELDS]
+	with conn.cursor() as cursor:
+		cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+		names = {name for _, name in cursor.fetchall()}
+	if not any(f"{table}_fts" in names for table in tables):
+		# Migration 0024 not applied yet
+		return
+	wanted = {f"{table}_search_{suffix}" for table in tables for suffix in ("insert", "delete", "update")}
+	if not wanted <= names:
+		install(conn, rebuild=True)
+
+
+def normalize(text: str) -> str:
+	return " ".join(_WORD_RE.findall((text or "").lower().replace("ё", "е")))
+
+
+def transliterate(text: str) -> str:
+	"""Cyrillic -> Latin, or Latin -> Cyrillic for text without Cyrillic ("антропик" <-> "antropik")."""
+	if any(ch in _RU_TO_LAT for ch in text):
+		return "".join(_RU_TO_LAT.get(ch, ch) for ch in text)
+	out = text
+	for lat, ru in _LAT_TO_RU:
+		out = out.replace(lat, ru)
+	return out
+
+
+def query_variants(q: str) -> List[str]:
+	"""Normalized spellings of `q` worth matching: as typed, transliterated, letters split from digits."""
+	base = normalize(q)
+	if not base:
+		return []
+	variants = [base, transliterate(base)]
+	variants += [_LETTER_DIGIT_RE.sub(" ", v) for v in list(variants)]
+	return list(dict.fromkeys(v for v in variants if v))
+
+
+def _like_escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fuzzy_search(queryset, q: str, rank: bool = True):
+	"""Titles matching `q` approximately: substrings, typos, other alphabet.
+
+	On PostgreSQL rows match by trigram word similarity or substring (both
+	served by the title trigram index) and, with `rank`, are annotated with
+	`search_rank` and ordered by it. On SQLite any variant matching the FTS5
+	index (by prefix) counts; elsewhere a substring; ordering is kept.
+	"""
+	variants = query_variants(q)
+	if not variants:
+		return queryset
+	table = queryset.model._meta.db_table
+	if connection.vendor != "postgresql":
+		cond = Q()
+		for variant in variants:
+			if connection.vendor == "sqlite":
+				cond |= Q(id__in=RawSQL(f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s", [_fts5_query(variant)]))
+			else:
+				cond |= Q(title__icontains=variant)
+		return queryset.filter(cond)
+	# `<%` picks index candidates by the pg_trgm.word_similarity_threshold
+	# setting (see fuzzy_session); the explicit comparison keeps the result
+	# independent of it
+	match_sql = " OR ".join(
+		[f"(%s <%% {table}.title AND word_similarity(%s, {table}.title) >= %s) OR {table}.title ILIKE %s"] * len(variants)
+	)
+	match_params: list = []
+	for variant in variants:
+		match_params += [variant, variant, FUZZY_THRESHOLD, f"%{_like_escape(variant)}%"]
+	queryset = queryset.filter(RawSQL(f"({match_sql})", match_params, output_field=BooleanField()))
+	if rank:
+		score_sql = "GREATEST(" + ", ".join([f"word_similarity(%s, {table}.title)"] * len(variants)) + ")"
+		queryset = queryset.annotate(
+			search_rank=RawSQL(score_sql, list(variants), output_field=FloatField())
+		).order_by("-search_rank", "-published_at", "-id")
+	return queryset
+
+
+@contextmanager
+def fuzzy_session():
+	"""Transaction in which `<%` matches from FUZZY_THRESHOLD (pg_trgm default: 0.6).
+
+	The setting is local to the transaction (set_config is_local), so it
+	neither leaks into other requests nor gets lost behind a transaction
+	pooler; fuzzy_search() querysets must be evaluated inside the block.
+	"""
+	if connection.vendor != "postgresql":
+		yield
+		return
+	with transaction.atomic():
+		with connection.cursor() as cursor:
+			cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(FUZZY_THRESHOLD)])
+		yield
+
+
+def _fts5_query(q: str) -> str:
+	# Every word must match, as a prefix ("нейросет*" finds "нейросети")
+	return " ".join(f'"{word}"*' for word in _WORD_RE.findall(q))
+
+
+def search(queryset, q: str, rank: bool = False):
+	"""Filter a NewsItem/AuthorColumn queryset to posts matching `q`.
+
+	With `rank` (PostgreSQL only) results are annotated with `search_rank`
+	and ordered by it, newest first among equals; otherwise the queryset's
+	ordering is kept.
+	"""
+	q = (q or "").strip()
+	if not q:
+		return queryset
+	model = queryset.model
+	table = model._meta.db_table
+	vendor = connection.vendor
+	if vendor == "postgresql":
+		params = [q] * len(CONFIGS)
+		queryset = queryset.filter(
+			RawSQL(f"{table}.search_vector @@ ({_tsquery_sql()})", params, output_field=BooleanField())
+		)
+		if rank:
+			queryset = queryset.annotate(
+				search_rank=RawSQL(f"ts_rank_cd({table}.search_vector, {_tsquery_sql()})", params, output_field=FloatField())
+			).order_by("-search_rank", "-published_at", "-id")
+		return queryset
+	if vendor == "sqlite":
+		expr = _fts5_query(q)
+		if not expr:
+			return queryset.none()
+		return queryset.filter(
+			id__in=RawSQL(f"SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s", [expr])
+		)
+	# Other backends: plain substring match
+	title, body = SEARCH_FIELDS[model]
+	return queryset.filter(Q(**{f"{title}__icontains": q}) | Q(**{f"{body}__icontains": q}))
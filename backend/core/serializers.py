@@ -1,8 +1,29 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 from .models import AuthorColumn, NewsItem, SitePage, Hashtag, SocialLink, AdBanner
 
 
+def hashtags_prefetch() -> Prefetch:
+	"""Prefetch for post querysets: one hashtag query per page instead of one per row."""
+	return Prefetch("hashtags", queryset=Hashtag.objects.only("id", "slug", "name").order_by("id"))
+
+
+def hashtag_items(obj):
+	"""[{"slug", "name"}] for a post; served from the prefetch cache when present."""
+	manager = getattr(obj, "hashtags", None)
+	if manager is None:
+		return []
+	return [{"slug": h.slug, "name": h.name} for h in manager.all()]
+
+
+def resolve_image(obj) -> str:
+	"""Uploaded file URL if any, else the external image_url (no queries)."""
+	if getattr(obj, "image_file", None):
+		return obj.image_file.url if hasattr(obj.image_file, 'url') else ""
+	return obj.image_url or ""
+
+
 class HashtagSerializer(serializers.ModelSerializer):
 	class Meta:
 		model = Hashtag
@@ -29,14 +50,10 @@ class NewsItemSerializer(serializers.ModelSerializer):
 		]
 
 	def get_resolved_image(self, obj: NewsItem) -> str:
-		if getattr(obj, "image_file", None):
-			url = obj.image_file.url if hasattr(obj.image_file, 'url') else ""
-			return url
-		return obj.image_url or ""
+		return resolve_image(obj)
 
 	def get_hashtags(self, obj: NewsItem):
-		items = getattr(obj, "hashtags", None).all() if hasattr(obj, "hashtags") else []
-		return [{"slug": h.slug, "name": h.name} for h in items]
+		return hashtag_items(obj)
 
 
 class NewsItemDetailSerializer(serializers.ModelSerializer):
@@ -59,14 +76,10 @@ class NewsItemDetailSerializer(serializers.ModelSerializer):
 		]
 
 	def get_resolved_image(self, obj: NewsItem) -> str:
-		if getattr(obj, "image_file", None):
-			url = obj.image_file.url if hasattr(obj.image_file, 'url') else ""
-			return url
-		return obj.image_url or ""
+		return resolve_image(obj)
 
 	def get_hashtags(self, obj: NewsItem):
-		items = getattr(obj, "hashtags", None).all() if hasattr(obj, "hashtags") else []
-		return [{"slug": h.slug, "name": h.name} for h in items]
+		return hashtag_items(obj)
 
 
 class AuthorColumnListSerializer(serializers.ModelSerializer):
@@ -77,14 +90,10 @@ class AuthorColumnListSerializer(serializers.ModelSerializer):
 		fields = ["id", "title", "author_name", "published_at", "image_url", "resolved_image", "theme", "hashtags"]
 
 	def get_resolved_image(self, obj: AuthorColumn) -> str:
-		if getattr(obj, "image_file", None):
-			url = obj.image_file.url if hasattr(obj.image_file, 'url') else ""
-			return url
-		return obj.image_url or ""
+		return resolve_image(obj)
 
 	def get_hashtags(self, obj: AuthorColumn):
-		items = getattr(obj, "hashtags", None).all() if hasattr(obj, "hashtags") else []
-		return [{"slug": h.slug, "name": h.name} for h in items]
+		return hashtag_items(obj)
 
 
 class AuthorColumnDetailSerializer(serializers.ModelSerializer):
@@ -96,14 +105,10 @@ class AuthorColumnDetailSerializer(serializers.ModelSerializer):
 		fields = ["id", "title", "author_name", "published_at", "content_body", "image_url", "resolved_image", "theme", "hashtags"]
 
 	def get_resolved_image(self, obj: AuthorColumn) -> str:
-		if getattr(obj, "image_file", None):
-			url = obj.image_file.url if hasattr(obj.image_file, 'url') else ""
-			return url
-		return obj.image_url or ""
+		return resolve_image(obj)
 
 	def get_hashtags(self, obj: AuthorColumn):
-		items = getattr(obj, "hashtags", None).all() if hasattr(obj, "hashtags") else []
-		return [{"slug": h.slug, "name": h.name} for h in items]
+		return hashtag_items(obj)
 
 
 class SitePageSerializer(serializers.ModelSerializer):
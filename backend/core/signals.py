@@ -2,12 +2,80 @@ from __future__ import annotations
 
 import json
 from dataclasses import asdict, dataclass
-from typing import Dict
+from typing import Dict, Iterable, Optional
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from .models import AuthorColumn, NewsItem, OutboxEvent
+from .edge_cache import post_keys, purge_on_commit
+from .models import AdBanner, AuthorColumn, Hashtag, KeywordFilter, NewsItem, OutboxEvent, ParserConfig, RewriterConfig, SitePage, SocialLink
+from .outbox import dispatch_on_commit
+from .versions import bump_version
+
+
+# Cached derived data (see core.versions) invalidated when these models change
+VERSIONED_MODELS = {
+	KeywordFilter: ("keyword_filters",),
+	ParserConfig: ("parser_config",),
+	RewriterConfig: ("rewriter_config",),
+	# Post payloads embed hashtag names, so hashtag edits also invalidate posts
+	Hashtag: ("hashtags", "posts"),
+	# Cached API responses (core.response_cache)
+	NewsItem: ("posts",),
+	AuthorColumn: ("posts",),
+	SocialLink: ("social_links",),
+	AdBanner: ("ads",),
+}
+
+# Edge-cache surrogate keys (core.edge_cache) purged when these models change;
+# posts and site pages are purged per object by the receivers below
+EDGE_KEYS = {
+	Hashtag: ("hashtags",),
+	SocialLink: ("social-links",),
+	AdBanner: ("ads",),
+}
+
+
+def bump_model_versions(model) -> None:
+	"""Bump version stamps for a model; also used after queryset.update() in admin.
+
+	Deferred to commit so no reader rebuilds a cache from the old rows under
+	the new version. Also purges the model's edge-cache keys.
+	"""
+	purge_on_commit(EDGE_KEYS.get(model, ()))
+	namespaces = VERSIONED_MODELS.get(model, ())
+
+	def bump() -> None:
+		for namespace in namespaces:
+			bump_version(namespace)
+
+	if namespaces:
+		transaction.on_commit(bump)
+
+
+def _on_versioned_change(sender, **kwargs):
+	bump_model_versions(sender)
+
+
+def _on_post_hashtags_changed(sender, action, instance, reverse, pk_set=None, **kwargs):
+	if action not in ("post_add", "post_remove", "post_clear"):
+		return
+	bump_model_versions(NewsItem)
+	post_type = "news" if sender is NewsItem.hashtags.through else "column"
+	if not reverse:
+		purge_on_commit(post_keys(post_type, instance.pk))
+	else:
+		# hashtag.news_items.add(...): the posts are in pk_set
+		purge_on_commit(post_keys(post_type) + [f"{post_type}:{pk}" for pk in (pk_set or ())])
+
+
+for _model in VERSIONED_MODELS:
+	post_save.connect(_on_versioned_change, sender=_model, dispatch_uid=f"version-save-{_model.__name__}")
+	post_delete.connect(_on_versioned_change, sender=_model, dispatch_uid=f"version-delete-{_model.__name__}")
+
+for _through in (NewsItem.hashtags.through, AuthorColumn.hashtags.through):
+	m2m_changed.connect(_on_post_hashtags_changed, sender=_through, dispatch_uid=f"version-m2m-{_through.__name__}")
 
 
 @dataclass
@@ -23,17 +91,11 @@ class CreatedEvent:
 
 
 def enqueue_outbox(event_type: str, payload: Dict) -> None:
-	OutboxEvent.objects.create(event_type=event_type, payload=payload)
+	event = OutboxEvent.objects.create(event_type=event_type, payload=payload)
+	dispatch_on_commit([event.pk])
 
 
-@receiver(post_save, sender=NewsItem)
-def on_newsitem_created(sender, instance: NewsItem, created: bool, **kwargs):
-	if not created:
-		return
-	# Skip Telegram-origin items so the bot posts only site news
-	orig = (instance.original_url or "").lower()
-	if "t.me/" in orig or "telegram." in orig:
-		return
+def _image_of(instance) -> str:
 	img = instance.image_url or ""
 	if not img:
 		try:
@@ -41,13 +103,107 @@ def on_newsitem_created(sender, instance: NewsItem, created: bool, **kwargs):
 				img = instance.image_file.url  # type: ignore[attr-defined]
 		except Exception:
 			img = ""
-	payload = CreatedEvent(
-		post_type="news",
-		id=instance.pk,
-		title=instance.title,
-		body=instance.description or "",
-		image_url=img,
-	).to_payload()
+	return img
+
+
+def _event_ref(post_type: str, pk: int) -> Dict:
+	# Stored payloads are references only; the content is loaded at send time
+	# (hydrate_payloads) so the outbox table stays small
+	return {"post_type": post_type, "id": pk}
+
+
+def _news_payload(instance: NewsItem) -> Optional[Dict]:
+	# Pending items announce themselves when the rewriter publishes them
+	if instance.status != NewsItem.Status.PUBLISHED:
+		return None
+	# Skip Telegram-origin items so the bot posts only site news
+	orig = (instance.original_url or "").lower()
+	if "t.me/" in orig or "telegram." in orig:
+		return None
+	return _event_ref("news", instance.pk)
+
+
+def hydrate_payloads(events: Iterable[OutboxEvent]) -> Dict[int, Optional[Dict]]:
+	"""Full CreatedEvent payloads for the given events, keyed by event id.
+
+	Reference payloads are filled from the current NewsItem/AuthorColumn rows
+	(one query per type); None means the row is gone. Legacy events that
+	still carry the full content are returned as stored.
+	"""
+	events = list(events)
+	wanted: Dict[str, set] = {"news": set(), "column": set()}
+	for event in events:
+		payload = event.payload or {}
+		if "title" not in payload and payload.get("post_type") in wanted and payload.get("id"):
+			wanted[payload["post_type"]].add(payload["id"])
+	rows = {
+		"news": NewsItem.objects.in_bulk(wanted["news"]) if wanted["news"] else {},
+		"column": AuthorColumn.objects.in_bulk(wanted["column"]) if wanted["column"] else {},
+	}
+	result: Dict[int, Optional[Dict]] = {}
+	for event in events:
+		payload = event.payload or {}
+		post_type = payload.get("post_type")
+		if "title" in payload or post_type not in rows:
+			result[event.pk] = payload
+			continue
+		obj = rows[post_type].get(payload.get("id"))
+		if obj is None:
+			result[event.pk] = None
+			continue
+		result[event.pk] = CreatedEvent(
+			post_type=post_type,
+			id=obj.pk,
+			title=obj.title,
+			body=(obj.description if post_type == "news" else obj.content_body) or "",
+			image_url=_image_of(obj),
+		).to_payload()
+	return result
+
+
+def emit_news_created(items: Iterable[NewsItem]) -> None:
+	"""Write news.created events for rows inserted without post_save (bulk_create)."""
+	bump_model_versions(NewsItem)
+	# New posts are in no cached object response yet; only the lists change
+	purge_on_commit(post_keys("news"))
+	events = []
+	for instance in items:
+		payload = _news_payload(instance)
+		if payload is not None:
+			events.append(OutboxEvent(event_type=OutboxEvent.EVENT_NEWS_CREATED, payload=payload))
+	if events:
+		OutboxEvent.objects.bulk_create(events)
+		dispatch_on_commit([event.pk for event in events])
+
+
+@receiver(post_save, sender=NewsItem)
+@receiver(post_delete, sender=NewsItem)
+def purge_news_item(sender, instance: NewsItem, **kwargs):
+	# Pending rows are invisible to the API; their rewrite saves change nothing cached
+	if kwargs.get("signal") is post_save and instance.status == NewsItem.Status.PENDING:
+		return
+	purge_on_commit(post_keys("news", instance.pk))
+
+
+@receiver(post_save, sender=AuthorColumn)
+@receiver(post_delete, sender=AuthorColumn)
+def purge_author_column(sender, instance: AuthorColumn, **kwargs):
+	purge_on_commit(post_keys("column", instance.pk))
+
+
+@receiver(post_save, sender=SitePage)
+@receiver(post_delete, sender=SitePage)
+def purge_site_page(sender, instance: SitePage, **kwargs):
+	purge_on_commit([f"page:{instance.slug}"])
+
+
+@receiver(post_save, sender=NewsItem)
+def on_newsitem_created(sender, instance: NewsItem, created: bool, **kwargs):
+	if not created:
+		return
+	payload = _news_payload(instance)
+	if payload is None:
+		return
 	enqueue_outbox(OutboxEvent.EVENT_NEWS_CREATED, payload)
 
 
@@ -55,20 +211,6 @@ def on_newsitem_created(sender, instance: NewsItem, created: bool, **kwargs):
 def on_authorcolumn_created(sender, instance: AuthorColumn, created: bool, **kwargs):
 	if not created:
 		return
-	img = instance.image_url or ""
-	if not img:
-		try:
-			if instance.image_file:
-				img = instance.image_file.url  # type: ignore[attr-defined]
-		except Exception:
-			img = ""
-	payload = CreatedEvent(
-		post_type="column",
-		id=instance.pk,
-		title=instance.title,
-		body=instance.content_body or "",
-		image_url=img,
-	).to_payload()
-	enqueue_outbox(OutboxEvent.EVENT_COLUMN_CREATED, payload)
+	enqueue_outbox(OutboxEvent.EVENT_COLUMN_CREATED, _event_ref("column", instance.pk))
 
 
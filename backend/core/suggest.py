@@ -0,0 +1,174 @@
+"""Typo-tolerant search suggestions over post titles and hashtags.
+
+Each process keeps an in-memory index of the newest SUGGEST_INDEX_SIZE
+titles: a sorted vocabulary for prefix lookups (bisect) plus a trigram
+index of the vocabulary for misspelled words. It is rebuilt every
+SUGGEST_INDEX_TTL seconds by whichever request finds it stale; others keep
+answering from the old copy meanwhile.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+
+from .models import AuthorColumn, Hashtag, NewsItem
+from .search import normalize, query_variants
+
+# Minimum trigram similarity for a misspelled word to count as a match
+MIN_SIMILARITY = 0.3
+
+
+def _trigrams(word: str) -> Set[str]:
+	padded = f"  {word} "
+	return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: Set[str], b: Set[str]) -> float:
+	return len(a & b) / float(len(a | b) or 1)
+
+
+@dataclass
+class SuggestIndex:
+	built_at: float = 0.0
+	# (type, id, title), newest first
+	entries: List[Tuple[str, int, str]] = field(default_factory=list)
+	vocabulary: List[str] = field(default_factory=list)
+	token_entries: Dict[str, List[int]] = field(default_factory=dict)
+	token_trigrams: Dict[str, Set[str]] = field(default_factory=dict)
+	trigram_tokens: Dict[str, List[str]] = field(default_factory=dict)
+	# (slug, name, normalized "slug name")
+	hashtags: List[Tuple[str, str, str]] = field(default_factory=list)
+
+	def _prefixed(self, word: str) -> List[str]:
+		start = bisect_left(self.vocabulary, word)
+		out = []
+		for token in self.vocabulary[start:]:
+			if not token.startswith(word):
+				break
+			out.append(token)
+		return out
+
+	def _similar(self, word: str) -> Dict[str, float]:
+		grams = _trigrams(word)
+		counts: Counter = Counter()
+		for gram in grams:
+			counts.update(self.trigram_tokens.get(gram, ()))
+		scores = {}
+		for token, common in counts.items():
+			# Compare with the token cut near the typed length so half-typed words still match
+			cut = token[: len(word) + 1]
+			score = max(_similarity(grams, self.token_trigrams[token]), _similarity(grams, _trigrams(cut)))
+			if score >= MIN_SIMILARITY:
+				scores[token] = score
+		return scores
+
+	def _word_matches(self, word: str) -> Dict[int, float]:
+		"""Entry index -> best score for one query word."""
+		tokens = {token: 1.0 for token in self._prefixed(word)}
+		if not tokens and len(word) >= 3:
+			tokens = self._similar(word)
+		matches: Dict[int, float] = {}
+		for token, score in tokens.items():
+			for idx in self.token_entries.get(token, ()):
+				if score > matches.get(idx, 0.0):
+					matches[idx] = score
+		return matches
+
+	def posts(self, q: str, limit: int) -> List[dict]:
+		best: Dict[int, float] = {}
+		for variant in query_variants(q):
+			found: Optional[Dict[int, float]] = None
+			for word in variant.split():
+				matches = self._word_matches(word)
+				if found is None:
+					found = matches
+				else:
+					found = {idx: min(score, matches[idx]) for idx, score in found.items() if idx in matches}
+				if not found:
+					break
+			for idx, score in (found or {}).items():
+				if score > best.get(idx, 0.0):
+					best[idx] = score
+		# Best score first, then newest (lower index)
+		ranked = sorted(best.items(), key=lambda pair: (-pair[1], pair[0]))[:limit]
+		return [{"type": kind, "id": pk, "title": title} for kind, pk, title in (self.entries[idx] for idx, _ in ranked)]
+
+	def hashtag_matches(self, q: str, limit: int) -> List[dict]:
+		scored = []
+		for variant in query_variants(q):
+			grams = _trigrams(variant)
+			for slug, name, text in self.hashtags:
+				if variant in text:
+					score = 1.0
+				else:
+					score = max((_similarity(grams, _trigrams(word)) for word in text.split()), default=0.0)
+				if score >= MIN_SIMILARITY:
+					scored.append((score, slug, name))
+		seen: Set[str] = set()
+		out = []
+		for score, slug, name in sorted(scored, key=lambda row: -row[0]):
+			if slug not in seen:
+				seen.add(slug)
+				out.append({"slug": slug, "name": name})
+		return out[:limit]
+
+
+def build_index() -> SuggestIndex:
+	size = max(1, int(getattr(settings, "SUGGEST_INDEX_SIZE", 5000)))
+	rows = [
+		("news", pk, title, published_at)
+		for pk, title, published_at in NewsItem.objects.published().order_by("-published_at", "-id").values_list("id", "title", "published_at")[:size]
+	] + [
+		("column", pk, title, published_at)
+		for pk, title, published_at in AuthorColumn.objects.order_by("-published_at", "-id").values_list("id", "title", "published_at")[:size]
+	]
+	rows.sort(key=lambda row: row[3], reverse=True)
+	index = SuggestIndex(built_at=time.monotonic())
+	for idx, (kind, pk, title, _) in enumerate(rows[:size]):
+		index.entries.append((kind, pk, title))
+		for token in set(normalize(title).split()):
+			index.token_entries.setdefault(token, []).append(idx)
+	index.vocabulary = sorted(index.token_entries)
+	for token in index.vocabulary:
+		grams = _trigrams(token)
+		index.token_trigrams[token] = grams
+		for gram in grams:
+			index.trigram_tokens.setdefault(gram, []).append(token)
+	index.hashtags = [
+		(slug, name, normalize(f"{slug.replace('-', ' ')} {name}"))
+		for slug, name in Hashtag.objects.filter(is_active=True).order_by("slug").values_list("slug", "name")
+	]
+	return index
+
+
+_index: Optional[SuggestIndex] = None
+_lock = threading.Lock()
+
+
+def get_index() -> SuggestIndex:
+	"""Current process-local index; only one thread rebuilds it when stale."""
+	global _index
+	ttl = float(getattr(settings, "SUGGEST_INDEX_TTL", 120))
+	current = _index
+	if current is not None and time.monotonic() - current.built_at < ttl:
+		return current
+	# The first build blocks; later rebuilds skip if another thread is on it
+	if _lock.acquire(blocking=current is None):
+		try:
+			if _index is current:
+				_index = build_index()
+		finally:
+			_lock.release()
+	return _index
+
+
+def suggest(q: str, limit: int = 8) -> dict:
+	"""{"results": [{"type", "id", "title"}], "hashtags": [{"slug", "name"}]} for a partial query."""
+	index = get_index()
+	return {"results": index.posts(q, limit), "hashtags": index.hashtag_matches(q, min(limit, 5))}
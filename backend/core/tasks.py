@@ -1,31 +1,34 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
 import os
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional
 
-import feedparser
 from celery import shared_task
 from celery.utils.log import get_task_logger
 import requests
 from django.conf import settings
-from django.db import IntegrityError, transaction
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils import timezone
 
 from .models import NewsItem, NewsSource
-from .models import TelegramChannel, WebsiteSource, KeywordFilter, ParserConfig, Hashtag
+from .models import TelegramChannel, WebsiteSource, ParserConfig, Hashtag, RewriterUsage
 from bs4 import BeautifulSoup
 from PIL import Image, ImageOps
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 import re
 from html import escape
-from .rewriter import rewrite_article
+from .rewriter import rewrite_article, rewrite_articles, rewriter_enabled
+from .feeds import fetch_feeds, store_validators
+from .config_snapshot import get_parser_config
+from .keywords import get_keyword_matcher
+from .ingest import bulk_create_news, existing_urls, remember_links, seen_links
+from .signals import emit_news_created, hydrate_payloads
+from . import telegram_sender
+from .outbox import DeliveryResult, archive_events, claim_events, deliver_concurrently, get_session, post_webhook_batches, record_result
 import json
-try:
-	from telegram import Bot
-except Exception:
-	Bot = None
 logger = get_task_logger(__name__)
 
 try:
@@ -189,21 +192,29 @@ def _compress_image_at_path(path: Path, cfg: Optional[ParserConfig]) -> None:
 @shared_task
 def run_parser() -> dict:
 	# Global parser toggle
-	cfg = ParserConfig.objects.order_by("-updated_at").first()
+	cfg = get_parser_config()
 	if cfg and not cfg.is_enabled:
 		logger.info("RSS parser disabled by admin")
 		return {"created": 0, "skipped": 0, "disabled": True}
 	min_chars = int(getattr(cfg, "min_chars", 0) or 0) if cfg else 0
 	created = 0
 	skipped = 0
-	# Load active keyword phrases once
-	phrases = list(KeywordFilter.objects.filter(is_active=True).values_list("phrase", flat=True))
-	phrases_lc = [p.lower() for p in phrases if p]
-	for source in NewsSource.objects.filter(is_active=True):
-		logger.info("RSS parse start url=%s", source.url)
-		feed = feedparser.parse(source.url)
-		entries = feed.entries or []
-		logger.info("RSS entries=%d", len(entries))
+	not_modified = 0
+	# Compiled keyword automaton (rebuilt only when KeywordFilter rows change)
+	keywords = get_keyword_matcher()
+	results = fetch_feeds(NewsSource.objects.filter(is_active=True))
+	for result in results:
+		source = result.source
+		if result.error:
+			logger.info("RSS fetch failed url=%s error=%s", source.url, result.error)
+			continue
+		if result.not_modified:
+			not_modified += 1
+			logger.info("RSS not modified url=%s", source.url)
+			continue
+		entries = result.entries
+		logger.info("RSS entries=%d url=%s", len(entries), source.url)
+		batch = []
 		for entry in entries:
 			title = getattr(entry, "title", "").strip()
 			link = getattr(entry, "link", "").strip()
@@ -216,143 +227,217 @@ def run_parser() -> dict:
 			# Keyword filter (pre-rewrite)
 			orig_title = title or link
 			orig_body = description or ""
-			full_text = f"{orig_title}\n{orig_body}".lower()
-			if phrases_lc and any(kw in full_text for kw in phrases_lc):
-				logger.info("RSS keyword skip url=%s", link)
+			matched = keywords.find(f"{orig_title}\n{orig_body}")
+			if matched:
+				logger.info("RSS keyword skip url=%s phrase=%s", link, matched)
 				skipped += 1
 				continue
-			try:
-				with transaction.atomic():
-					# Skip too-short items per admin config
-					if min_chars and len((title or "") + "\n" + (description or "")) < min_chars:
-						skipped += 1
-						continue
-					# Pick theme from source.default_theme (fallback to AI)
-					theme_val = source.default_theme or NewsItem.Theme.AI
-					NewsItem.objects.create(
-						title=title or link,
-						original_url=link,
-						description=description[:2000],
-						published_at=published_at,
-						source_name=source.title or source.url,
-						theme=theme_val,
-					)
-					created += 1
-			except IntegrityError:
+			# Skip too-short items per admin config
+			if min_chars and len((title or "") + "\n" + (description or "")) < min_chars:
 				skipped += 1
-				logger.info("RSS duplicate skip url=%s", link)
-	logger.info("RSS done created=%d skipped=%d", created, skipped)
-	return {"created": created, "skipped": skipped}
+				continue
+			# Pick theme from source.default_theme (fallback to AI)
+			theme_val = source.default_theme or NewsItem.Theme.AI
+			batch.append(NewsItem(
+				title=title or link,
+				original_url=link,
+				description=description[:2000],
+				published_at=published_at,
+				source_name=source.title or source.url,
+				theme=theme_val,
+			))
+		inserted = bulk_create_news(batch)
+		created += len(inserted)
+		skipped += len(batch) - len(inserted)
+		logger.info("RSS batch url=%s new=%d duplicates=%d", source.url, len(inserted), len(batch) - len(inserted))
+		# Remember validators only after the entries were stored
+		store_validators(result)
+	logger.info("RSS done created=%d skipped=%d not_modified=%d", created, skipped, not_modified)
+	return {"created": created, "skipped": skipped, "not_modified": not_modified}
+
+
+def _telegram_channel() -> str:
+	"""TELEGRAM_CHANNEL if the bot can post to it, else an empty string."""
+	channel = getattr(settings, "TELEGRAM_CHANNEL", "")
+	return channel if channel and telegram_sender.get_bot() is not None else ""
 
 
-@shared_task
-def deliver_outbox() -> dict:
-	from .models import OutboxEvent, NewsItem
+def _is_legacy_event(event) -> bool:
+	# Legacy events without id (pre-payload schema) are dropped to avoid infinite retries
+	from .models import OutboxEvent
 
-	webhook_url = getattr(settings, "WEBHOOK_URL", "")
-	bot_token = getattr(settings, "TELEGRAM_BOT_TOKEN", "")
-	channel = getattr(settings, "TELEGRAM_CHANNEL", "")
-	if not webhook_url:
-		# If webhook not configured, we can still deliver to Telegram if configured
-		if not (bot_token and channel and Bot):
-			return {"delivered": 0, "skipped": 0, "reason": "no delivery configured"}
+	return event.event_type == OutboxEvent.EVENT_NEWS_CREATED and not (event.payload or {}).get("id")
 
-	delivered = 0
-	skipped = 0
-	for event in OutboxEvent.objects.filter(delivered_at__isnull=True).order_by("created_at")[:100]:
+
+def _deliver_event(event, webhook_url: str, channel: str) -> DeliveryResult:
+	"""Deliver one OutboxEvent via the webhook, falling back to the Telegram bot."""
+	from .models import OutboxEvent, NewsItem
+
+	if _is_legacy_event(event):
+		return DeliveryResult(skip=True)
+	ok = False
+	last_err = ""
+	# Prefer webhook if configured
+	if webhook_url:
+		resp = get_session().post(webhook_url, json={
+			"event_type": event.event_type,
+			"payload": event.payload,
+		}, timeout=float(getattr(settings, "OUTBOX_HTTP_TIMEOUT", 10)))
+		ok = 200 <= resp.status_code < 300
+		if not ok:
+			last_err = f"WEBHOOK HTTP {resp.status_code}"
+	# Fallback to Telegram bot
+	if (not ok) and channel:
 		try:
-			ok = False
-			last_err = ""
-			# Drop legacy events without id (pre-payload schema) to avoid infinite retries
+			payload = event.payload or {}
+			t = (payload.get("title") or "New post").strip()
+			body = (payload.get("body") or "").strip()
+			img = (payload.get("image_url") or "").strip()
+
+			# If this is a NewsItem event, re-fetch from DB and skip Telegram-origin items
 			try:
 				if event.event_type == OutboxEvent.EVENT_NEWS_CREATED:
-					pl = event.payload or {}
-					if not pl.get("id"):
-						event.delivery_attempts += 1
-						event.mark_delivered()
-						skipped += 1
-						continue
+					nid = payload.get("id")
+					if nid:
+						ni = NewsItem.objects.filter(pk=int(nid)).only("title", "description", "image_url", "image_file", "original_url").first()
+						if ni:
+							orig = (ni.original_url or "").lower()
+							if "t.me/" in orig or "telegram." in orig:
+								# Skip Telegram-origin items for bot posting
+								raise RuntimeError("skip_telegram_origin")
+							t = (ni.title or t).strip()
+							body = (ni.description or body or "").strip()
+							if not img:
+								img = (ni.image_url or "").strip()
+								if not img and getattr(ni, "image_file", None):
+									try:
+										img = ni.image_file.url  # type: ignore[attr-defined]
+									except Exception:
+										img = ""
+			except RuntimeError as _skip:
+				# Mark as delivered to avoid retry loop on skipped items
+				return DeliveryResult(skip=True)
 			except Exception:
 				pass
-			# Prefer webhook if configured
-			if webhook_url:
-				resp = requests.post(webhook_url, json={
-					"event_type": event.event_type,
-					"payload": event.payload,
-				})
-				ok = 200 <= resp.status_code < 300
-				if not ok:
-					last_err = f"WEBHOOK HTTP {resp.status_code}"
-			# Fallback to Telegram bot
-			if (not ok) and bot_token and channel and Bot:
-				try:
-					bot = Bot(token=bot_token)
-					payload = event.payload or {}
-					t = (payload.get("title") or "New post").strip()
-					body = (payload.get("body") or "").strip()
-					img = (payload.get("image_url") or "").strip()
+			# Send as plain text (no HTML/Markdown) so it renders cleanly in Telegram
+			text = f"{t}\n\n{body}".strip()
+			text_plain = _to_plain_text(text)
+			telegram_sender.send_post(channel, text_plain, img)
+			ok = True
+		except telegram_sender.RetryLater as exc:
+			# Flood control is not a failed attempt: come back when Telegram allows
+			return DeliveryResult(error=f"TG RetryAfter {exc.retry_after:.0f}s", retry_after=exc.retry_after)
+		except Exception as _tg_exc:
+			ok = False
+			last_err = f"TG {type(_tg_exc).__name__}: {str(_tg_exc)[:300]}"
+	if ok:
+		return DeliveryResult(ok=True)
+	return DeliveryResult(error=last_err or ("Webhook failed" if webhook_url else "Delivery failed"))
 
-					# If this is a NewsItem event, re-fetch from DB and skip Telegram-origin items
-					try:
-						if event.event_type == OutboxEvent.EVENT_NEWS_CREATED:
-							nid = payload.get("id")
-							if nid:
-								ni = NewsItem.objects.filter(pk=int(nid)).only("title", "description", "image_url", "image_file", "original_url").first()
-								if ni:
-									orig = (ni.original_url or "").lower()
-									if "t.me/" in orig or "telegram." in orig:
-										# Skip Telegram-origin items for bot posting
-										raise RuntimeError("skip_telegram_origin")
-									t = (ni.title or t).strip()
-									body = (ni.description or body or "").strip()
-									if not img:
-										img = (ni.image_url or "").strip()
-										if not img and getattr(ni, "image_file", None):
-											try:
-												img = ni.image_file.url  # type: ignore[attr-defined]
-											except Exception:
-												img = ""
-					except RuntimeError as _skip:
-						# Mark as delivered to avoid retry loop on skipped items
-						event.delivery_attempts += 1
-						event.mark_delivered()
-						skipped += 1
-						continue
-					except Exception:
-						pass
-					# Send as plain text (no HTML/Markdown) so it renders cleanly in Telegram
-					text = f"{t}\n\n{body}".strip()
-					text_plain = _to_plain_text(text)
-					if img:
-						try:
-							bot.send_photo(chat_id=channel, photo=img, caption=text_plain[:1024])
-							ok = True
-						except Exception:
-							bot.send_message(chat_id=channel, text=text_plain[:4096], disable_web_page_preview=True)
-							ok = True
-					else:
-						bot.send_message(chat_id=channel, text=text_plain[:4096], disable_web_page_preview=True)
-						ok = True
-				except Exception as _tg_exc:
-					ok = False
-					last_err = f"TG {type(_tg_exc).__name__}: {str(_tg_exc)[:300]}"
-			if ok:
-				event.delivery_attempts += 1
-				event.mark_delivered()
-				delivered += 1
-			else:
-				event.delivery_attempts += 1
-				event.last_error = last_err or ("Webhook failed" if webhook_url else "Delivery failed")
-				event.save(update_fields=["delivery_attempts", "last_error"])
-				skipped += 1
-		except Exception as exc:
-			event.delivery_attempts += 1
-			event.last_error = str(exc)[:500]
-			event.save(update_fields=["delivery_attempts", "last_error"])
+
+def _deliver_batched(events, webhook_url: str, channel: str) -> list:
+	"""Batched webhook first; events it did not acknowledge fall back to the Telegram bot."""
+	pending = [event for event in events if not _is_legacy_event(event)]
+	by_id = post_webhook_batches(webhook_url, pending)
+	failed = [event for event in pending if not by_id[event.pk].ok]
+	if channel and failed:
+		for event, result in zip(failed, deliver_concurrently(failed, lambda event: _deliver_event(event, "", channel))):
+			by_id[event.pk] = result
+	return [by_id.get(event.pk, DeliveryResult(skip=True)) for event in events]
+
+
+def _deliver_claimed(events, webhook_url: str, channel: str) -> tuple:
+	"""Send leased events concurrently and record each result; returns (delivered, skipped)."""
+	delivered = 0
+	skipped = 0
+	# Stored payloads are references; fill in the content in memory only
+	# (record_result never writes the payload back)
+	payloads = hydrate_payloads(events)
+	gone = [event for event in events if payloads[event.pk] is None]
+	sendable = [event for event in events if payloads[event.pk] is not None]
+	for event in sendable:
+		event.payload = payloads[event.pk]
+	if webhook_url and int(getattr(settings, "WEBHOOK_BATCH_SIZE", 0)) > 1:
+		results = _deliver_batched(sendable, webhook_url, channel)
+	else:
+		results = deliver_concurrently(sendable, lambda event: _deliver_event(event, webhook_url, channel))
+	# The post was deleted before delivery: nothing left to announce
+	results += [DeliveryResult(skip=True) for _ in gone]
+	for event, result in zip(sendable + gone, results):
+		record_result(event, result)
+		if result.ok:
+			delivered += 1
+		else:
 			skipped += 1
+	return delivered, skipped
+
+
+@shared_task
+def deliver_outbox_events(event_ids: list) -> dict:
+	"""Deliver specific events right after they are committed (see core.outbox.dispatch_on_commit).
+
+	Events already taken by another worker or not yet due are left alone.
+	"""
+	webhook_url = getattr(settings, "WEBHOOK_URL", "")
+	channel = _telegram_channel()
+	if not webhook_url and not channel:
+		return {"delivered": 0, "skipped": 0, "reason": "no delivery configured"}
+	events = claim_events(len(event_ids), ids=event_ids)
+	delivered, skipped = _deliver_claimed(events, webhook_url, channel)
+	return {"delivered": delivered, "skipped": skipped}
+
+
+@shared_task
+def deliver_outbox() -> dict:
+	"""Safety sweep: deliver every due pending OutboxEvent.
+
+	New events are pushed by deliver_outbox_events on commit; this catches
+	retries and anything the push missed. Safe on several workers at once:
+	events are leased in batches of OUTBOX_BATCH_SIZE (see core.outbox) and
+	sent with up to OUTBOX_CONCURRENCY in flight; a run stops after
+	OUTBOX_MAX_BATCHES batches or when nothing is left.
+	"""
+	webhook_url = getattr(settings, "WEBHOOK_URL", "")
+	channel = _telegram_channel()
+	if not webhook_url and not channel:
+		# If webhook not configured, we can still deliver to Telegram if configured
+		return {"delivered": 0, "skipped": 0, "reason": "no delivery configured"}
+
+	batch_size = max(1, int(getattr(settings, "OUTBOX_BATCH_SIZE", 100)))
+	delivered = 0
+	skipped = 0
+	for _ in range(max(1, int(getattr(settings, "OUTBOX_MAX_BATCHES", 10)))):
+		# Failed events are rescheduled into the future, so a run never retries them
+		events = claim_events(batch_size)
+		if not events:
+			break
+		ok, failed = _deliver_claimed(events, webhook_url, channel)
+		delivered += ok
+		skipped += failed
+		if len(events) < batch_size:
+			break
 	return {"delivered": delivered, "skipped": skipped}
 
 
+@shared_task
+def archive_outbox() -> dict:
+	"""Move finished OutboxEvents out of the hot table (see core.outbox.archive_events)."""
+	result = archive_events()
+	logger.info("Outbox archive %s", result)
+	return result
+
+
+@shared_task
+def purge_edge_cache(keys: list) -> dict:
+	"""PURGE surrogate keys on the edge proxies (see core.edge_cache).
+
+	Not retried: a missed purge is bounded by EDGE_CACHE_SECONDS anyway.
+	"""
+	from .edge_cache import purge_keys
+
+	return purge_keys(keys)
+
+
 @shared_task
 def fetch_telegram_channels() -> dict:
 	"""Fetch new posts from configured Telegram channels and save as NewsItem.
@@ -372,7 +457,7 @@ def fetch_telegram_channels() -> dict:
 		return {"error": "missing TG creds"}
 
 	# Global parser toggle
-	cfg = ParserConfig.objects.order_by("-updated_at").first()
+	cfg = get_parser_config()
 	if cfg and not cfg.is_enabled:
 		logger.info("TG parser disabled by admin")
 		return {"created": 0, "skipped": 0, "disabled": True}
@@ -380,9 +465,10 @@ def fetch_telegram_channels() -> dict:
 
 	created = 0
 	skipped = 0
-	# Load active keyword phrases once
-	phrases = list(KeywordFilter.objects.filter(is_active=True).values_list("phrase", flat=True))
-	phrases_lc = [p.lower() for p in phrases if p]
+	# Compiled keyword automaton (rebuilt only when KeywordFilter rows change)
+	keywords = get_keyword_matcher()
+	# AI rewrite runs later on the rewriter queue; items wait unpublished until then
+	defer_rewrite = rewriter_enabled()
 	logger.info("TG fetch start")
 	client = TelegramClient(StringSession(string_session), int(api_id), str(api_hash))
 	# Use context manager to connect/disconnect synchronously
@@ -401,6 +487,9 @@ def fetch_telegram_channels() -> dict:
 				msgs = list(client.iter_messages(entity, limit=50))
 				logger.info("TG messages fetched=%d", len(msgs))
 				max_id = ch.last_message_id or 0
+				# One lookup for already stored posts instead of a failed INSERT per duplicate
+				known = existing_urls(f"https://t.me/{ch.username.lstrip('@')}/{m.id}" for m in msgs)
+				batch = []
 				for m in reversed(msgs):
 					if m.id and m.id <= offset_id:
 						continue
@@ -412,101 +501,77 @@ def fetch_telegram_channels() -> dict:
 						skipped += 1
 						continue
 					url = f"https://t.me/{ch.username.lstrip('@')}/{m.id}"
+					if url in known:
+						skipped += 1
+						logger.info("TG duplicate skip url=%s", url)
+						continue
 					published_at = _safe_dt(getattr(m, "date", None).timetuple() if getattr(m, "date", None) else None)
+					orig_title = (_strip_html_tags(html).split("\n")[0] or raw_text.split("\n")[0] or url)[:200]
+					orig_body = (html or escape(raw_text))[:5000]
+					# Keyword filter (pre-rewrite)
+					matched = keywords.find(f"{orig_title}\n{orig_body}")
+					if matched:
+						logger.info("TG keyword skip url=%s phrase=%s", url, matched)
+						skipped += 1
+						continue
+					# Skip too-short per config (rewritten items are checked at publish time)
+					if min_chars and not defer_rewrite and len((_strip_html_tags(orig_body) or orig_body)) < min_chars:
+						skipped += 1
+						continue
+					# Try to build image URL
+					img_url = ""
 					try:
-						with transaction.atomic():
-							orig_title = (_strip_html_tags(html).split("\n")[0] or raw_text.split("\n")[0] or url)[:200]
-							orig_body = (html or escape(raw_text))[:5000]
-							# Keyword filter (pre-rewrite)
-							if phrases_lc:
-								full_text = f"{orig_title}\n{orig_body}".lower()
-								if any(kw in full_text for kw in phrases_lc):
-									logger.info("TG keyword skip url=%s", url)
-									skipped += 1
-									continue
-							# Rewrite with AI (best-effort)
-							try:
-								rew = rewrite_article(orig_title, orig_body)
-							except Exception:
-								rew = None
-							if not rew:
-								rew = {"title": orig_title, "content": orig_body}
-							# Skip too-short per config (check rewritten/body)
-							effective_body = (rew.get("content") or orig_body) or ""
-							if min_chars and len((_strip_html_tags(effective_body) or effective_body)) < min_chars:
-								skipped += 1
-								continue
-						# Try to build image URL
-						img_url = ""
-						try:
-							if ch.parse_images and getattr(m, "photo", None):
-								target_dir = Path(getattr(settings, "MEDIA_ROOT", Path("media"))) / "telegram" / ch.username.lstrip("@")
-								target_dir.mkdir(parents=True, exist_ok=True)
-								saved = client.download_media(m, file=str(target_dir))
-								if saved:
-									saved_path = Path(saved)
-									# Normalize filename to avoid spaces/parentheses in URLs
-									try:
-										orig_name = saved_path.name
-										safe_name = re.sub(r"\s+", "_", orig_name)
-										safe_name = safe_name.replace("(", "").replace(")", "")
-										if safe_name != orig_name:
-											new_path = saved_path.with_name(safe_name)
-											saved_path.rename(new_path)
-											saved_path = new_path
-									except Exception:
-										pass
-								media_root = Path(getattr(settings, "MEDIA_ROOT", Path("media")))
-								# Compress if exceeds limits
+						if ch.parse_images and getattr(m, "photo", None):
+							target_dir = Path(getattr(settings, "MEDIA_ROOT", Path("media"))) / "telegram" / ch.username.lstrip("@")
+							target_dir.mkdir(parents=True, exist_ok=True)
+							saved = client.download_media(m, file=str(target_dir))
+							if saved:
+								saved_path = Path(saved)
+								# Normalize filename to avoid spaces/parentheses in URLs
 								try:
-									cfg2 = ParserConfig.objects.order_by("-updated_at").first()
-									_compress_image_at_path(saved_path, cfg2)
+									orig_name = saved_path.name
+									safe_name = re.sub(r"\s+", "_", orig_name)
+									safe_name = safe_name.replace("(", "").replace(")", "")
+									if safe_name != orig_name:
+										new_path = saved_path.with_name(safe_name)
+										saved_path.rename(new_path)
+										saved_path = new_path
 								except Exception:
-									logger.exception("Compress failed")
-								rel = saved_path.relative_to(media_root)
-								media_url = getattr(settings, "MEDIA_URL", "/media/")
-								img_url = f"{media_url}{rel.as_posix()}"
-								logger.info("TG image saved path=%s url=%s", str(saved_path), img_url)
-						except Exception:
-							# If anything fails, fall back to t.me permalink
-							img_url = f"https://t.me/{ch.username.lstrip('@')}/{m.id}?single"
-							logger.exception("TG image download failed; using permalink url=%s", img_url)
-						# Final fallback if no local image was produced but message includes a photo entity
-						if ch.parse_images and (not img_url) and MessageMediaPhoto and getattr(m, "media", None) and isinstance(m.media, MessageMediaPhoto):
-							img_url = f"https://t.me/{ch.username.lstrip('@')}/{m.id}?single"
-							logger.info("TG image fallback to permalink url=%s", img_url)
-						# Determine theme: use AI output if present else channel default else AI
-						theme_val = None
-						try:
-							t = (rew or {}).get("theme") if isinstance(rew, dict) else None
-							if isinstance(t, str) and t.strip().upper() in (NewsItem.Theme.AI, NewsItem.Theme.CRYPTO):
-								theme_val = t.strip().upper()
-						except Exception:
-							theme_val = None
-						n = NewsItem.objects.create(
-							title=(rew.get("title") or orig_title)[:500],
-							original_url=url,
-							description=(rew.get("content") or orig_body)[:10000],
-							image_url=img_url,
-							published_at=published_at,
-							source_name=ch.title or ch.username,
-							theme=(theme_val or ch.default_theme or NewsItem.Theme.AI),
-						)
-						# Attach hashtags if provided and valid
-						try:
-							tags = rew.get("hashtags") if isinstance(rew, dict) else None
-							if isinstance(tags, list) and tags:
-								slugs = [str(s).strip().lower() for s in tags if s]
-								objs = list(Hashtag.objects.filter(slug__in=slugs, is_active=True))
-								if objs:
-									n.hashtags.add(*objs)
-						except Exception:
-							logger.exception("Attach hashtags failed (TG)")
-						logger.info("TG created NewsItem url=%s image_url=%s", url, img_url)
-						created += 1
-					except IntegrityError:
-						skipped += 1
-						logger.info("TG duplicate skip url=%s", url)
+									pass
+							media_root = Path(getattr(settings, "MEDIA_ROOT", Path("media")))
+							# Compress if exceeds limits
+							try:
+								cfg2 = get_parser_config()
+								_compress_image_at_path(saved_path, cfg2)
+							except Exception:
+								logger.exception("Compress failed")
+							rel = saved_path.relative_to(media_root)
+							media_url = getattr(settings, "MEDIA_URL", "/media/")
+							img_url = f"{media_url}{rel.as_posix()}"
+							logger.info("TG image saved path=%s url=%s", str(saved_path), img_url)
+					except Exception:
+						# If anything fails, fall back to t.me permalink
+						img_url = f"https://t.me/{ch.username.lstrip('@')}/{m.id}?single"
+						logger.exception("TG image download failed; using permalink url=%s", img_url)
+					# Final fallback if no local image was produced but message includes a photo entity
+					if ch.parse_images and (not img_url) and MessageMediaPhoto and getattr(m, "media", None) and isinstance(m.media, MessageMediaPhoto):
+						img_url = f"https://t.me/{ch.username.lstrip('@')}/{m.id}?single"
+						logger.info("TG image fallback to permalink url=%s", img_url)
+					batch.append(NewsItem(
+						title=orig_title[:500],
+						original_url=url,
+						description=orig_body[:10000],
+						image_url=img_url,
+						published_at=published_at,
+						source_name=ch.title or ch.username,
+						theme=(ch.default_theme or NewsItem.Theme.AI),
+						status=(NewsItem.Status.PENDING if defer_rewrite else NewsItem.Status.PUBLISHED),
+					))
+				inserted = bulk_create_news(batch)
+				_schedule_rewrites(inserted)
+				created += len(inserted)
+				skipped += len(batch) - len(inserted)
+				logger.info("TG channel=%s created=%d duplicates=%d", entity, len(inserted), len(batch) - len(inserted))
 				if max_id and max_id != (ch.last_message_id or 0):
 					ch.last_message_id = max_id
 					ch.save(update_fields=["last_message_id", "updated_at"])
@@ -521,7 +586,7 @@ def fetch_telegram_channels() -> dict:
 def fetch_websites() -> dict:
 	"""Parse configured websites using CSS selectors and save as NewsItem."""
 	# Global parser toggle
-	cfg = ParserConfig.objects.order_by("-updated_at").first()
+	cfg = get_parser_config()
 	if cfg and not cfg.is_enabled:
 		logger.info("WEB parser disabled by admin")
 		return {"created": 0, "skipped": 0, "disabled": True}
@@ -529,9 +594,10 @@ def fetch_websites() -> dict:
 
 	created = 0
 	skipped = 0
-	# Load active keyword phrases once
-	phrases = list(KeywordFilter.objects.filter(is_active=True).values_list("phrase", flat=True))
-	phrases_lc = [p.lower() for p in phrases if p]
+	# Compiled keyword automaton (rebuilt only when KeywordFilter rows change)
+	keywords = get_keyword_matcher()
+	# AI rewrite runs later on the rewriter queue; items wait unpublished until then
+	defer_rewrite = rewriter_enabled()
 	for ws in WebsiteSource.objects.filter(is_active=True):
 		try:
 			logger.info("WEB parse start name=%s url=%s", ws.name, ws.url)
@@ -543,6 +609,10 @@ def fetch_websites() -> dict:
 			soup = BeautifulSoup(resp.text, 'html.parser')
 			containers = soup.select(ws.list_selector)
 			logger.info("WEB containers=%d selector=%s", len(containers), ws.list_selector)
+			batch = []
+			# Resolve listing links first so known articles cost no detail/image requests
+			listing = []
+			listed = set()
 			for c in containers[:50]:
 				title_el = c.select_one(ws.title_selector)
 				url_el = c.select_one(ws.url_selector)
@@ -553,19 +623,37 @@ def fetch_websites() -> dict:
 				title = title_el.get_text(strip=True)
 				link = url_el.get('href') or ''
 				if link.startswith('/'):
-					from urllib.parse import urljoin
 					link = urljoin(ws.url, link)
+				if not link:
+					skipped += 1
+					logger.info("WEB empty link")
+					continue
+				if link in listed:
+					continue
+				listed.add(link)
 				desc = ''
 				if ws.desc_selector:
 					desc_el = c.select_one(ws.desc_selector)
 					desc = desc_el.get_text(strip=True) if desc_el else ''
+				listing.append((c, title, link, desc))
+			seen_key = f"web:{ws.pk}"
+			known = existing_urls(row[2] for row in listing) | seen_links(seen_key)
+			fresh = [row for row in listing if row[2] not in known]
+			skipped += len(listing) - len(fresh)
+			logger.info("WEB listing=%d known=%d", len(listing), len(listing) - len(fresh))
+			for c, title, link, desc in fresh:
+				# Keyword filter (pre-rewrite)
+				matched = keywords.find(f"{title}\n{desc}")
+				if matched:
+					logger.info("WEB keyword skip url=%s phrase=%s", link, matched)
+					skipped += 1
+					continue
 				# Fetch full article body from detail page
 				full_body = desc
 				try:
 					resp_detail = requests.get(link, timeout=20, headers={"User-Agent": "Mozilla/5.0 (compatible; ai-aggregator/1.0)"})
 					if resp_detail.status_code == 200:
-						from bs4 import BeautifulSoup as _BS
-						detail = _BS(resp_detail.text, 'html.parser')
+						detail = BeautifulSoup(resp_detail.text, 'html.parser')
 						# Heuristic: prefer article tag, else main, else body text
 						art = detail.select_one('article') or detail.select_one('main') or detail.body
 						if art:
@@ -575,101 +663,67 @@ def fetch_websites() -> dict:
 								full_body = full_body[:12000]
 				except Exception:
 					pass
-				if not link:
+				# Skip too-short per config (rewritten items are checked at publish time)
+				body = full_body or desc or ""
+				if min_chars and not defer_rewrite and len((_strip_html_tags(body) or body)) < min_chars:
 					skipped += 1
-					logger.info("WEB empty link")
 					continue
-				# Keyword filter (pre-rewrite)
-				if phrases_lc:
-					full_text = f"{title}\n{desc}".lower()
-					if any(kw in full_text for kw in phrases_lc):
-						logger.info("WEB keyword skip url=%s", link)
-						skipped += 1
-						continue
-				try:
-					with transaction.atomic():
+				img = ""
+				if ws.parse_images and ws.image_selector:
+					img_el = c.select_one(ws.image_selector)
+					if img_el and (img_el.get('src') or img_el.get('data-src')):
+						img = img_el.get('src') or img_el.get('data-src')
+						if img and img.startswith('/'):
+							img = urljoin(ws.url, img)
+						# Download image into MEDIA and compress
 						try:
-							rew = rewrite_article(title or link, full_body or desc or "")
-						except Exception:
-							rew = None
-						if not rew:
-							rew = {"title": title or link, "content": (full_body or desc or "")}
-						# Skip too-short per config
-						effective_body = (rew.get("content") or full_body or desc or "")
-						if min_chars and len((_strip_html_tags(effective_body) or effective_body)) < min_chars:
-							skipped += 1
-							continue
-						img = ""
-						if ws.parse_images and ws.image_selector:
-							img_el = c.select_one(ws.image_selector)
-							if img_el and (img_el.get('src') or img_el.get('data-src')):
-								img = img_el.get('src') or img_el.get('data-src')
-								if img and img.startswith('/'):
-									from urllib.parse import urljoin
-									img = urljoin(ws.url, img)
-								# Download image into MEDIA and compress
-								try:
-									if img:
-										media_root = Path(getattr(settings, "MEDIA_ROOT", Path("media")))
-										target_dir = media_root / "web" / urlparse(ws.url).hostname.replace('.', '_')
-										target_dir.mkdir(parents=True, exist_ok=True)
-										resp_img = requests.get(img, timeout=20)
-										if resp_img.status_code == 200:
-											import hashlib
-											hash_name = hashlib.sha1(img.encode('utf-8')).hexdigest()[:16]
-											ext = ".jpg"
-											ct = resp_img.headers.get("Content-Type", "").lower()
-											if "png" in ct:
-												ext = ".png"
-											elif "webp" in ct:
-												ext = ".webp"
-											elif "jpeg" in ct or "jpg" in ct:
-												ext = ".jpg"
-											local_path = target_dir / f"{hash_name}{ext}"
-											with open(local_path, "wb") as f:
-												f.write(resp_img.content)
-											# Compress per config
-											try:
-												cfg2 = ParserConfig.objects.order_by("-updated_at").first()
-												_compress_image_at_path(local_path, cfg2)
-											except Exception:
-												logger.exception("Compress failed (web)")
-											media_url = getattr(settings, "MEDIA_URL", "/media/")
-											rel = local_path.relative_to(media_root)
-											img = f"{media_url}{rel.as_posix()}"
-								except Exception:
-									logger.exception("WEB image download failed")
-						# Determine theme: use AI output if present else website default else AI
-						theme_val = None
-						try:
-							t = (rew or {}).get("theme") if isinstance(rew, dict) else None
-							if isinstance(t, str) and t.strip().upper() in (NewsItem.Theme.AI, NewsItem.Theme.CRYPTO):
-								theme_val = t.strip().upper()
-						except Exception:
-							theme_val = None
-						n = NewsItem.objects.create(
-								title=(rew.get("title") or title or link)[:500],
-								original_url=link,
-								description=(rew.get("content") or desc or "")[:10000],
-								image_url=img,
-								published_at=timezone.now(),
-								source_name=ws.name,
-								theme=(theme_val or ws.default_theme or NewsItem.Theme.AI),
-							)
-						# Attach hashtags if provided and valid
-						try:
-							tags = rew.get("hashtags") if isinstance(rew, dict) else None
-							if isinstance(tags, list) and tags:
-								slugs = [str(s).strip().lower() for s in tags if s]
-								objs = list(Hashtag.objects.filter(slug__in=slugs, is_active=True))
-								if objs:
-									n.hashtags.add(*objs)
+							if img:
+								media_root = Path(getattr(settings, "MEDIA_ROOT", Path("media")))
+								target_dir = media_root / "web" / urlparse(ws.url).hostname.replace('.', '_')
+								target_dir.mkdir(parents=True, exist_ok=True)
+								resp_img = requests.get(img, timeout=20)
+								if resp_img.status_code == 200:
+									import hashlib
+									hash_name = hashlib.sha1(img.encode('utf-8')).hexdigest()[:16]
+									ext = ".jpg"
+									ct = resp_img.headers.get("Content-Type", "").lower()
+									if "png" in ct:
+										ext = ".png"
+									elif "webp" in ct:
+										ext = ".webp"
+									elif "jpeg" in ct or "jpg" in ct:
+										ext = ".jpg"
+									local_path = target_dir / f"{hash_name}{ext}"
+									with open(local_path, "wb") as f:
+										f.write(resp_img.content)
+									# Compress per config
+									try:
+										cfg2 = get_parser_config()
+										_compress_image_at_path(local_path, cfg2)
+									except Exception:
+										logger.exception("Compress failed (web)")
+									media_url = getattr(settings, "MEDIA_URL", "/media/")
+									rel = local_path.relative_to(media_root)
+									img = f"{media_url}{rel.as_posix()}"
 						except Exception:
-							logger.exception("Attach hashtags failed (WEB)")
-						created += 1
-				except IntegrityError:
-					skipped += 1
-					logger.info("WEB duplicate skip url=%s", link)
+							logger.exception("WEB image download failed")
+				batch.append(NewsItem(
+					title=(title or link)[:500],
+					original_url=link,
+					description=body[:10000],
+					image_url=img,
+					published_at=timezone.now(),
+					source_name=ws.name,
+					theme=(ws.default_theme or NewsItem.Theme.AI),
+					status=(NewsItem.Status.PENDING if defer_rewrite else NewsItem.Status.PUBLISHED),
+				))
+			inserted = bulk_create_news(batch)
+			_schedule_rewrites(inserted)
+			created += len(inserted)
+			skipped += len(batch) - len(inserted)
+			# Links evaluated this run (stored or filtered out) are not fetched again
+			remember_links(seen_key, [row[2] for row in fresh])
+			logger.info("WEB source name=%s created=%d duplicates=%d", ws.name, len(inserted), len(batch) - len(inserted))
 		except Exception:
 			skipped += 1
 			logger.exception("WEB source error name=%s", ws.name)
@@ -677,3 +731,178 @@ def fetch_websites() -> dict:
 	return {"created": created, "skipped": skipped}
 
 
+
+
+def enqueue_rewrites(ids: list, pack_size: Optional[int] = None) -> int:
+	"""Queue pending item ids for the rewriter worker in task-sized chunks.
+
+	In pack mode each task gets enough ids to keep REWRITER_CONCURRENCY
+	packed requests busy.
+	"""
+	size = max(1, int(getattr(settings, "REWRITER_TASK_BATCH", 8)))
+	if pack_size and pack_size > 1:
+		size = max(size, pack_size * max(1, int(getattr(settings, "REWRITER_CONCURRENCY", 4))))
+	for i in range(0, len(ids), size):
+		rewrite_news_items.delay(ids[i : i + size], pack_size)
+	return len(ids)
+
+
+def _schedule_rewrites(items) -> None:
+	"""Queue freshly inserted pending items for the rewriter worker."""
+	enqueue_rewrites([item.pk for item in items if item.status == NewsItem.Status.PENDING])
+
+
+def _claimable_rewrites(now):
+	return NewsItem.objects.filter(status=NewsItem.Status.PENDING).filter(
+		Q(rewrite_claimed_until__isnull=True) | Q(rewrite_claimed_until__lt=now)
+	)
+
+
+def claim_rewrites(item_ids: Iterable[int]) -> List[NewsItem]:
+	"""Lease the given pending items to this task for REWRITER_CLAIM_SECONDS.
+
+	Only claimed items may be rewritten and published, so a task queued twice
+	(requeue sweep, rewrite_backlog --sync) never calls the API or publishes
+	twice. Items already leased to another task or no longer pending are left
+	out; a lease that runs out (worker died) makes the item claimable again.
+	"""
+	now = timezone.now()
+	lease_until = now + timedelta(seconds=int(getattr(settings, "REWRITER_CLAIM_SECONDS", 900)))
+	candidates = _claimable_rewrites(now).filter(pk__in=list(item_ids))
+	if connection.features.has_select_for_update_skip_locked:
+		with transaction.atomic():
+			ids = list(candidates.select_for_update(skip_locked=True).values_list("id", flat=True))
+			if ids:
+				NewsItem.objects.filter(id__in=ids).update(rewrite_claimed_until=lease_until)
+	else:
+		ids = [
+			item_id
+			for item_id in candidates.values_list("id", flat=True)
+			if _claimable_rewrites(now).filter(id=item_id).update(rewrite_claimed_until=lease_until)
+		]
+	return list(NewsItem.objects.filter(id__in=ids, rewrite_claimed_until=lease_until).order_by("id"))
+
+
+def _publish_news_item(item: NewsItem, rew: Optional[dict]) -> bool:
+	"""Apply rewriter output (or keep the original) and publish a claimed item.
+
+	The update is conditional on the item still being pending under this
+	task's lease; the news.created event is emitted only if it applied.
+	Returns False if the lease was lost or the rewritten body is below
+	ParserConfig.min_chars (the item is then marked rejected).
+	"""
+	rew = rew if isinstance(rew, dict) else {}
+	claimed = NewsItem.objects.filter(
+		pk=item.pk,
+		status=NewsItem.Status.PENDING,
+		rewrite_claimed_until=item.rewrite_claimed_until,
+	)
+	cfg = get_parser_config()
+	min_chars = int(getattr(cfg, "min_chars", 0) or 0) if cfg else 0
+	title = (rew.get("title") or item.title or item.original_url)[:500]
+	body = (rew.get("content") or item.description or "")
+	if min_chars and len((_strip_html_tags(body) or body)) < min_chars:
+		if claimed.update(status=NewsItem.Status.REJECTED, rewrite_claimed_until=None, updated_at=timezone.now()):
+			item.status = NewsItem.Status.REJECTED
+		return False
+	theme = str(rew.get("theme") or "").strip().upper()
+	if theme in (NewsItem.Theme.AI, NewsItem.Theme.CRYPTO):
+		item.theme = theme
+	item.title = title
+	item.description = body[:10000]
+	with transaction.atomic():
+		if not claimed.update(
+			title=item.title,
+			description=item.description,
+			theme=item.theme,
+			status=NewsItem.Status.PUBLISHED,
+			rewrite_claimed_until=None,
+			updated_at=timezone.now(),
+		):
+			logger.warning("Publish skipped id=%s: no longer claimed by this task", item.pk)
+			return False
+		item.status = NewsItem.Status.PUBLISHED
+		item.rewrite_claimed_until = None
+		tags = rew.get("hashtags")
+		if isinstance(tags, list) and tags:
+			slugs = [str(s).strip().lower() for s in tags if s]
+			objs = list(Hashtag.objects.filter(slug__in=slugs, is_active=True))
+			if objs:
+				item.hashtags.add(*objs)
+		emit_news_created([item])
+	return True
+
+
+@shared_task
+def rewrite_news_item(item_id: int) -> dict:
+	"""Rewrite a pending NewsItem with AI and publish it.
+
+	Routed to the dedicated `rewriter` queue so LLM latency and retries never
+	hold an ingestion transaction or block the ingestion worker. Falls back to
+	the original text if the rewriter fails.
+	"""
+	claimed = claim_rewrites([item_id])
+	if not claimed:
+		return {"published": 0, "reason": "not pending or claimed elsewhere"}
+	item = claimed[0]
+	try:
+		rew = rewrite_article(item.title, item.description, item.source_name)
+	except Exception:
+		logger.exception("Rewrite failed id=%s", item_id)
+		rew = None
+	published = _publish_news_item(item, rew)
+	logger.info("Rewrite done id=%s published=%s", item_id, published)
+	return {"published": int(published)}
+
+
+@shared_task
+def rewrite_news_items(item_ids: list, pack_size: Optional[int] = None) -> dict:
+	"""Rewrite and publish several pending items, running the API calls concurrently.
+
+	`pack_size` > 1 packs that many articles into each API request (backlog mode).
+	"""
+	items = claim_rewrites(item_ids)
+	results = rewrite_articles(
+		[(item.title, item.description) for item in items],
+		pack_size=pack_size,
+		sources=[item.source_name for item in items],
+	)
+	published = 0
+	for item, rew in zip(items, results):
+		try:
+			published += int(_publish_news_item(item, rew))
+		except Exception:
+			logger.exception("Publish failed id=%s", item.pk)
+	logger.info("Rewrite batch done items=%d published=%d", len(items), published)
+	return {"published": published, "items": len(items)}
+
+
+@shared_task
+def requeue_pending_rewrites() -> dict:
+	"""Safety sweep: re-queue items stuck in pending (e.g. lost broker messages)."""
+	minutes = int(getattr(settings, "REWRITER_PENDING_REQUEUE_MINUTES", 30))
+	cutoff = timezone.now() - timedelta(minutes=minutes)
+	# Leased items are being worked on; duplicates of queued ones lose the claim
+	ids = list(
+		_claimable_rewrites(timezone.now()).filter(updated_at__lt=cutoff)
+		.order_by("id")
+		.values_list("id", flat=True)[:500]
+	)
+	if ids:
+		# Touch rows so the next sweep does not queue them again right away
+		NewsItem.objects.filter(id__in=ids).update(updated_at=timezone.now())
+	# Anything still pending here is backlog: use the packed batch mode
+	enqueue_rewrites(ids, int(getattr(settings, "REWRITER_BACKLOG_PACK_SIZE", 5)))
+	return {"requeued": len(ids)}
+
+
+@shared_task
+def prune_rewrite_cache() -> dict:
+	"""Apply TTL and size limits to the persistent rewrite cache and usage log."""
+	from .rewrite_cache import prune
+
+	result = prune()
+	days = int(getattr(settings, "REWRITER_USAGE_RETENTION_DAYS", 90))
+	if days > 0:
+		result["usage_deleted"], _ = RewriterUsage.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+	return result
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .ratelimit import get_bucket
+
+try:
+	from telegram import Bot
+	from telegram.error import BadRequest, RetryAfter
+	from telegram.utils.request import Request as TelegramRequest
+except Exception:  # optional dependency
+	Bot = None
+	BadRequest = RetryAfter = None
+	TelegramRequest = None
+
+logger = logging.getLogger(__name__)
+
+FILE_ID_TTL = 30 * 24 * 3600
+
+
+class RetryLater(Exception):
+	"""Telegram asked us (or our own limiter decided) to wait `retry_after` seconds."""
+
+	def __init__(self, retry_after: float, message: str = "") -> None:
+		super().__init__(message or f"retry after {retry_after:.0f}s")
+		self.retry_after = float(retry_after)
+
+
+_bot = None
+_bot_lock = threading.Lock()
+
+
+def get_bot():
+	"""Process-wide Bot (None if python-telegram-bot or TELEGRAM_BOT_TOKEN is missing).
+
+	Its connection pool fits OUTBOX_CONCURRENCY parallel sends.
+	"""
+	global _bot
+	token = getattr(settings, "TELEGRAM_BOT_TOKEN", "")
+	if not (token and Bot):
+		return None
+	if _bot is None or _bot.token != token:
+		with _bot_lock:
+			if _bot is None or _bot.token != token:
+				if TelegramRequest is None:
+					_bot = Bot(token=token)
+				else:
+					size = max(1, int(getattr(settings, "OUTBOX_CONCURRENCY", 8))) + 2
+					_bot = Bot(token=token, request=TelegramRequest(con_pool_size=size))
+	return _bot
+
+
+def _file_id_key(url: str) -> str:
+	return "tg:file_id:" + hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _wait_for_slot(chat_id: str) -> None:
+	"""Take one send from the global and the per-chat bucket (shared via Redis).
+
+	Raises RetryLater instead of blocking a delivery thread for longer than
+	TELEGRAM_MAX_WAIT_SECONDS.
+	"""
+	max_wait = float(getattr(settings, "TELEGRAM_MAX_WAIT_SECONDS", 30))
+	buckets = (
+		get_bucket("telegram:global", getattr(settings, "TELEGRAM_GLOBAL_PER_MINUTE", 1800)),
+		get_bucket(f"telegram:chat:{chat_id}", getattr(settings, "TELEGRAM_CHAT_PER_MINUTE", 20)),
+	)
+	for bucket in buckets:
+		if not bucket.acquire(1, timeout=max_wait):
+			raise RetryLater(max(bucket.paused_for(), max_wait), f"rate limit {bucket.name}")
+
+
+def _call(chat_id: str, fn, **kwargs):
+	"""Send under the rate limiter; RetryAfter pauses the chat for every worker."""
+	attempts = 2
+	for attempt in range(attempts):
+		_wait_for_slot(chat_id)
+		try:
+			return fn(chat_id=chat_id, **kwargs)
+		except Exception as exc:
+			if RetryAfter is None or not isinstance(exc, RetryAfter):
+				raise
+			wait = float(exc.retry_after) + 1
+			get_bucket(f"telegram:chat:{chat_id}", getattr(settings, "TELEGRAM_CHAT_PER_MINUTE", 20)).pause(wait)
+			logger.warning("Telegram RetryAfter chat=%s wait=%.0fs", chat_id, wait)
+			if attempt == attempts - 1 or wait > float(getattr(settings, "TELEGRAM_MAX_WAIT_SECONDS", 30)):
+				raise RetryLater(wait) from exc
+			time.sleep(wait)
+
+
+def _send_photo(bot, chat_id: str, image_url: str, caption: str) -> None:
+	key = _file_id_key(image_url)
+	file_id = cache.get(key)
+	if file_id:
+		try:
+			_call(chat_id, bot.send_photo, photo=file_id, caption=caption)
+			return
+		except RetryLater:
+			raise
+		except Exception as exc:
+			if BadRequest is None or not isinstance(exc, BadRequest):
+				raise
+			# Stale or foreign file_id: upload from the URL again
+			cache.delete(key)
+	message = _call(chat_id, bot.send_photo, photo=image_url, caption=caption)
+	photos = getattr(message, "photo", None) or []
+	if photos:
+		# Largest size; Telegram reuses it without another upload
+		cache.set(key, photos[-1].file_id, FILE_ID_TTL)
+
+
+def send_post(chat_id: str, text: str, image_url: str = "") -> None:
+	"""Post plain text (with an optional photo) to `chat_id`.
+
+	Image uploads are remembered by URL as Telegram file_ids. If the photo
+	cannot be sent the text goes out on its own. Raises RetryLater when
+	Telegram or the local limiter asks to back off.
+	"""
+	bot = get_bot()
+	if bot is None:
+		raise RuntimeError("Telegram bot is not configured")
+	if image_url:
+		try:
+			_send_photo(bot, chat_id, image_url, text[:1024])
+			return
+		except RetryLater:
+			raise
+		except Exception as exc:
+			logger.warning("Telegram photo failed chat=%s: %s", chat_id, exc)
+	_call(chat_id, bot.send_message, text=text[:4096], disable_web_page_preview=True)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import functools
+import html
+import re
+from typing import List
+
+from bs4 import BeautifulSoup
+
+try:
+	import tiktoken
+except Exception:  # optional: falls back to a character-based estimate
+	tiktoken = None
+
+# Rough ratio for mixed Russian/English text when no tokenizer is available
+CHARS_PER_TOKEN = 3
+
+_BLOCK_TAGS = ["p", "div", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "tr", "section", "article"]
+
+
+@functools.lru_cache(maxsize=16)
+def _encoding(model: str):
+	if tiktoken is None:
+		return None
+	try:
+		return tiktoken.encoding_for_model(model)
+	except KeyError:
+		try:
+			return tiktoken.get_encoding("o200k_base")
+		except Exception:
+			return None
+	except Exception:
+		# Encoding files could not be loaded (e.g. no network on first use)
+		return None
+
+
+def count_tokens(text: str, model: str) -> int:
+	"""Token count of `text` for `model` (tiktoken if installed, else an estimate)."""
+	if not text:
+		return 0
+	enc = _encoding(model)
+	if enc is None:
+		return len(text) // CHARS_PER_TOKEN + 1
+	return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, budget: int, model: str) -> str:
+	"""Cut `text` to at most `budget` tokens, preferring a paragraph or sentence end."""
+	if budget <= 0:
+		return ""
+	if count_tokens(text, model) <= budget:
+		return text
+	enc = _encoding(model)
+	if enc is None:
+		cut = text[: budget * CHARS_PER_TOKEN]
+	else:
+		cut = enc.decode(enc.encode(text, disallowed_special=())[:budget])
+	boundary = max(cut.rfind("\n"), cut.rfind(". "))
+	if boundary > len(cut) * 0.7:
+		cut = cut[: boundary + 1]
+	return cut.rstrip()
+
+
+def strip_markup(value: str) -> str:
+	"""Plain text with paragraph breaks kept; drops tags, scripts and entities."""
+	if not value:
+		return ""
+	if "<" in value and ">" in value:
+		soup = BeautifulSoup(value, "html.parser")
+		for tag in soup(["script", "style", "noscript", "iframe", "svg"]):
+			tag.decompose()
+		for br in soup.find_all("br"):
+			br.replace_with("\n")
+		for block in soup.find_all(_BLOCK_TAGS):
+			block.append("\n")
+		text = soup.get_text()
+	else:
+		text = value
+	text = html.unescape(text)
+	text = re.sub(r"[ \t\u00a0]+", " ", text)
+	text = re.sub(r" *\n[\n ]*", "\n", text)
+	return text.strip()
+
+
+def split_tokens(text: str, chunk_tokens: int, model: str) -> List[str]:
+	"""Split on paragraph boundaries into chunks of about `chunk_tokens` tokens."""
+	chunk_tokens = max(1, chunk_tokens)
+	chunks: List[str] = []
+	current: List[str] = []
+	size = 0
+	for para in text.split("\n"):
+		n = count_tokens(para, model)
+		if n > chunk_tokens:
+			# A single huge paragraph: hard-cut it
+			if current:
+				chunks.append("\n".join(current))
+				current, size = [], 0
+			rest = para
+			while rest:
+				piece = truncate_tokens(rest, chunk_tokens, model) or rest[: chunk_tokens * CHARS_PER_TOKEN]
+				chunks.append(piece)
+				# Always consume something, even if the cut came back empty
+				rest = rest[max(1, len(piece)):].lstrip()
+			continue
+		if current and size + n > chunk_tokens:
+			chunks.append("\n".join(current))
+			current, size = [], 0
+		current.append(para)
+		size += n
+	if current:
+		chunks.append("\n".join(current))
+	return chunks
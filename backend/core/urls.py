@@ -10,6 +10,7 @@ from .views import (
 	SitePageDetailView,
 	UnifiedPostListView,
 	SimilarPostsView,
+	SearchSuggestView,
 	HashtagListView,
 	ThemeListView,
 	SocialLinkListView,
@@ -28,6 +29,7 @@ urlpatterns = [
     path("columns/create/", AuthorColumnCreateView.as_view(), name="column-create"),
 	path("posts/", UnifiedPostListView.as_view(), name="post-list"),
 	path("posts/similar/", SimilarPostsView.as_view(), name="post-similar"),
+	path("search/suggest/", SearchSuggestView.as_view(), name="search-suggest"),
 	path("social-links/", SocialLinkListView.as_view(), name="social-link-list"),
     path("ads/", AdBannerListView.as_view(), name="ad-list"),
 	path("news/<int:pk>/next/", NextNewsItemView.as_view(), name="news-next"),
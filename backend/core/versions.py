@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+from django.core.cache import cache
+
+
+def _key(namespace: str) -> str:
+	return f"version:{namespace}"
+
+
+def get_version(namespace: str) -> int:
+	"""Current version stamp of a namespace (shared through the cache backend)."""
+	try:
+		value = cache.get(_key(namespace))
+		if value is None:
+			cache.add(_key(namespace), 1, None)
+			value = cache.get(_key(namespace)) or 1
+		return int(value)
+	except Exception:
+		return 0
+
+
+def get_versions(namespaces: Sequence[str]) -> Tuple[int, ...]:
+	"""Version stamps of several namespaces with one cache round trip (0s if the cache is down)."""
+	keys = [_key(namespace) for namespace in namespaces]
+	try:
+		values = cache.get_many(keys)
+	except Exception:
+		return tuple(0 for _ in keys)
+	missing = [namespace for namespace, key in zip(namespaces, keys) if values.get(key) is None]
+	for namespace in missing:
+		values[_key(namespace)] = get_version(namespace)
+	return tuple(int(values[key]) for key in keys)
+
+
+def bump_version(namespace: str) -> None:
+	"""Invalidate everything derived from `namespace` in every process."""
+	try:
+		cache.incr(_key(namespace))
+	except ValueError:
+		# Missing key: start above the implicit initial version
+		cache.add(_key(namespace), 2, None)
+	except Exception:
+		pass
@@ -1,10 +1,17 @@
 from rest_framework import generics, parsers, status
 from rest_framework.response import Response
 from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.utils import timezone
 import random
 
 from .models import AuthorColumn, NewsItem, SitePage, Hashtag, SocialLink, AdBanner
+from .pagination import HybridPagination, MergedKeysetPagination
+from .conditional import ConditionalDetailMixin, ConditionalGetMixin
+from .edge_cache import EdgeCacheMixin
+from .response_cache import CachedResponseMixin
+from .search import fuzzy_search, fuzzy_session, search
+from .suggest import suggest
 from django.db.models import Q
 from .serializers import (
 	AuthorColumnDetailSerializer,
@@ -15,64 +22,111 @@ from .serializers import (
 	HashtagSerializer,
 	SocialLinkSerializer,
     AdBannerSerializer,
+	hashtag_items,
+	hashtags_prefetch,
+	resolve_image,
 )
 
 
-class NewsItemListView(generics.ListAPIView):
-	queryset = NewsItem.objects.order_by("-published_at", "-id")
+def _fuzzy(request) -> bool:
+	# ?fuzzy=1: trigram title matching (typos, partial words, transliteration)
+	return (request.query_params.get("fuzzy") or "").lower() in ("1", "true", "yes")
+
+
+class FuzzySearchMixin:
+	"""Run ?fuzzy=1 requests inside search.fuzzy_session(), where fuzzy_search() querysets are evaluated."""
+
+	def get(self, request, *args, **kwargs):
+		if not _fuzzy(request):
+			return super().get(request, *args, **kwargs)
+		with fuzzy_session():
+			return super().get(request, *args, **kwargs)
+
+
+class NewsItemListView(EdgeCacheMixin, FuzzySearchMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+	cache_namespaces = ("posts",)
+	edge_keys = ("posts", "news", "hashtags")
+	edge_object_type = "news"
+	queryset = NewsItem.objects.published().order_by("-published_at", "-id").prefetch_related(hashtags_prefetch())
 	serializer_class = NewsItemSerializer
+	pagination_class = HybridPagination
 	def get_queryset(self):
 		qs = super().get_queryset()
 		q = (self.request.query_params.get("q") or "").strip()
 		theme = (self.request.query_params.get("theme") or "").strip().upper()
-		if q:
-			qs = qs.filter(Q(title__icontains=q) | Q(description__icontains=q))
 		if theme in (NewsItem.Theme.AI, NewsItem.Theme.CRYPTO):
 			qs = qs.filter(theme=theme)
-		return qs
-
-
-class AuthorColumnListView(generics.ListAPIView):
-	queryset = AuthorColumn.objects.order_by("-published_at", "-id")
+		# Page-number results are ranked by relevance; the cursor feed stays chronological
+		rank = "cursor" not in self.request.query_params
+		if _fuzzy(self.request):
+			return fuzzy_search(qs, q, rank=rank)
+		return search(qs, q, rank=rank)
+
+
+class AuthorColumnListView(EdgeCacheMixin, FuzzySearchMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+	cache_namespaces = ("posts",)
+	edge_keys = ("posts", "columns", "hashtags")
+	edge_object_type = "column"
+	queryset = AuthorColumn.objects.order_by("-published_at", "-id").prefetch_related(hashtags_prefetch())
 	serializer_class = AuthorColumnListSerializer
+	pagination_class = HybridPagination
 	def get_queryset(self):
 		qs = super().get_queryset()
 		q = (self.request.query_params.get("q") or "").strip()
 		theme = (self.request.query_params.get("theme") or "").strip().upper()
-		if q:
-			qs = qs.filter(Q(title__icontains=q) | Q(content_body__icontains=q))
 		if theme in (NewsItem.Theme.AI, NewsItem.Theme.CRYPTO):
 			qs = qs.filter(theme=theme)
-		return qs
+		rank = "cursor" not in self.request.query_params
+		if _fuzzy(self.request):
+			return fuzzy_search(qs, q, rank=rank)
+		return search(qs, q, rank=rank)
 
 
-class UnifiedPostListView(generics.ListAPIView):
+class UnifiedPostListView(EdgeCacheMixin, FuzzySearchMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
 	"""Return union of NewsItem and AuthorColumn with normalized fields.
 
-	Supports ?q= and ?theme=AI|CRYPTO
+	Supports ?q= and ?theme=AI|CRYPTO. Paged by MergedKeysetPagination:
+	follow `next` (?cursor=) to scroll the merged feed to any depth.
 	"""
+	cache_namespaces = ("posts",)
+	# Items carry their own "type", which names their surrogate keys
+	edge_keys = ("posts", "news", "columns", "hashtags")
 	serializer_class = None  # not used
 
-	def list(self, request, *args, **kwargs):
+	def get_querysets(self):
+		request = self.request
 		q = (request.query_params.get("q") or "").strip()
 		theme = (request.query_params.get("theme") or "").strip().upper()
-		news_qs = NewsItem.objects.order_by("-published_at", "-id")
-		col_qs = AuthorColumn.objects.order_by("-published_at", "-id")
+		news_qs = NewsItem.objects.published().order_by("-published_at", "-id").prefetch_related(hashtags_prefetch())
+		col_qs = AuthorColumn.objects.order_by("-published_at", "-id").prefetch_related(hashtags_prefetch())
 		if q:
-			news_qs = news_qs.filter(Q(title__icontains=q) | Q(description__icontains=q))
-			col_qs = col_qs.filter(Q(title__icontains=q) | Q(content_body__icontains=q))
+			find = fuzzy_search if _fuzzy(request) else search
+			news_qs = find(news_qs, q, rank=False)
+			col_qs = find(col_qs, q, rank=False)
 		if theme in (NewsItem.Theme.AI, NewsItem.Theme.CRYPTO):
 			news_qs = news_qs.filter(theme=theme)
 			col_qs = col_qs.filter(theme=theme)
+		return {"news": news_qs, "column": col_qs}
+
+	@property
+	def paginator(self):
+		if not hasattr(self, "_paginator"):
+			self._paginator = MergedKeysetPagination()
+		return self._paginator
+
+	def get_validator_querysets(self):
+		return list(self.paginator.window(self.get_querysets(), self.request).values())
+
+	def list(self, request, *args, **kwargs):
 		def map_news(n: NewsItem):
 			return {
 				"id": n.id,
 				"type": "news",
 				"title": n.title,
 				"snippet": (n.description or "")[:300],
-				"resolved_image": getattr(n.image_file, 'url', None) if getattr(n, 'image_file', None) else (n.image_url or ""),
+				"resolved_image": resolve_image(n),
 				"theme": n.theme,
-				"hashtags": [{"slug": h.slug, "name": h.name} for h in getattr(n, 'hashtags').all()] if hasattr(n, 'hashtags') else [],
+				"hashtags": hashtag_items(n),
 				"published_at": n.published_at,
 			}
 		def map_col(c: AuthorColumn):
@@ -81,15 +135,28 @@ class UnifiedPostListView(generics.ListAPIView):
 				"type": "column",
 				"title": c.title,
 				"snippet": (c.content_body or "")[:300],
-				"resolved_image": getattr(c, 'image_file', None).url if getattr(c, 'image_file', None) else (c.image_url or ""),
+				"resolved_image": resolve_image(c),
 				"theme": c.theme,
-				"hashtags": [{"slug": h.slug, "name": h.name} for h in getattr(c, 'hashtags').all()] if hasattr(c, 'hashtags') else [],
+				"hashtags": hashtag_items(c),
 				"published_at": c.published_at,
 			}
-		items = [*map(map_news, news_qs[:50]), *map(map_col, col_qs[:50])]
-		# Sort merged items by published_at desc
-		items.sort(key=lambda x: (x["published_at"], x["id"]), reverse=True)
-		return Response({"results": items[:50]})
+		mappers = {"news": map_news, "column": map_col}
+		page = self.paginator.paginate_querysets(self.get_querysets(), request)
+		return self.paginator.get_paginated_response([mappers[name](row) for name, row in page])
+
+
+class SearchSuggestView(generics.GenericAPIView):
+	"""Typo-tolerant suggestions for the search box: ?q=<partial>&limit=8."""
+
+	def get(self, request, *args, **kwargs):
+		q = (request.query_params.get("q") or "").strip()
+		try:
+			limit = max(1, min(20, int(request.query_params.get("limit") or 8)))
+		except ValueError:
+			limit = 8
+		if len(q) < 2:
+			return Response({"results": [], "hashtags": []})
+		return Response(suggest(q, limit))
 
 
 class SimilarPostsView(generics.GenericAPIView):
@@ -98,9 +165,9 @@ class SimilarPostsView(generics.GenericAPIView):
 		item_id = int(request.query_params.get("id") or 0)
 		limit = int(request.query_params.get("limit") or 2)
 		limit = max(1, min(10, limit))
-		def select_similar(model, base_obj):
+		def select_similar(base_qs, base_obj):
 			base_tags = list(base_obj.hashtags.values_list("id", flat=True)) if hasattr(base_obj, "hashtags") else []
-			qs_all = model.objects.exclude(pk=base_obj.pk).filter(theme=base_obj.theme)
+			qs_all = base_qs.exclude(pk=base_obj.pk).filter(theme=base_obj.theme)
 			# Prefer same-theme + shared hashtags
 			picked = []
 			if base_tags:
@@ -116,47 +183,55 @@ class SimilarPostsView(generics.GenericAPIView):
 				if recent:
 					need = min(limit - len(picked), len(recent))
 					picked.extend(random.sample(recent, need))
-			return picked[:limit]
+			picked = picked[:limit]
+			prefetch_related_objects(picked, hashtags_prefetch())
+			return picked
 
 		if item_type == "column":
 			base = AuthorColumn.objects.filter(pk=item_id).first()
 			if not base:
 				return Response({"results": []})
-			choices = select_similar(AuthorColumn, base)
+			choices = select_similar(AuthorColumn.objects.all(), base)
 			results = [{
 				"id": c.id,
 				"type": "column",
 				"title": c.title,
-				"resolved_image": getattr(c, 'image_file', None).url if getattr(c, 'image_file', None) else (c.image_url or ""),
+				"resolved_image": resolve_image(c),
 				"theme": c.theme,
-				"hashtags": [{"slug": h.slug, "name": h.name} for h in getattr(c, 'hashtags').all()] if hasattr(c, 'hashtags') else [],
+				"hashtags": hashtag_items(c),
 				"published_at": c.published_at,
 			} for c in choices]
 			return Response({"results": results})
 		else:
-			base = NewsItem.objects.filter(pk=item_id).first()
+			base = NewsItem.objects.published().filter(pk=item_id).first()
 			if not base:
 				return Response({"results": []})
-			choices = select_similar(NewsItem, base)
+			choices = select_similar(NewsItem.objects.published(), base)
 			results = [{
 				"id": n.id,
 				"type": "news",
 				"title": n.title,
-				"resolved_image": getattr(n, 'image_file', None).url if getattr(n, 'image_file', None) else (n.image_url or ""),
+				"resolved_image": resolve_image(n),
 				"theme": n.theme,
-				"hashtags": [{"slug": h.slug, "name": h.name} for h in getattr(n, 'hashtags').all()] if hasattr(n, 'hashtags') else [],
+				"hashtags": hashtag_items(n),
 				"published_at": n.published_at,
 			} for n in choices]
 			return Response({"results": results})
 
 
-class AuthorColumnDetailView(generics.RetrieveAPIView):
-	queryset = AuthorColumn.objects.all()
+class AuthorColumnDetailView(EdgeCacheMixin, ConditionalDetailMixin, generics.RetrieveAPIView):
+	cache_namespaces = ("posts",)
+	edge_keys = ("hashtags",)
+	edge_object_type = "column"
+	queryset = AuthorColumn.objects.prefetch_related(hashtags_prefetch())
 	serializer_class = AuthorColumnDetailSerializer
 
 
-class NewsItemDetailView(generics.RetrieveAPIView):
-	queryset = NewsItem.objects.all()
+class NewsItemDetailView(EdgeCacheMixin, ConditionalDetailMixin, generics.RetrieveAPIView):
+	cache_namespaces = ("posts",)
+	edge_keys = ("hashtags",)
+	edge_object_type = "news"
+	queryset = NewsItem.objects.published().prefetch_related(hashtags_prefetch())
 	serializer_class = NewsItemDetailSerializer
 
 
@@ -281,7 +356,9 @@ class NewsItemCreateView(generics.CreateAPIView):
 			pass
 
 
-class HashtagListView(generics.ListAPIView):
+class HashtagListView(EdgeCacheMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+	cache_namespaces = ("hashtags",)
+	edge_keys = ("hashtags",)
 	queryset = Hashtag.objects.filter(is_active=True).order_by("slug")
 	serializer_class = HashtagSerializer
 
@@ -294,29 +371,38 @@ class ThemeListView(generics.GenericAPIView):
 		]})
 
 
-class SitePageDetailView(generics.RetrieveAPIView):
+class SitePageDetailView(EdgeCacheMixin, ConditionalDetailMixin, generics.RetrieveAPIView):
 	lookup_field = "slug"
+	edge_object_type = "page"
+	edge_object_field = "slug"
 	queryset = SitePage.objects.all()
 	serializer_class = SitePageSerializer
 
 
-class SocialLinkListView(generics.ListAPIView):
+class SocialLinkListView(EdgeCacheMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+	cache_namespaces = ("social_links",)
+	edge_keys = ("social-links",)
 	queryset = SocialLink.objects.filter(is_active=True).order_by("order", "id")
 	serializer_class = SocialLinkSerializer
 
-class AdBannerListView(generics.ListAPIView):
+class AdBannerListView(EdgeCacheMixin, ConditionalGetMixin, CachedResponseMixin, generics.ListAPIView):
+	cache_namespaces = ("ads",)
+	edge_keys = ("ads",)
 	queryset = AdBanner.objects.filter(is_active=True)
 	serializer_class = AdBannerSerializer
 
 
 
-class NextNewsItemView(generics.GenericAPIView):
+class NextNewsItemView(EdgeCacheMixin, generics.GenericAPIView):
+	edge_keys = ("news", "hashtags")
+	edge_object_type = "news"
+
 	def get(self, request, *args, **kwargs):
 		current_id = int(kwargs.get("pk"))
 		current = NewsItem.objects.filter(pk=current_id).first()
 		if not current:
 			return Response({"next": None})
-		qs = NewsItem.objects.order_by("-published_at", "-id")
+		qs = NewsItem.objects.published().order_by("-published_at", "-id").prefetch_related(hashtags_prefetch())
 		# find items strictly older than current by ordering
 		next_obj = qs.filter(
 			Q(published_at__lt=current.published_at) |
@@ -324,26 +410,29 @@ class NextNewsItemView(generics.GenericAPIView):
 		).first()
 		# Fallback by numeric id if timestamps are identical across all
 		if not next_obj:
-			next_obj = NewsItem.objects.filter(id__lt=current.id).order_by("-id").first()
+			next_obj = NewsItem.objects.published().filter(id__lt=current.id).order_by("-id").prefetch_related(hashtags_prefetch()).first()
 		if not next_obj:
 			return Response({"next": None})
 		ser = NewsItemDetailSerializer(next_obj, context={"request": request})
 		return Response({"next": ser.data})
 
 
-class NextAuthorColumnView(generics.GenericAPIView):
+class NextAuthorColumnView(EdgeCacheMixin, generics.GenericAPIView):
+	edge_keys = ("columns", "hashtags")
+	edge_object_type = "column"
+
 	def get(self, request, *args, **kwargs):
 		current_id = int(kwargs.get("pk"))
 		current = AuthorColumn.objects.filter(pk=current_id).first()
 		if not current:
 			return Response({"next": None})
-		qs = AuthorColumn.objects.order_by("-published_at", "-id")
+		qs = AuthorColumn.objects.order_by("-published_at", "-id").prefetch_related(hashtags_prefetch())
 		next_obj = qs.filter(
 			Q(published_at__lt=current.published_at) |
 			(Q(published_at=current.published_at) & Q(id__lt=current.id))
 		).first()
 		if not next_obj:
-			next_obj = AuthorColumn.objects.filter(id__lt=current.id).order_by("-id").first()
+			next_obj = AuthorColumn.objects.filter(id__lt=current.id).order_by("-id").prefetch_related(hashtags_prefetch()).first()
 		if not next_obj:
 			return Response({"next": None})
 		ser = AuthorColumnDetailSerializer(next_obj, context={"request": request})